@@ -0,0 +1,227 @@
+"""
+batch_generator.py - generate Define-XML v2.1 files for many DDS JSON files in one process or a pool of workers.
+Example Cmd-line Args:
+    manifest: -m ./studies.json -o ./defines -s --html -r ./batch_report.json
+    glob: -g "./specs/*.json" -o ./defines -w 4
+
+The manifest is either a JSON list of DDS file paths or {"template": ..., "define": ...} objects, or a text file with
+one DDS file path per line. A failure in one study is recorded in the summary report and does not stop the batch.
+"""
+import argparse
+import glob
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+from define_generator import DefineGenerator
+from define_pipeline import DefinePipeline, DEFAULT_STYLESHEET
+
+
+def read_manifest(manifest_file: str) -> list[dict[str, str | None]]:
+    """
+    Read the list of studies to generate from a manifest file.
+
+    :param manifest_file: JSON list of paths or {"template", "define"} objects, or a text file with one path per line
+    :return: list of {"template": DDS file, "define": Define-XML file or None} jobs
+    """
+    text = Path(manifest_file).read_text()
+    try:
+        entries = json.loads(text)
+    except json.JSONDecodeError:
+        entries = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+    jobs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            jobs.append({"template": entry, "define": None})
+        else:
+            jobs.append({"template": entry["template"], "define": entry.get("define")})
+    return jobs
+
+
+def expand_globs(patterns: list[str]) -> list[dict[str, str | None]]:
+    """
+    Create a job for each DDS file matching the glob patterns.
+
+    :param patterns: glob patterns for DDS JSON files
+    :return: list of {"template": DDS file, "define": None} jobs
+    """
+    return [{"template": path, "define": None} for pattern in patterns for path in sorted(glob.glob(pattern))]
+
+
+def define_path(job: dict[str, str | None], output_dir: str | None) -> str:
+    """
+    Return the Define-XML file a job writes: the one named in the manifest, or the template name with an .xml suffix in
+    the output directory or, without one, next to the template.
+
+    :param job: {"template": DDS file, "define": Define-XML file or None}
+    :param output_dir: directory for Define-XML files not named in the manifest
+    """
+    template = job["template"]
+    return job["define"] or str(Path(output_dir or Path(template).parent) / (Path(template).stem + ".xml"))
+
+
+def check_outputs(jobs: list[dict[str, str | None]], output_dir: str | None) -> None:
+    """
+    Check that no two jobs write the same Define-XML file, e.g. studyA/define.json and studyB/define.json with -o.
+
+    :param jobs: list of {"template": DDS file, "define": Define-XML file or None} jobs
+    :param output_dir: directory for Define-XML files not named in the manifest
+    :raises ValueError: listing the templates that would overwrite each other's output
+    """
+    templates = {}
+    for job in jobs:
+        templates.setdefault(Path(define_path(job, output_dir)).resolve(), []).append(job["template"])
+    clashes = [f"{define_file} <- {', '.join(names)}" for define_file, names in templates.items() if len(names) > 1]
+    if clashes:
+        raise ValueError("Several templates would write the same Define-XML file; name the output files in a manifest "
+                         "or use a separate output directory: " + "; ".join(clashes))
+
+
+def generate_study(job: dict[str, str | None], options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Generate, and optionally validate and render, the Define-XML for one study, recording any failure.
+
+    :param job: {"template": DDS file, "define": Define-XML file or None}
+    :param options: output_dir, validate, html, stylesheet, stream, writer, backend and log_level settings
+    :return: summary of the study with status, timings and error message
+    """
+    template = job["template"]
+    define_file = define_path(job, options["output_dir"])
+    result = {"template": template, "define": define_file, "status": "ok", "error": None, "valid": None,
+              "html": None, "seconds": {}}
+    start = time.perf_counter()
+    try:
+        Path(define_file).parent.mkdir(parents=True, exist_ok=True)
+        dg = DefineGenerator(dds_file=template, define_file=define_file, log_level=options["log_level"],
+                             stream=options["stream"], writer=options["writer"],
+                             backend=options.get("backend", "odmlib"))
+        html_file = str(Path(define_file).with_suffix(".html")) if options["html"] else None
+        pipeline = None
+        if options["validate"] or html_file:
+            pipeline = DefinePipeline(validate=options["validate"], html_file=html_file,
+                                      stylesheet=options["stylesheet"])
+        outputs = _timed(result, "generate", dg.create, pipeline)
+        if outputs:
+            result["seconds"].update(outputs["seconds"])
+            result["valid"] = outputs["valid"]
+            result["html"] = html_file
+            if result["valid"] is False:
+                result["status"] = "invalid"
+    except SystemExit as e:
+        # DefineGenerator exits with status 1 on invalid JSON after logging the error
+        result.update(status="failed", error=f"generator exited with status {e.code}")
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    result["seconds"]["total"] = time.perf_counter() - start
+    if result["error"]:
+        logging.error(f"{template}: {result['error']}")
+    return result
+
+
+def run_batch(jobs: list[dict[str, str | None]], options: dict[str, Any], workers: int = 0) -> dict[str, Any]:
+    """
+    Generate the Define-XML for every job, in this process or in a pool of worker processes.
+
+    :param jobs: list of {"template": DDS file, "define": Define-XML file or None} jobs
+    :param options: settings passed to generate_study
+    :param workers: number of worker processes (0 or 1 = generate in this process)
+    :return: summary report with per-study results and totals
+    :raises ValueError: if two jobs would write the same Define-XML file, before any file is written
+    """
+    check_outputs(jobs, options["output_dir"])
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            studies = list(executor.map(generate_study, jobs, [options] * len(jobs)))
+    else:
+        studies = [generate_study(job, options) for job in jobs]
+    return {
+        "studies": studies,
+        "total": len(studies),
+        "succeeded": sum(1 for study in studies if study["status"] == "ok"),
+        "failed": sum(1 for study in studies if study["status"] != "ok"),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def print_summary(report: dict[str, Any]) -> None:
+    """print a one line summary per study and the batch totals"""
+    for study in report["studies"]:
+        line = f"{study['status']:8} {study['seconds']['total']:8.3f} s  {study['template']}"
+        if study["error"]:
+            line += f"  ({study['error']})"
+        print(line)
+    print(f"{report['succeeded']} of {report['total']} studies succeeded in {report['seconds']:.3f} s")
+
+
+def _timed(result: dict[str, Any], stage: str, func, *args) -> Any:
+    """call func and record its wall time in the study result"""
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        result["seconds"][stage] = time.perf_counter() - start
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the batch Define-XML generator.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-m", "--manifest", help="manifest file listing the DDS JSON files to generate",
+                        dest="manifest_file")
+    parser.add_argument("-g", "--glob", help="glob pattern for DDS JSON files to generate", action="append",
+                        default=[], dest="patterns")
+    parser.add_argument("-o", "--output-dir", help="directory for Define-XML files not named in the manifest",
+                        dest="output_dir")
+    parser.add_argument("-s", "--validate", help="schema validate each define.xml", default=False,
+                        action="store_true", dest="is_validate")
+    parser.add_argument("--html", help="render each define.xml as HTML", default=False, action="store_true",
+                        dest="is_html")
+    parser.add_argument("--stylesheet", help="path and file name of the Define-XML style sheet",
+                        default=DEFAULT_STYLESHEET, dest="style_sheet")
+    parser.add_argument("-w", "--workers", help="number of worker processes (default: generate in this process)",
+                        type=int, default=0, dest="workers")
+    parser.add_argument("-r", "--report", help="path and file name of the JSON summary report", dest="report_file")
+    parser.add_argument("--stream", help="read each DDS JSON incrementally", default=False, action="store_true",
+                        dest="is_stream")
+    parser.add_argument("--writer", help="Define-XML writer backend (default: odmlib)", default="odmlib",
+                        choices=["odmlib", "stream"], dest="writer")
+    parser.add_argument("--backend", help="object model built by the loaders (default: odmlib)", default="odmlib",
+                        choices=["odmlib", "fast"], dest="backend")
+    parser.add_argument("-l", "--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level (default: INFO)")
+    args = parser.parse_args()
+    if not args.manifest_file and not args.patterns:
+        parser.error("a manifest (-m) or glob pattern (-g) is required")
+    return args
+
+
+def main() -> None:
+    """Main entry point that generates Define-XML v2.1 files for a batch of DDS JSON files."""
+    args = set_cmd_line_args()
+    jobs = read_manifest(args.manifest_file) if args.manifest_file else []
+    jobs.extend(expand_globs(args.patterns))
+    options = {"output_dir": args.output_dir, "validate": args.is_validate, "html": args.is_html,
+               "stylesheet": args.style_sheet, "stream": args.is_stream, "writer": args.writer,
+               "backend": args.backend, "log_level": args.log_level}
+    try:
+        report = run_batch(jobs, options, workers=args.workers)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    print_summary(report)
+    if args.report_file:
+        with open(args.report_file, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Benchmarks and the synthetic DDS generator used to measure how the Define-XML generator scales."""
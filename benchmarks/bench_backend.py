@@ -0,0 +1,83 @@
+"""
+bench_backend.py - compare the wall time and peak memory of the odmlib and fast (define_records) backends and check that
+both produce the same canonical XML.
+Example Cmd-line Args:
+    sample DDS: python benchmarks/bench_backend.py -t ./data/define-360i.json
+    synthetic DDS: python benchmarks/bench_backend.py --datasets 200 --variables 40 --codelists 500 --terms 25
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import odm as ODM
+from define_generator import DefineGenerator
+from benchmarks.synthetic_dds import DEFAULTS, write_dds
+
+# backend and writer combinations; the fast backend always uses the streaming writer
+MODES: dict[str, tuple[str, str]] = {
+    "odmlib": ("odmlib", "odmlib"),
+    "odmlib+stream writer": ("odmlib", "stream"),
+    "fast": ("fast", "stream"),
+}
+
+
+def run(dds_file: str, define_file: str, backend: str, writer: str) -> dict[str, float]:
+    """
+    Generate a Define-XML file and return the wall time without tracing and the peak traced memory of a second run.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param define_file: path and filename of the Define-XML file to create
+    :param backend: "odmlib" or "fast"
+    :param writer: Define-XML writer backend
+    """
+    start = time.perf_counter()
+    DefineGenerator(dds_file, define_file, log_level="WARNING", backend=backend, writer=writer).create()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    DefineGenerator(dds_file, define_file, log_level="WARNING", backend=backend, writer=writer).create()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / (1024 * 1024)}
+
+
+def canonical_xml(define_file: str) -> str:
+    """return the W3C canonical XML (C14N 2.0) of a Define-XML file"""
+    return ET.canonicalize(from_file=define_file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file (default: generate a "
+                        "synthetic DDS from the size options)", dest="dds_file")
+    for param, default in DEFAULTS.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                            help=f"synthetic DDS: number of {param.replace('_', ' ')} (default: {default})")
+    args = parser.parse_args()
+    # fixed timestamps so that the outputs can be compared
+    ODM.ODM._set_datetime = staticmethod(lambda: "2025-01-01T00:00:00+00:00")
+    with tempfile.TemporaryDirectory() as tmp:
+        dds_file = args.dds_file
+        if not dds_file:
+            dds_file = str(Path(tmp) / "synthetic.json")
+            write_dds(dds_file, **{param: getattr(args, param) for param in DEFAULTS})
+        results, outputs = {}, {}
+        for mode, (backend, writer) in MODES.items():
+            outputs[mode] = str(Path(tmp) / f"{backend}-{writer}.xml")
+            results[mode] = run(dds_file, outputs[mode], backend, writer)
+        baseline = results["odmlib"]["seconds"]
+        for mode, result in results.items():
+            print(f"{mode:22} {result['seconds']:8.3f} s  peak {result['peak_mb']:8.2f} MB  "
+                  f"speedup {baseline / result['seconds']:5.2f}x")
+        reference = canonical_xml(outputs["odmlib"])
+        for mode, define_file in outputs.items():
+            identical = Path(define_file).read_bytes() == Path(outputs["odmlib"]).read_bytes()
+            print(f"{mode:22} canonical XML equal {canonical_xml(define_file) == reference}  bytes equal {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+bench_define2dds.py - show that the Define-XML to DDS JSON conversion runs in flat memory as the input grows.
+Example Cmd-line Args:
+    python benchmarks/bench_define2dds.py --datasets 100 400 1000 --variables 60 --codelists 2000
+
+A synthetic Define-XML file is generated for each number of datasets and converted in a fresh process. The DDS and
+Define-XML files are also written by child processes, since Linux carries the peak resident set size of a process over
+to the programs it starts. lxml allocates outside the Python heap, so the peak RSS is reported instead of tracemalloc.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from benchmarks.synthetic_dds import DEFAULTS
+
+
+def measure(define_file: str, dds_file: str) -> dict[str, float]:
+    """
+    Convert a Define-XML file in this process and return the time and the peak RSS.
+
+    :param define_file: path and filename of the Define-XML file
+    :param dds_file: path and filename of the DDS JSON file to create
+    """
+    from define2dds import DefineToDDSConverter
+    start = time.perf_counter()
+    DefineToDDSConverter(define_file).convert(dds_file)
+    return {"seconds": time.perf_counter() - start,
+            "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--measure"]:
+        print(json.dumps(measure(sys.argv[2], sys.argv[3])))
+        return
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--datasets", type=int, nargs="+", default=[100, 400, 1000],
+                        help="synthetic DDS: number of datasets for each run (default: 100 400 1000)")
+    for param, default in DEFAULTS.items():
+        if param != "datasets":
+            parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                                help=f"synthetic DDS: number of {param.replace('_', ' ')} (default: {default})")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        for datasets in args.datasets:
+            dds_file = str(Path(tmp) / f"synthetic-{datasets}.json")
+            define_file = str(Path(tmp) / f"synthetic-{datasets}.xml")
+            sizes = [f"--{param.replace('_', '-')}={getattr(args, param)}" for param in DEFAULTS if param != "datasets"]
+            subprocess.run([sys.executable, "benchmarks/synthetic_dds.py", "-o", dds_file, f"--datasets={datasets}",
+                            *sizes], check=True, capture_output=True, cwd=ROOT)
+            subprocess.run([sys.executable, "define_generator.py", "-t", dds_file, "-d", define_file,
+                            "--backend", "fast", "-l", "WARNING"], check=True, capture_output=True, cwd=ROOT)
+            output = subprocess.run([sys.executable, __file__, "--measure", define_file, str(Path(tmp) / "out.json")],
+                                    check=True, capture_output=True, text=True, cwd=ROOT).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"{datasets:6} datasets  {Path(define_file).stat().st_size / (1024 * 1024):8.1f} MB  "
+                  f"{result['seconds']:8.3f} s  peak RSS {result['peak_mb']:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+bench_ingestion.py - compare peak memory and wall time of the json.load and streaming DDS ingestion paths, with the
+odmlib and streaming Define-XML writers.
+Example Cmd-line Args:
+    example: python benchmarks/bench_ingestion.py -t ./data/define-360i.json
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from define_generator import DefineGenerator
+
+
+MODES: dict[str, tuple[bool, str]] = {
+    "json.load": (False, "odmlib"),
+    "stream": (True, "odmlib"),
+    "stream+writer": (True, "stream"),
+}
+
+
+def measure(dds_file: str, define_file: str, stream: bool, writer: str = "odmlib") -> dict[str, float]:
+    """
+    Generate a Define-XML file and measure wall time and peak traced memory.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param define_file: path and filename of the Define-XML file to create
+    :param stream: use the streaming ingestion path
+    :param writer: Define-XML writer backend
+    :return: dictionary with the wall time in seconds and peak memory in MB
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    DefineGenerator(dds_file, define_file, log_level="WARNING", stream=stream, writer=writer).create()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / (1024 * 1024)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file", dest="dds_file",
+                        default="./data/define-360i.json")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for mode, (stream, writer) in MODES.items():
+            define_file = str(Path(tmp) / f"{mode}.xml")
+            result = measure(args.dds_file, define_file, stream, writer)
+            outputs[mode] = Path(define_file).stat().st_size
+            print(f"{mode:14} {result['seconds']:8.3f} s  peak {result['peak_mb']:8.2f} MB")
+    print(f"output sizes match: {len(set(outputs.values())) == 1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+bench_parallel.py - compare the wall time of serial and parallel section loading and check the outputs are identical.
+Example Cmd-line Args:
+    example: python benchmarks/bench_parallel.py -t ./data/define-360i.json -w 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import odm as ODM
+from define_generator import DefineGenerator
+
+
+def run(dds_file: str, define_file: str, workers: int) -> float:
+    """
+    Generate a Define-XML file and return the wall time in seconds.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param define_file: path and filename of the Define-XML file to create
+    :param workers: number of worker processes (0 = serial)
+    """
+    start = time.perf_counter()
+    DefineGenerator(dds_file, define_file, log_level="WARNING", workers=workers).create()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file", dest="dds_file",
+                        default="./data/define-360i.json")
+    parser.add_argument("-w", "--workers", help="worker counts to compare with serial loading", type=int, nargs="+",
+                        default=[2, 4], dest="workers")
+    args = parser.parse_args()
+    # fixed timestamps so that the outputs can be compared byte for byte
+    ODM.ODM._set_datetime = staticmethod(lambda: "2025-01-01T00:00:00+00:00")
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        serial_file = Path(tmp) / "serial.xml"
+        serial = run(args.dds_file, str(serial_file), 0)
+        print(f"serial     {serial:8.3f} s")
+        for workers in args.workers:
+            define_file = Path(tmp) / f"workers-{workers}.xml"
+            elapsed = run(args.dds_file, str(define_file), workers)
+            identical = define_file.read_bytes() == serial_file.read_bytes()
+            print(f"workers={workers:<3} {elapsed:8.3f} s  speedup {serial / elapsed:5.2f}x  identical {identical}")
+
+
+if __name__ == "__main__":
+    main()
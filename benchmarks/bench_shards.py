@@ -0,0 +1,77 @@
+"""
+bench_shards.py - compare generating one define.xml with writing per-dataset shards in parallel and merging them, and
+check the outputs are identical.
+Example Cmd-line Args:
+    sample DDS: python benchmarks/bench_shards.py -t ./data/define-360i.json -w 2 4 8
+    synthetic DDS: python benchmarks/bench_shards.py --datasets 200 --variables 40 --codelists 500 --terms 25 -w 4
+
+The regeneration time is the time to write the shards again after changing one dataset, and merge them.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import odm as ODM
+import define_shards
+from define_generator import DefineGenerator
+from benchmarks.synthetic_dds import DEFAULTS, write_dds
+
+
+def timed(func, *args, **kwargs) -> float:
+    """return the wall time of one call of func"""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def shard_and_merge(dds_file: str, shard_dir: str, define_file: str, workers: int, backend: str) -> None:
+    """write the shards and merge them into one define.xml"""
+    define_shards.write_shards(dds_file, shard_dir, workers=workers, backend=backend, log_level="WARNING")
+    define_shards.merge_shards(shard_dir, define_file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file (default: generate a "
+                        "synthetic DDS from the size options)", dest="dds_file")
+    parser.add_argument("-w", "--workers", help="worker counts to compare with the generator", type=int, nargs="+",
+                        default=[2, 4], dest="workers")
+    parser.add_argument("--backend", help="object model built by the loaders (default: fast)", default="fast",
+                        choices=["odmlib", "fast"], dest="backend")
+    for param, default in DEFAULTS.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                            help=f"synthetic DDS: number of {param.replace('_', ' ')} (default: {default})")
+    args = parser.parse_args()
+    # fixed timestamps so that the outputs can be compared byte for byte
+    ODM.ODM._set_datetime = staticmethod(lambda: "2025-01-01T00:00:00+00:00")
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        dds_file = args.dds_file
+        if not dds_file:
+            dds_file = str(Path(tmp) / "synthetic.json")
+            write_dds(dds_file, **{param: getattr(args, param) for param in DEFAULTS})
+        generated_file = Path(tmp) / "generated.xml"
+        generated = timed(DefineGenerator(dds_file, str(generated_file), log_level="WARNING",
+                                          backend=args.backend).create)
+        print(f"generator          {generated:8.3f} s")
+        changed_file = str(Path(tmp) / "changed.json")
+        dds = json.loads(Path(dds_file).read_text())
+        dds["itemGroups"][0]["description"] = f"{dds['itemGroups'][0].get('description')} (changed)"
+        Path(changed_file).write_text(json.dumps(dds))
+        for workers in args.workers:
+            shard_dir = str(Path(tmp) / f"shards-{workers}")
+            define_file = Path(tmp) / f"workers-{workers}.xml"
+            elapsed = timed(shard_and_merge, dds_file, shard_dir, str(define_file), workers, args.backend)
+            identical = define_file.read_bytes() == generated_file.read_bytes()
+            regenerated = timed(shard_and_merge, changed_file, shard_dir, str(define_file), workers, args.backend)
+            print(f"shards workers={workers:<3} {elapsed:8.3f} s  speedup {generated / elapsed:5.2f}x  "
+                  f"identical {identical}  regenerate one dataset {regenerated:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+bench_snapshot.py - compare loading the define objects from a snapshot with parsing the DDS JSON and running the
+loaders.
+Example Cmd-line Args:
+    sample DDS: python benchmarks/bench_snapshot.py -t ./data/define-360i.json
+    synthetic DDS: python benchmarks/bench_snapshot.py --datasets 200 --variables 40 --codelists 500 --terms 25
+
+Both paths are timed up to the state _build_doc starts from, and the Define-XML generated from the snapshot is checked
+against the Define-XML generated from the DDS JSON.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import odm as ODM
+import define_snapshot
+from define_generator import DefineGenerator
+from benchmarks.synthetic_dds import DEFAULTS, write_dds
+
+
+def best_of(repeat: int, func) -> float:
+    """return the shortest wall time of repeat calls of func"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def load_json(dds_file: str) -> DefineGenerator:
+    """parse the DDS JSON and run the loaders"""
+    generator = DefineGenerator(dds_file, None, log_level="WARNING")
+    generator._init_define_objects()
+    generator._load_dds()
+    return generator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file (default: generate a "
+                        "synthetic DDS from the size options)", dest="dds_file")
+    parser.add_argument("--repeat", help="runs of each path; the fastest is reported (default: 3)", type=int,
+                        default=3, dest="repeat")
+    for param, default in DEFAULTS.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                            help=f"synthetic DDS: number of {param.replace('_', ' ')} (default: {default})")
+    args = parser.parse_args()
+    # fixed timestamps so that the outputs can be compared
+    ODM.ODM._set_datetime = staticmethod(lambda: "2025-01-01T00:00:00+00:00")
+    with tempfile.TemporaryDirectory() as tmp:
+        dds_file = args.dds_file
+        if not dds_file:
+            dds_file = str(Path(tmp) / "synthetic.json")
+            write_dds(dds_file, **{param: getattr(args, param) for param in DEFAULTS})
+        snapshot_file = str(Path(tmp) / "define.snapshot")
+        generator = load_json(dds_file)
+        size = define_snapshot.save_snapshot(snapshot_file, generator.define_objects, generator.define_attributes,
+                                             generator.lang, generator.acrf)
+        json_seconds = best_of(args.repeat, lambda: load_json(dds_file))
+        snapshot_seconds = best_of(args.repeat, lambda: define_snapshot.load_snapshot(snapshot_file))
+        dds_mb = Path(dds_file).stat().st_size / (1024 * 1024)
+        print(f"DDS JSON {dds_mb:8.1f} MB  snapshot {size / (1024 * 1024):8.1f} MB")
+        print(f"json.load + loaders {json_seconds:8.3f} s")
+        print(f"snapshot load       {snapshot_seconds:8.3f} s  speedup {json_seconds / snapshot_seconds:5.1f}x")
+        from_json = DefineGenerator(dds_file, None, log_level="WARNING")
+        from_json.create()
+        from_snapshot = DefineGenerator(None, None, log_level="WARNING", from_snapshot=snapshot_file)
+        from_snapshot.create()
+        print(f"Define-XML bytes equal {from_json.xml == from_snapshot.xml}")
+
+
+if __name__ == "__main__":
+    main()
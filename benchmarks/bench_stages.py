@@ -0,0 +1,150 @@
+"""
+bench_stages.py - measure the wall time and peak memory of each stage of Define-XML generation and store the results as
+JSON for comparison across commits.
+Example Cmd-line Args:
+    sample DDS: python benchmarks/bench_stages.py -t ./data/define-360i.json
+    synthetic DDS: python benchmarks/bench_stages.py --datasets 200 --variables 40 --codelists 500 --terms 25
+    compare: python benchmarks/bench_stages.py --datasets 200 --compare ./benchmarks/results/1caea55.json
+
+The stages are json.load, each loader class from define_generator.LOADERS (and the Study loader), _build_doc,
+write_xml, schema validation and define2html. Each stage runs with tracemalloc on, so the wall times include its
+overhead; the times are for comparison between runs of this script, not for absolute numbers.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import define2html
+import dds_reader
+from define_generator import DefineGenerator, LOADERS, validate_defile_file
+from define_pipeline import DEFAULT_STYLESHEET
+from benchmarks.synthetic_dds import DEFAULTS, write_dds
+
+RESULTS_DIR: Path = Path(__file__).resolve().parent / "results"
+# stages that can be skipped with --skip
+OPTIONAL_STAGES: list[str] = ["validate", "define2html"]
+
+
+def measure(func, *args) -> tuple[Any, dict[str, float]]:
+    """
+    Call func and measure its wall time and peak traced memory.
+
+    :return: the value returned by func and a dictionary with the wall time in seconds and peak memory in MB
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        value = func(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return value, {"seconds": elapsed, "peak_mb": peak / (1024 * 1024)}
+
+
+def run_stages(dds_file: str, output_dir: str, skip: list[str] | None = None) -> dict[str, dict[str, float]]:
+    """
+    Generate, validate and render the Define-XML for a DDS file one stage at a time.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param output_dir: directory for the Define-XML and HTML files
+    :param skip: stages not to run (validate and define2html are the slow ones on large files)
+    :return: wall time and peak memory for each stage, with one "loader:<class name>" entry per DDS section
+    """
+    skip = skip or []
+    define_file = str(Path(output_dir) / "define.xml")
+    html_file = str(Path(output_dir) / "define.html")
+    dg = DefineGenerator(dds_file, define_file, log_level="WARNING")
+    results = {}
+    template, results["json.load"] = measure(_read_json, dds_file)
+    dg._init_define_objects()
+    _, results["loader:Study"] = measure(dg._load_study, template)
+    for section, data in template.items():
+        if isinstance(data, list) and section in LOADERS:
+            _, results[f"loader:{LOADERS[section].__name__}"] = measure(dg._load, section, data)
+    odm, results["_build_doc"] = measure(dg._build_doc)
+    _, results["write_xml"] = measure(odm.write_xml, define_file)
+    if "validate" not in skip:
+        _, results["validate"] = measure(validate_defile_file, define_file)
+    if "define2html" not in skip:
+        _, results["define2html"] = measure(define2html.transform_xml, define_file, DEFAULT_STYLESHEET, html_file)
+    results["output"] = {"define_bytes": Path(define_file).stat().st_size}
+    return results
+
+
+def compare(current: dict[str, Any], previous: dict[str, Any]) -> None:
+    """print the current and previous wall time and peak memory of each stage"""
+    print(f"{'stage':28} {'seconds':>9} {'previous':>9} {'ratio':>6} {'peak MB':>9} {'previous':>9}")
+    for stage, result in current["stages"].items():
+        before = previous["stages"].get(stage)
+        if "seconds" not in result or not before:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] else 0.0
+        print(f"{stage:28} {result['seconds']:9.3f} {before['seconds']:9.3f} {ratio:6.2f} "
+              f"{result['peak_mb']:9.2f} {before['peak_mb']:9.2f}")
+
+
+def _read_json(dds_file: str) -> dict[str, Any]:
+    return dds_reader.load_dds(dds_file)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the stage benchmark.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file (default: generate a "
+                        "synthetic DDS from the size options)", dest="dds_file")
+    for param, default in DEFAULTS.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                            help=f"synthetic DDS: number of {param.replace('_', ' ')} (default: {default})")
+    parser.add_argument("--skip", help="stages to skip", nargs="+", default=[], choices=OPTIONAL_STAGES, dest="skip")
+    parser.add_argument("-o", "--output", help="path and file name of the JSON results (default: "
+                        "benchmarks/results/<commit>.json)", dest="results_file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with", dest="compare_file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = set_cmd_line_args()
+    commit = _git_commit()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dds_file:
+            dds_file, params = args.dds_file, None
+        else:
+            dds_file = str(Path(tmp) / "synthetic.json")
+            params = write_dds(dds_file, **{param: getattr(args, param) for param in DEFAULTS})
+        stages = run_stages(dds_file, tmp, args.skip)
+    report = {"commit": commit, "python": platform.python_version(), "dds_file": args.dds_file,
+              "synthetic": params, "stages": stages}
+    for stage, result in stages.items():
+        if "seconds" in result:
+            print(f"{stage:28} {result['seconds']:9.3f} s  peak {result['peak_mb']:9.2f} MB")
+    results_file = Path(args.results_file) if args.results_file else RESULTS_DIR / f"{commit or 'results'}.json"
+    results_file.parent.mkdir(parents=True, exist_ok=True)
+    results_file.write_text(json.dumps(report, indent=2))
+    print(f"results written to {results_file}")
+    if args.compare_file:
+        compare(report, json.loads(Path(args.compare_file).read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_terms.py - report the memory saved by interning codelist terms: the memory held by the CodeList objects and the
+peak memory of the codelist loader with and without interning, for both backends.
+Example Cmd-line Args:
+    example: python benchmarks/bench_terms.py --codelists 400 --terms 200 --term-pool 1000
+    sample DDS: python benchmarks/bench_terms.py -t ./data/define-360i.json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from codeLists import CodeLists
+from define_registry import DefineRegistry
+from term_table import TermTable
+from benchmarks.synthetic_dds import DEFAULTS, write_dds
+
+
+def load_codelists(codelists: list[dict[str, Any]], backend: str, intern_terms: bool) -> dict[str, Any]:
+    """
+    Load the codelists section and measure the memory the resulting CodeList objects hold.
+
+    :param codelists: codeLists section of a DDS
+    :param backend: "odmlib" or "fast"
+    :param intern_terms: share identical terms between codelists
+    :return: seconds, the retained and peak traced memory in MB, and the term table counts
+    """
+    define_objects = DefineRegistry({"CodeList": []})
+    define_objects.backend = backend
+    define_objects.terms = TermTable(enabled=intern_terms)
+    tracemalloc.start()
+    start = time.perf_counter()
+    CodeLists().create_define_objects(codelists, define_objects, "en", "LF.acrf")
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "retained_mb": retained / (1024 * 1024), "peak_mb": peak / (1024 * 1024),
+            "terms": define_objects.terms.stats()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file (default: generate a "
+                        "synthetic DDS from the size options)", dest="dds_file")
+    for param, default in {**DEFAULTS, "codelists": 400, "terms": 200, "term_pool": 1000}.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                            help=f"synthetic DDS: number of {param.replace('_', ' ')} (default: {default})")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        dds_file = args.dds_file
+        if not dds_file:
+            dds_file = str(Path(tmp) / "synthetic.json")
+            write_dds(dds_file, **{param: getattr(args, param) for param in DEFAULTS})
+        with open(dds_file) as f:
+            codelists = json.load(f)["codeLists"]
+    for backend in ("odmlib", "fast"):
+        plain = load_codelists(codelists, backend, intern_terms=False)
+        interned = load_codelists(codelists, backend, intern_terms=True)
+        saved = plain["retained_mb"] - interned["retained_mb"]
+        print(f"{backend:7} not interned: {plain['retained_mb']:8.2f} MB held, peak {plain['peak_mb']:8.2f} MB, "
+              f"{plain['seconds']:6.3f} s")
+        print(f"{backend:7} interned:     {interned['retained_mb']:8.2f} MB held, peak {interned['peak_mb']:8.2f} MB, "
+              f"{interned['seconds']:6.3f} s  saved {saved:8.2f} MB "
+              f"({saved / plain['retained_mb'] if plain['retained_mb'] else 0:.0%})")
+    print(f"terms: {interned['terms']}")
+
+
+if __name__ == "__main__":
+    main()
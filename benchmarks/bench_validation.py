@@ -0,0 +1,81 @@
+"""
+bench_validation.py - compare the wall time and peak memory of whole-tree and streaming schema validation.
+Example Cmd-line Args:
+    Define-XML file: python benchmarks/bench_validation.py -d ./data/define-360i.xml
+    synthetic DDS: python benchmarks/bench_validation.py --datasets 400 --variables 60 --codelists 800 --terms 40
+
+Each mode runs in a fresh process so that the peak resident set size of one does not hide the other. lxml allocates
+the document tree outside the Python heap, so the peak RSS is reported instead of tracemalloc.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from benchmarks.synthetic_dds import DEFAULTS, write_dds
+
+# validation mode: (engine, stream threshold in bytes; 0 streams every file and None parses the whole tree)
+MODES: dict[str, tuple[str, int | None]] = {
+    "xmlschema tree": ("xmlschema", None),
+    "xmlschema stream": ("xmlschema", 0),
+    "lxml tree": ("lxml", None),
+    "lxml stream": ("lxml", 0),
+}
+
+
+def measure(define_file: str, engine: str, stream_threshold: int | None) -> dict[str, float]:
+    """
+    Validate a Define-XML file in this process and return the timings and the peak RSS.
+
+    :param define_file: path and filename of the Define-XML file
+    :param engine: "xmlschema" or "lxml"
+    :param stream_threshold: streaming threshold passed to DefineValidator
+    """
+    from define_validator import DefineValidator
+    start = time.perf_counter()
+    result = DefineValidator(engine=engine, stream_threshold=stream_threshold).validate(define_file)
+    return {"seconds": time.perf_counter() - start, "schema_load": result["seconds"]["schema_load"],
+            "valid": result["valid"], "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def run(define_file: str, engine: str, stream_threshold: int | None) -> dict[str, float]:
+    """run measure() in a new process and return its result"""
+    output = subprocess.run([sys.executable, __file__, "--measure", define_file, engine, json.dumps(stream_threshold)],
+                            check=True, capture_output=True, text=True, cwd=ROOT).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--measure"]:
+        print(json.dumps(measure(sys.argv[2], sys.argv[3], json.loads(sys.argv[4]))))
+        return
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--define", help="path and file name of the Define-XML file to validate (default: "
+                        "generate one from a synthetic DDS)", dest="define_file")
+    for param, default in DEFAULTS.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                            help=f"synthetic DDS: number of {param.replace('_', ' ')} (default: {default})")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        define_file = args.define_file
+        if not define_file:
+            from define_generator import DefineGenerator
+            dds_file = str(Path(tmp) / "synthetic.json")
+            define_file = str(Path(tmp) / "synthetic.xml")
+            write_dds(dds_file, **{param: getattr(args, param) for param in DEFAULTS})
+            DefineGenerator(dds_file, define_file, log_level="WARNING", backend="fast").create()
+        print(f"{define_file}: {Path(define_file).stat().st_size / (1024 * 1024):.1f} MB")
+        for mode, (engine, stream_threshold) in MODES.items():
+            result = run(define_file, engine, stream_threshold)
+            print(f"{mode:18} {result['seconds']:8.3f} s (schema load {result['schema_load']:.3f} s)  "
+                  f"peak RSS {result['peak_mb']:8.1f} MB  valid {result['valid']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+synthetic_dds.py - generate a synthetic DDS JSON file of any size for benchmarking the Define-XML generator.
+Example Cmd-line Args:
+    example: python benchmarks/synthetic_dds.py -o ./synthetic.json --datasets 200 --variables 40 --codelists 500
+
+The content follows the structure of data/define-360i.json: each dataset has the usual identifier variables, a test
+code and a result variable, and filler variables. Variable names are not prefixed with the dataset name so that they
+stay valid SAS names for any number of datasets. Every third variable references a codelist. Each VLM slice is a value
+list for the result variable. Each slice item has a where clause on the dataset's test code. The
+conditions and where clauses are shared across the datasets in round-robin order. The same parameters always produce the
+same file.
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+DEFAULTS: dict[str, int] = {
+    "datasets": 15,
+    "variables": 20,
+    "codelists": 46,
+    "terms": 10,
+    "slices": 1,
+    "slice_items": 4,
+    "conditions": 142,
+    "where_clauses": 187,
+    "term_pool": 0,
+}
+IDENTIFIERS: list[tuple[str, str, str]] = [
+    ("STUDYID", "Study Identifier", "text"),
+    ("DOMAIN", "Domain Abbreviation", "text"),
+    ("USUBJID", "Unique Subject Identifier", "text"),
+    ("SEQ", "Sequence Number", "integer"),
+    ("TESTCD", "Test Short Name", "text"),
+    ("ORRES", "Result or Finding in Original Units", "text"),
+]
+
+
+def generate_dds(datasets: int = DEFAULTS["datasets"], variables: int = DEFAULTS["variables"],
+                 codelists: int = DEFAULTS["codelists"], terms: int = DEFAULTS["terms"],
+                 slices: int = DEFAULTS["slices"], slice_items: int = DEFAULTS["slice_items"],
+                 conditions: int = DEFAULTS["conditions"], where_clauses: int = DEFAULTS["where_clauses"],
+                 term_pool: int = DEFAULTS["term_pool"]) -> dict[str, Any]:
+    """
+    Create a synthetic DDS.
+
+    :param datasets: number of datasets in itemGroups
+    :param variables: number of variables per dataset (at least the 6 identifier, test code and result variables)
+    :param codelists: number of codelists
+    :param terms: number of terms per codelist
+    :param slices: number of VLM slices (value lists) per dataset
+    :param slice_items: number of value level items per slice
+    :param conditions: number of conditions (at least 1 when there are slices)
+    :param where_clauses: number of where clauses (at least 1 when there are slices)
+    :param term_pool: size of a pool of standard terms (e.g. units) that the codelists draw their terms from, so that
+        terms repeat across codelists; 0 gives every codelist its own terms
+    :return: the DDS as a dictionary ready to be written with json.dump
+    """
+    names = [f"D{index:04d}" for index in range(datasets)]
+    return {
+        "OID": "MDV.SYNTHETIC.Version1",
+        "name": "MDV SYNTHETIC",
+        "description": "Synthetic data definitions for benchmarking",
+        "fileOID": "ODM.DEFINE.SYNTHETIC.Version1",
+        "creationDateTime": "2025-01-01T00:00:00+00:00",
+        "odmVersion": "1.3.2",
+        "fileType": "Snapshot",
+        "originator": "synthetic_dds.py",
+        "context": "Other",
+        "defineVersion": "2.1.0",
+        "studyOID": "ODM.SYNTHETIC",
+        "studyName": "SYNTHETIC",
+        "studyDescription": "Synthetic study",
+        "protocolName": "SYNTHETIC",
+        "itemGroups": [_dataset(index, name, variables, codelists, slices, slice_items, where_clauses)
+                       for index, name in enumerate(names)],
+        "conditions": [_condition(index, names, terms) for index in range(conditions)] if names else [],
+        "whereClauses": [{"OID": f"WC.{index:06d}", "conditions": [f"COND.{index % conditions:06d}"]}
+                         for index in range(where_clauses)] if conditions else [],
+        "codeLists": [_codelist(index, terms, term_pool) for index in range(codelists)],
+        "methods": [],
+        "standards": [{"OID": "ST.SDTMIG", "name": "SDTMIG", "type": "IG", "version": "3.4", "status": "FINAL"},
+                      {"OID": "ST.SDTMCT", "name": "CDISC/NCI", "type": "CT", "version": "2025-03-28",
+                       "status": "FINAL", "publishingSet": "SDTM"}],
+        "annotatedCRF": [],
+        "concepts": [],
+        "conceptProperties": [],
+    }
+
+
+def write_dds(dds_file: str, **params: int) -> dict[str, int]:
+    """
+    Generate a synthetic DDS and write it to a JSON file.
+
+    :param dds_file: path and filename of the DDS JSON file to create
+    :param params: generate_dds parameters; defaults are used for the parameters not given
+    :return: the parameters used, for recording with benchmark results
+    """
+    params = {**DEFAULTS, **params}
+    Path(dds_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(dds_file, "w") as f:
+        json.dump(generate_dds(**params), f, indent=2)
+    return params
+
+
+def _dataset(index: int, name: str, variables: int, codelists: int, slices: int, slice_items: int,
+             where_clauses: int) -> dict[str, Any]:
+    items = [_variable(name, variable, label, data_type) for variable, label, data_type in IDENTIFIERS]
+    items.extend(_variable(name, f"V{number:04d}", f"Variable {number}", "text")
+                 for number in range(len(items), max(variables, len(items))))
+    if codelists:
+        for number, item in enumerate(items[len(IDENTIFIERS) - 2:]):
+            if number % 3 == 0:
+                item["codeList"] = f"CL.C{(index + number) % codelists:05d}"
+    dataset = {
+        "OID": f"IG.{name}",
+        "name": name,
+        "description": f"Synthetic dataset {index}",
+        "domain": name,
+        "purpose": "Tabulation",
+        "structure": "One record per subject per test",
+        "isReferenceData": False,
+        "wasDerivedFrom": "ST.SDTMIG",
+        "items": items,
+    }
+    if slices and where_clauses:
+        dataset["slices"] = [_slice(index, name, number, slice_items, where_clauses) for number in range(slices)]
+    return dataset
+
+
+def _variable(dataset: str, name: str, label: str, data_type: str) -> dict[str, Any]:
+    return {"OID": f"IT.{dataset}.{name}", "mandatory": name in ("STUDYID", "DOMAIN", "USUBJID"), "name": name,
+            "description": label, "role": "Identifier", "dataType": data_type, "length": 20}
+
+
+def _slice(index: int, name: str, number: int, slice_items: int, where_clauses: int) -> dict[str, Any]:
+    variable = "ORRES" if number == 0 else f"ORRES{number}"
+    items = []
+    for item_number in range(slice_items):
+        wc_index = (index * slice_items + number * 7 + item_number) % where_clauses
+        items.append({
+            "OID": f"IT.{name}.{variable}.T{item_number:03d}",
+            "mandatory": False,
+            "name": "ORRES",
+            "dataType": "float",
+            "applicableWhen": [f"WC.{wc_index:06d}"],
+            "format": "8.2",
+            "significantDigits": 2,
+            "origin": {"type": "Collected", "source": "Investigator"},
+        })
+    return {"OID": f"VL.{name}.{variable}", "name": f"VL_{name}_{variable}", "type": "ValueList", "items": items}
+
+
+def _condition(index: int, names: list[str], terms: int) -> dict[str, Any]:
+    name = names[index % len(names)]
+    return {"OID": f"COND.{index:06d}",
+            "rangeChecks": [{"comparator": "EQ", "checkValues": [f"TERM{index % max(terms, 1):04d}"],
+                             "item": f"IT.{name}.TESTCD", "softHard": "Soft"}]}
+
+
+def _codelist(index: int, terms: int, term_pool: int) -> dict[str, Any]:
+    if term_pool:
+        pooled = sorted({(index * 7 + term) % term_pool for term in range(terms)})
+        items = [{"codedValue": f"U{term:05d}", "decode": f"Standard term {term}", "nciTermCode": f"C{100000 + term}"}
+                 for term in pooled]
+    else:
+        items = [{"codedValue": f"T{index:05d}{term:04d}", "decode": f"Term {term} of codelist {index}"}
+                 for term in range(terms)]
+    return {"OID": f"CL.C{index:05d}", "name": f"Codelist {index}", "dataType": "text", "codeListItems": items}
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the synthetic DDS generator.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output", help="path and file name of the DDS JSON file to create", required=True,
+                        dest="dds_file")
+    for param, default in DEFAULTS.items():
+        parser.add_argument(f"--{param.replace('_', '-')}", type=int, default=default, dest=param,
+                            help=f"number of {param.replace('_', ' ')} (default: {default})")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = set_cmd_line_args()
+    params = write_dds(args.dds_file, **{param: getattr(args, param) for param in DEFAULTS})
+    print(f"{args.dds_file}: {params}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from typing import Any
-from odmlib.define_2_1 import model as DEFINE
 import define_object
+from term_table import TermTable, get_term_table
 
 
 class CodeLists(define_object.DefineObject):
@@ -9,6 +9,7 @@ class CodeLists(define_object.DefineObject):
     def __init__(self) -> None:
         super().__init__()
         self.igd: Any | None = None
+        self.terms: TermTable = TermTable()
 
     def create_define_objects(
         self,
@@ -26,6 +27,8 @@ class CodeLists(define_object.DefineObject):
         :param acrf: part of the common interface but not used by this class
         """
         self.lang = lang
+        self.set_model(define_objects)
+        self.terms = get_term_table(define_objects)
         define_objects["CodeList"] = []
         for cl in template:
             # TODO template missing the NCI c-codes for codelists and terms
@@ -40,19 +43,18 @@ class CodeLists(define_object.DefineObject):
             if len(cl["codeListItems"]) == 0:
                 self._create_external_code_list(cl_defn, cl)
             self._add_codelist_to_objects(cl_c_code, cl_defn, define_objects)
+        # the codelists hold the shared terms; the table is not needed once the section is loaded
+        self.terms.release()
 
-    @staticmethod
-    def _create_external_code_list(cl, obj):
+    def _create_external_code_list(self, cl, obj):
         # TODO temp to create the external codelist content
         attr = {"Dictionary": obj["name"], "Version": "1.0", "href": "https://www.iso.org"}
-        exd = DEFINE.ExternalCodeList(**attr)
+        exd = self.model.ExternalCodeList(**attr)
         cl.ExternalCodeList = exd
 
-    @staticmethod
-    def _add_codelist_to_objects(cl_c_code, cl, objects):
+    def _add_codelist_to_objects(self, cl_c_code, cl, objects):
         if cl_c_code:
-            alias = DEFINE.Alias(Context="nci:ExtCodeID", Name=cl_c_code)
-            cl.Alias.append(alias)
+            cl.Alias.append(self._get_alias_object(cl_c_code))
         # add the code list to the list of code list define_objects
         if cl:
             objects["CodeList"].append(cl)
@@ -68,36 +70,44 @@ class CodeLists(define_object.DefineObject):
             attr["IsNonStandard"] = obj["isNonStandard"]
         if obj.get("standardOID"):
             attr["StandardOID"] = obj["standardOID"]
-        cl = DEFINE.CodeList(**attr)
+        cl = self.model.CodeList(**attr)
         return cl
 
-    @staticmethod
-    def _create_enumerateditem_object(obj):
+    def _create_enumerateditem_object(self, obj):
         attr = {"CodedValue": obj["Term"]}
         if obj.get("Order"):
             attr["OrderNumber"] = obj["Order"]
-        en_item = DEFINE.EnumeratedItem(**attr)
+        en_item = self.model.EnumeratedItem(**attr)
         if obj.get("NCI Term Code"):
-            alias = DEFINE.Alias(Context="nci:ExtCodeID", Name=obj["NCI Term Code"])
+            alias = self.model.Alias(Context="nci:ExtCodeID", Name=obj["NCI Term Code"])
             en_item.Alias.append(alias)
         return en_item
 
     def _create_codelistitem_object(self, obj):
+        """
+        return the CodeListItem for a term, shared with every other codelist that has an identical term
+        """
         coded_value = self.require_key(obj, "codedValue", "CodeListItem")
+        # assumption: if no decode for this term the use the submission value
+        decode = obj.get("decode", None) or coded_value
+        key = ("CodeListItem", coded_value, obj.get("order") or None, decode, obj.get("nciTermCode") or None)
+        return self.terms.intern(key, self._build_codelistitem_object, coded_value, decode, obj)
+
+    def _build_codelistitem_object(self, coded_value, decode, obj):
         attr = {"CodedValue": coded_value}
         if obj.get("order"):
             attr["OrderNumber"] = obj["order"]
-        cl_item = DEFINE.CodeListItem(**attr)
-        decode = DEFINE.Decode()
-        if obj.get("decode", None):
-            tt = DEFINE.TranslatedText(_content=obj["decode"], lang="en")
-        else:
-            # assumption: if no decode for this term the use the submission value
-            tt = DEFINE.TranslatedText(_content=coded_value, lang="en")
-        decode.TranslatedText.append(tt)
-        cl_item.Decode = decode
+        cl_item = self.model.CodeListItem(**attr)
+        cl_item.Decode = self.terms.intern(("Decode", decode), self._build_decode_object, decode)
         # TODO NCI c-codes for terms or codelists not available in template
         if obj.get("nciTermCode"):
-            alias = DEFINE.Alias(Context="nci:ExtCodeID", Name=obj["nciTermCode"])
-            cl_item.Alias.append(alias)
+            cl_item.Alias.append(self._get_alias_object(obj["nciTermCode"]))
         return cl_item
+
+    def _build_decode_object(self, text):
+        decode = self.model.Decode()
+        decode.TranslatedText.append(self.model.TranslatedText(_content=text, lang="en"))
+        return decode
+
+    def _get_alias_object(self, c_code):
+        return self.terms.intern(("Alias", c_code), self.model.Alias, Context="nci:ExtCodeID", Name=c_code)
@@ -18,9 +18,8 @@ class Conditions(define_object.DefineObject):
         conditions = []
         # store the conditions in define_objects for use when generating WhereClauseDef
         for condition in template:
-            rc = self._create_condition(condition)
-            conditions.append({rc["OID"]: rc})
-        # store in define_objects with underscore prefix to indicate internal use
+            conditions.append(self._create_condition(condition))
+        # store in define_objects with underscore prefix to indicate internal use; the registry indexes them by OID
         define_objects["_conditions"] = conditions
 
     @staticmethod
@@ -19,6 +19,9 @@ DEFAULT_LANGUAGE: str = "en"
 LEAF_PREFIX: str = "LF."
 ACRF_LEAF_ID: str = "LF.acrf"
 
+# Version of the generator; stored with cached output so that a new version invalidates the cache
+TOOL_VERSION: str = "0.3.0"
+
 # Default file names
 DEFAULT_ACRF_FILENAME: str = "acrf.pdf"
 DEFAULT_OUTPUT_FILE: str = "./data/define-360i.xml"
@@ -0,0 +1,243 @@
+"""
+dds_reader.py - incrementally read the top-level sections of a DDS JSON file.
+
+The DDS JSON file is a single object whose list-valued sections (itemGroups, conditions, whereClauses, codeLists, ...)
+can be very large. DDSReader walks the top-level object and hands each list section back as a SectionStream that
+decodes one element (dataset, codelist, condition, ...) at a time, so only the element being loaded is held in memory.
+
+load_dds() parses the whole file at once for the json.load ingestion path. The file is memory-mapped and handed to the
+fastest JSON parser installed. orjson, an optional dependency, parses the mapped bytes directly; the standard library
+json module is the fallback. Both raise json.JSONDecodeError with the line and column of an error.
+"""
+import gc
+import json
+import logging
+import mmap
+import time
+from typing import Any, Callable, Iterator
+
+CHUNK_SIZE: int = 1 << 16
+WHITESPACE: str = " \t\n\r"
+# JSON parsers in order of preference, by name; "auto" selects the first one that is installed
+PARSERS: tuple[str, ...] = ("orjson", "json")
+
+
+def json_parser(name: str = "auto") -> tuple[str, Callable[[memoryview], Any]]:
+    """
+    Return a JSON parser that decodes the UTF-8 bytes of a DDS file.
+
+    :param name: "orjson", "json" or "auto" for the fastest parser installed
+    :return: (parser name, function that parses a bytes-like object)
+    :raises ValueError: if the parser is unknown or is not installed
+    """
+    if name == "auto":
+        for parser in PARSERS:
+            try:
+                return json_parser(parser)
+            except ValueError:
+                continue
+    if name == "orjson":
+        try:
+            import orjson
+        except ImportError:
+            raise ValueError("The orjson JSON parser is not installed.") from None
+        return name, orjson.loads
+    if name == "json":
+        return name, lambda data: json.loads(str(data, "utf-8"))
+    raise ValueError(f"Unknown JSON parser {name}; expected auto or one of {', '.join(PARSERS)}")
+
+
+def load_dds(dds_file: str, parser: str = "auto") -> Any:
+    """
+    Parse a DDS JSON file through a memory-mapped buffer, logging the parser used and the parse time.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param parser: JSON parser name passed to json_parser()
+    :return: the parsed DDS content
+    :raises json.JSONDecodeError: with the line number in the file when the JSON is invalid
+    """
+    name, loads = json_parser(parser)
+    start = time.perf_counter()
+    # the collector would otherwise run repeatedly over the objects created while parsing, none of which are garbage
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(dds_file, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # an empty file cannot be mapped
+                content = loads(memoryview(f.read()))
+            else:
+                with mapped, memoryview(mapped) as view:
+                    content = loads(view)
+    finally:
+        if enabled:
+            gc.enable()
+    logging.info(f"parsed {dds_file} with {name} in {time.perf_counter() - start:.3f} s")
+    return content
+
+
+class SectionStream:
+    """Iterator over the elements of a list-valued DDS section, decoded one element at a time."""
+
+    def __init__(self, reader: "DDSReader", section: str) -> None:
+        self.reader: DDSReader = reader
+        self.section: str = section
+        self.exhausted: bool = False
+        self._first: bool = True
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        if self.exhausted:
+            raise StopIteration
+        item = self.reader._next_array_item(self._first)
+        self._first = False
+        if item is self.reader.END:
+            self.exhausted = True
+            raise StopIteration
+        return item
+
+    def drain(self) -> None:
+        """Skip any elements the consumer did not read so the reader can move on to the next section."""
+        for _ in self:
+            pass
+
+
+class DDSReader:
+    """Incremental reader for the top-level sections of a DDS JSON file."""
+
+    END = object()
+
+    def __init__(self, dds_file: str, chunk_size: int = CHUNK_SIZE) -> None:
+        """
+        :param dds_file: path and filename of the DDS JSON file
+        :param chunk_size: number of characters read from the file at a time
+        """
+        self.dds_file: str = dds_file
+        self.chunk_size: int = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._fh = None
+        self._buf: str = ""
+        self._pos: int = 0
+        self._eof: bool = False
+        self._lines: int = 0
+        self._offset: int = 0
+        self._column: int = 0
+
+    def sections(self) -> Iterator[tuple[str, Any]]:
+        """
+        Yield (section, value) pairs in file order. List-valued sections are yielded as a SectionStream that must be
+        consumed before the next section is read; any elements left unread are skipped.
+
+        :raises json.JSONDecodeError: with the line number in the file when the JSON is invalid
+        """
+        with open(self.dds_file, "r") as self._fh:
+            self._expect("{")
+            if self._peek() == "}":
+                self._pos += 1
+            else:
+                while True:
+                    key = self._decode()
+                    if not isinstance(key, str):
+                        self._error("Expecting property name enclosed in double quotes")
+                    self._expect(":")
+                    if self._peek() == "[":
+                        self._pos += 1
+                        stream = SectionStream(self, key)
+                        yield key, stream
+                        stream.drain()
+                    else:
+                        yield key, self._decode()
+                    if self._delimiter("}"):
+                        break
+            if self._peek() != "":
+                self._error("Extra data")
+
+    def _next_array_item(self, first: bool) -> Any:
+        """return the next element of the current array or END after the closing bracket has been consumed"""
+        if first:
+            if self._peek() == "]":
+                self._pos += 1
+                return self.END
+        elif self._delimiter("]"):
+            return self.END
+        return self._decode()
+
+    def _delimiter(self, closing: str) -> bool:
+        """consume a ',' or the closing character; return True if the closing character was found"""
+        char = self._peek()
+        self._pos += 1
+        if char == closing:
+            return True
+        if char != ",":
+            self._pos -= 1
+            self._error("Expecting ',' delimiter")
+        return False
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            self._error(f"Expecting '{char}' delimiter" if char == ":" else "Expecting value")
+        self._pos += 1
+
+    def _peek(self) -> str:
+        """skip whitespace and return the next character without consuming it ('' at end of file)"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._read():
+                return self._buf[self._pos:self._pos + 1]
+
+    def _decode(self) -> Any:
+        """decode the JSON value at the current position, reading more of the file until it is complete"""
+        self._peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if not self._read(size):
+                    raise self._relocate(e)
+            else:
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self._buf) or not self._read(size):
+                    self._pos = end
+                    return obj
+            size *= 2
+
+    def _read(self, size: int | None = None) -> bool:
+        """append the next chunk of the file to the buffer, discarding the text already consumed"""
+        if self._eof:
+            return False
+        chunk = self._fh.read(size or self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        cut = self._pos
+        if cut:
+            newlines = self._buf.count("\n", 0, cut)
+            if newlines:
+                self._lines += newlines
+                self._column = cut - self._buf.rfind("\n", 0, cut) - 1
+            else:
+                self._column += cut
+            self._offset += cut
+            self._buf = self._buf[cut:]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def _error(self, msg: str) -> None:
+        raise self._relocate(json.JSONDecodeError(msg, self._buf, self._pos))
+
+    def _relocate(self, e: json.JSONDecodeError) -> json.JSONDecodeError:
+        """adjust a decode error raised against the buffer to its position in the file"""
+        error = json.JSONDecodeError(e.msg, e.doc, e.pos)
+        if error.lineno == 1:
+            error.colno += self._column
+        error.pos += self._offset
+        error.lineno += self._lines
+        error.args = (f"{error.msg}: line {error.lineno} column {error.colno} (char {error.pos})",)
+        return error
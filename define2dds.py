@@ -0,0 +1,394 @@
+"""
+define2dds.py - convert a Define-XML v2.1 file into a DDS JSON file that define_generator.py can read.
+Example Cmd-line Args:
+    example: python define2dds.py -d ./data/define-360i.xml -t ./data/define-360i-from-xml.json
+
+The Define-XML file is read with lxml iterparse and each definition is cleared as soon as it has been converted, so the
+document tree is never built. The DDS sections are written in the order define_generator.py expects, but in the
+Define-XML file the ItemDefs come after the ItemGroupDefs that reference them. The converted datasets, variables, value
+lists and other sections are therefore spooled to temporary files as JSON lines. Only the file offsets of the ItemDefs
+and ValueListDefs are held in memory. The DDS JSON file is then written one dataset, codelist, condition and where clause
+at a time.
+
+The DDS keys are the ones the loaders read, so converting a Define-XML file and generating it again produces the same
+definitions (see define_diff.py). Content the loaders cannot create is not converted: CommentDef, leaf and
+SupplementalDoc elements and the ItemGroupDef leaf. EnumeratedItems are converted to terms with no decode, and an
+ExternalCodeList to a codelist with no terms.
+"""
+import argparse
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, IO, Iterator
+from lxml import etree
+
+ODM_NS: str = "http://www.cdisc.org/ns/odm/v1.3"
+DEF_NS: str = "http://www.cdisc.org/ns/def/v2.1"
+# study-level DDS keys and the (element, attribute or child element) they come from, in DDS order
+HEADER: dict[str, tuple[str, str]] = {
+    "OID": ("MetaDataVersion", "OID"), "name": ("MetaDataVersion", "Name"),
+    "description": ("MetaDataVersion", "Description"), "fileOID": ("ODM", "FileOID"),
+    "creationDateTime": ("ODM", "CreationDateTime"), "odmVersion": ("ODM", "ODMVersion"),
+    "fileType": ("ODM", "FileType"), "originator": ("ODM", "Originator"), "context": ("ODM", "Context"),
+    "defineVersion": ("MetaDataVersion", "DefineVersion"), "studyOID": ("Study", "OID"),
+    "studyName": ("GlobalVariables", "StudyName"), "studyDescription": ("GlobalVariables", "StudyDescription"),
+    "protocolName": ("GlobalVariables", "ProtocolName"),
+}
+# DDS list sections written after the study-level keys
+SECTIONS: list[str] = ["itemGroups", "conditions", "whereClauses", "codeLists", "methods", "standards"]
+# elements converted when their end tag is read
+CONVERTED: list[str] = [f"{{{ODM_NS}}}{name}" for name in ("StudyName", "StudyDescription", "ProtocolName",
+                                                             "ItemGroupDef", "ItemDef", "CodeList", "MethodDef")] + \
+                       [f"{{{DEF_NS}}}{name}" for name in ("Standard", "ValueListDef", "WhereClauseDef")]
+# elements whose attributes are read from their start tag
+HEADER_ELEMENTS: list[str] = [f"{{{ODM_NS}}}{name}" for name in ("ODM", "Study", "MetaDataVersion")]
+NCI_CODE_CONTEXT: str = "nci:ExtCodeID"
+
+
+class JSONSpool:
+    """JSON lines in a temporary file, read back in order or by key."""
+
+    def __init__(self) -> None:
+        self.file: IO[bytes] = tempfile.TemporaryFile()
+        self.offsets: dict[str, tuple[int, int]] = {}
+        self.count: int = 0
+
+    def append(self, obj: Any, key: str | None = None) -> None:
+        """
+        Spool one object.
+
+        :param obj: JSON serializable object
+        :param key: key to read the object back with get(); the last object spooled with a key wins
+        """
+        line = json.dumps(obj).encode("utf-8") + b"\n"
+        offset = self.file.seek(0, 2)
+        self.file.write(line)
+        if key is not None:
+            self.offsets[key] = (offset, len(line))
+        self.count += 1
+
+    def get(self, key: str) -> Any | None:
+        """return the object spooled with a key, or None"""
+        if key not in self.offsets:
+            return None
+        offset, length = self.offsets[key]
+        self.file.seek(offset)
+        return json.loads(self.file.read(length))
+
+    def __iter__(self) -> Iterator[Any]:
+        self.file.seek(0)
+        position = 0
+        while True:
+            self.file.seek(position)
+            line = self.file.readline()
+            if not line:
+                return
+            position = self.file.tell()
+            # the caller may read other objects with get() between iterations
+            yield json.loads(line)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class DefineToDDSConverter:
+    """Convert a Define-XML file into DDS JSON one definition at a time."""
+
+    def __init__(self, define_file: str | Path | IO[bytes]) -> None:
+        """
+        :param define_file: path and filename of the Define-XML file, or a binary file object
+        """
+        self.define_file: str | Path | IO[bytes] = define_file
+        self.header: dict[str, Any] = {}
+        self._header_source: dict[str, dict[str, str]] = {}
+        self.spools: dict[str, JSONSpool] = {}
+        # ValueListDef OIDs in document order and the ItemDef that refers to each with a ValueListRef
+        self.value_lists: list[str] = []
+        self.value_list_parents: dict[str, str] = {}
+        self.counts: dict[str, int] = {}
+
+    def convert(self, dds_file: str | Path | IO[str]) -> dict[str, int]:
+        """
+        Convert the Define-XML file and write the DDS JSON.
+
+        :param dds_file: path and filename of the DDS JSON file to create, or a text file object
+        :return: the number of elements written to each DDS section
+        """
+        self.spools = {name: JSONSpool() for name in SECTIONS + ["ItemDef", "ValueListDef"]}
+        try:
+            self._read()
+            if isinstance(dds_file, (str, Path)):
+                with open(dds_file, "w", encoding="utf-8") as fh:
+                    self._write(fh)
+            else:
+                self._write(dds_file)
+        finally:
+            for spool in self.spools.values():
+                spool.close()
+        return self.counts
+
+    def _read(self) -> None:
+        """stream the Define-XML file, converting and spooling each definition as its end tag is read"""
+        handlers = {
+            "ItemGroupDef": self._item_group, "ItemDef": self._item, "CodeList": self._codelist,
+            "ValueListDef": self._value_list, "WhereClauseDef": self._where_clause, "MethodDef": self._method,
+            "Standard": self._standard,
+        }
+        for event, elem in etree.iterparse(self.define_file, events=("start", "end"), tag=HEADER_ELEMENTS + CONVERTED,
+                                           huge_tree=True):
+            name = etree.QName(elem).localname
+            if event == "start":
+                if elem.tag in HEADER_ELEMENTS:
+                    self._header_source[name] = _attributes(elem)
+                continue
+            if name in handlers:
+                handlers[name](elem)
+            elif elem.tag in CONVERTED:
+                self._header_source.setdefault("GlobalVariables", {})[name] = elem.text or ""
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        for key, (element, attribute) in HEADER.items():
+            value = self._header_source.get(element, {}).get(attribute)
+            if value is not None:
+                self.header[key] = value
+
+    def _write(self, fh: IO[str]) -> None:
+        """
+        write the DDS JSON one spooled element at a time, with each dataset, condition, codelist, ... on one line, as
+        indenting the elements would take longer than the rest of the conversion
+        """
+        fh.write("{")
+        separator = "\n"
+        for key, value in self.header.items():
+            fh.write(f"{separator}  {json.dumps(key)}: {json.dumps(value)}")
+            separator = ",\n"
+        for section in SECTIONS:
+            fh.write(f"{separator}  {json.dumps(section)}: [")
+            separator = ",\n"
+            elements = self._datasets() if section == "itemGroups" else iter(self.spools[section])
+            count = 0
+            for element in elements:
+                fh.write(f"{',' if count else ''}\n    {json.dumps(element)}")
+                count += 1
+            fh.write("\n  ]" if count else "]")
+            self.counts[section] = count
+        fh.write("\n}\n")
+
+    def _datasets(self) -> Iterator[dict[str, Any]]:
+        """join each spooled dataset with its variables and value lists"""
+        owners = self._value_list_owners()
+        for dataset in self.spools["itemGroups"]:
+            dataset["items"] = [self._join_item(ref) for ref in dataset["items"]]
+            slices = [self._slice(oid) for oid in self.value_lists if owners.get(oid) == dataset["OID"]]
+            if slices:
+                dataset["slices"] = slices
+            yield dataset
+
+    def _value_list_owners(self) -> dict[str, str]:
+        """
+        return the OID of the dataset each value list belongs to: the dataset of the ItemDef with the ValueListRef, or
+        the dataset named in a VL.<dataset>.<variable> OID when no ItemDef refers to the value list
+        """
+        owners = {}
+        parents = {}
+        for oid, item_oid in self.value_list_parents.items():
+            parents.setdefault(item_oid, []).append(oid)
+        names = {}
+        for dataset in self.spools["itemGroups"]:
+            names[dataset["name"]] = dataset["OID"]
+            for ref in dataset["items"]:
+                for oid in parents.get(ref["OID"], []):
+                    owners.setdefault(oid, dataset["OID"])
+        for oid in self.value_lists:
+            if oid not in owners:
+                parts = oid.split(".")
+                if len(parts) > 2 and parts[1] in names:
+                    owners[oid] = names[parts[1]]
+                else:
+                    logging.warning(f"define2dds: ValueListDef {oid} is not used by any dataset and is not converted")
+        return owners
+
+    def _slice(self, oid: str) -> dict[str, Any]:
+        refs = self.spools["ValueListDef"].get(oid)
+        return {"OID": oid, "name": oid.replace(".", "_"), "type": "ValueList",
+                "items": [self._join_item(ref) for ref in refs]}
+
+    def _join_item(self, ref: dict[str, Any]) -> dict[str, Any]:
+        """return a variable with its ItemRef and ItemDef properties"""
+        item = self.spools["ItemDef"].get(ref["OID"])
+        if item is None:
+            logging.warning(f"define2dds: ItemRef {ref['OID']} does not match any ItemDef")
+            return ref
+        return {"OID": ref["OID"], **{key: value for key, value in ref.items() if key != "OID"}, **item}
+
+    def _item_group(self, elem: etree._Element) -> None:
+        attrs = _attributes(elem)
+        dataset = {"OID": attrs["OID"], "name": attrs.get("Name"), "description": _description(elem)}
+        _copy(attrs, dataset, {"Domain": "domain", "Purpose": "purpose", "Structure": "structure",
+                               "IsReferenceData": "isReferenceData", "SASDatasetName": "sasDatasetName",
+                               "CommentOID": "comment", "IsNonStandard": "isNonStandard", "HasNoData": "hasNoData",
+                               "StandardOID": "wasDerivedFrom"})
+        if attrs.get("Repeating"):
+            dataset["repeating"] = attrs["Repeating"] == "Yes"
+        if attrs.get("ArchiveLocationID"):
+            dataset["archiveLocationID"] = attrs["ArchiveLocationID"].removeprefix("LF.")
+        item_class = elem.find(f"{{{DEF_NS}}}Class")
+        if item_class is not None:
+            dataset["class"] = item_class.get("Name")
+        dataset["items"] = [_item_ref(ref) for ref in elem.iterchildren(f"{{{ODM_NS}}}ItemRef")]
+        self.spools["itemGroups"].append(dataset)
+
+    def _item(self, elem: etree._Element) -> None:
+        attrs = _attributes(elem)
+        item = {"name": attrs.get("Name")}
+        description = _description(elem)
+        if description is not None:
+            item["description"] = description
+        item["dataType"] = attrs.get("DataType")
+        _copy(attrs, item, {"Length": "length", "SignificantDigits": "significantDigits"}, int)
+        _copy(attrs, item, {"DisplayFormat": "format", "CommentOID": "comment"})
+        codelist_ref = elem.find(f"{{{ODM_NS}}}CodeListRef")
+        if codelist_ref is not None:
+            item["codeList"] = codelist_ref.get("CodeListOID")
+        origin = elem.find(f"{{{DEF_NS}}}Origin")
+        if origin is not None:
+            item["origin"] = {key: value for key, value in (("type", origin.get("Type")),
+                                                           ("source", origin.get("Source"))) if value}
+            predecessor = _description(origin)
+            if predecessor is not None:
+                item["predecessor"] = predecessor
+            page_ref = origin.find(f"{{{DEF_NS}}}DocumentRef/{{{DEF_NS}}}PDFPageRef")
+            if page_ref is not None and page_ref.get("PageRefs"):
+                item["pages"] = page_ref.get("PageRefs")
+        value_list_ref = elem.find(f"{{{DEF_NS}}}ValueListRef")
+        if value_list_ref is not None:
+            self.value_list_parents[value_list_ref.get("ValueListOID")] = attrs["OID"]
+        self.spools["ItemDef"].append(item, key=attrs["OID"])
+
+    def _value_list(self, elem: etree._Element) -> None:
+        refs = []
+        for ref in elem.iterchildren(f"{{{ODM_NS}}}ItemRef"):
+            item_ref = _item_ref(ref)
+            item_ref["applicableWhen"] = [where.get("WhereClauseOID")
+                                          for where in ref.iterchildren(f"{{{DEF_NS}}}WhereClauseRef")]
+            refs.append(item_ref)
+        self.value_lists.append(elem.get("OID"))
+        self.spools["ValueListDef"].append(refs, key=elem.get("OID"))
+
+    def _where_clause(self, elem: etree._Element) -> None:
+        """spool the where clause and one condition with all of its range checks"""
+        oid = elem.get("OID")
+        range_checks = []
+        for range_check in elem.iterchildren(f"{{{ODM_NS}}}RangeCheck"):
+            attrs = _attributes(range_check)
+            range_checks.append({"comparator": attrs.get("Comparator"),
+                                 "checkValues": [value.text or "" for value in
+                                                 range_check.iterchildren(f"{{{ODM_NS}}}CheckValue")],
+                                 "item": attrs.get("ItemOID"), "softHard": attrs.get("SoftHard", "Soft")})
+        condition_oid = f"COND.{oid.removeprefix('WC.')}"
+        self.spools["conditions"].append({"OID": condition_oid, "rangeChecks": range_checks})
+        self.spools["whereClauses"].append({"OID": oid, "conditions": [condition_oid]})
+
+    def _codelist(self, elem: etree._Element) -> None:
+        attrs = _attributes(elem)
+        codelist = {"OID": attrs["OID"], "name": attrs.get("Name"), "dataType": attrs.get("DataType")}
+        _copy(attrs, codelist, {"CommentOID": "comment", "IsNonStandard": "isNonStandard",
+                                "StandardOID": "standardOID"})
+        c_code = _nci_code(elem)
+        if c_code:
+            codelist["nciCodelistCode"] = c_code
+        terms = []
+        for term_elem in elem.iterchildren(f"{{{ODM_NS}}}CodeListItem", f"{{{ODM_NS}}}EnumeratedItem"):
+            term = {"codedValue": term_elem.get("CodedValue")}
+            decode = term_elem.find(f"{{{ODM_NS}}}Decode/{{{ODM_NS}}}TranslatedText")
+            if decode is not None:
+                term["decode"] = decode.text or ""
+            if term_elem.get("OrderNumber"):
+                term["order"] = int(term_elem.get("OrderNumber"))
+            c_code = _nci_code(term_elem)
+            if c_code:
+                term["nciTermCode"] = c_code
+            terms.append(term)
+        codelist["codeListItems"] = terms
+        self.spools["codeLists"].append(codelist)
+
+    def _method(self, elem: etree._Element) -> None:
+        attrs = _attributes(elem)
+        method = {"OID": attrs["OID"], "name": attrs.get("Name"), "type": attrs.get("Type"),
+                  "description": _description(elem) or ""}
+        expression = elem.find(f"{{{ODM_NS}}}FormalExpression")
+        if expression is not None:
+            method["context"] = expression.get("Context")
+            method["code"] = expression.text or ""
+        document_ref = elem.find(f"{{{DEF_NS}}}DocumentRef")
+        if document_ref is not None:
+            method["document"] = document_ref.get("leafID")
+            page_ref = document_ref.find(f"{{{DEF_NS}}}PDFPageRef")
+            method["pages"] = page_ref.get("PageRefs") if page_ref is not None else None
+        self.spools["methods"].append(method)
+
+    def _standard(self, elem: etree._Element) -> None:
+        attrs = _attributes(elem)
+        standard = {"OID": attrs["OID"], "name": attrs.get("Name"), "type": attrs.get("Type"),
+                    "version": attrs.get("Version"), "status": attrs.get("Status")}
+        _copy(attrs, standard, {"PublishingSet": "publishingSet", "CommentOID": "comment"})
+        self.spools["standards"].append(standard)
+
+
+def _attributes(elem: etree._Element) -> dict[str, str]:
+    """return the attributes of an element by local name, e.g. Structure for def:Structure"""
+    return {etree.QName(name).localname: value for name, value in elem.attrib.items()}
+
+
+def _copy(attrs: dict[str, str], target: dict[str, Any], keys: dict[str, str], convert=str) -> None:
+    """copy the attributes that are present to their DDS keys"""
+    for attribute, key in keys.items():
+        if attrs.get(attribute) is not None:
+            target[key] = convert(attrs[attribute])
+
+
+def _description(elem: etree._Element) -> str | None:
+    text = elem.find(f"{{{ODM_NS}}}Description/{{{ODM_NS}}}TranslatedText")
+    return None if text is None else text.text or ""
+
+
+def _nci_code(elem: etree._Element) -> str | None:
+    for alias in elem.iterchildren(f"{{{ODM_NS}}}Alias"):
+        if alias.get("Context") == NCI_CODE_CONTEXT:
+            return alias.get("Name")
+    return None
+
+
+def _item_ref(elem: etree._Element) -> dict[str, Any]:
+    attrs = _attributes(elem)
+    ref = {"OID": attrs["ItemOID"], "mandatory": attrs.get("Mandatory") == "Yes"}
+    _copy(attrs, ref, {"OrderNumber": "order", "KeySequence": "keySequence"}, int)
+    _copy(attrs, ref, {"MethodOID": "method", "Role": "role", "IsNonStandard": "isNonStandard",
+                       "HasNoData": "hasNoData"})
+    return ref
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the Define-XML to DDS JSON converter.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--define", help="path and file name of the Define-XML file to convert", required=True,
+                        dest="define_file")
+    parser.add_argument("-t", "--template", help="path and file name of the DDS JSON file to create", required=True,
+                        dest="dds_file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = set_cmd_line_args()
+    counts = DefineToDDSConverter(args.define_file).convert(args.dds_file)
+    print(f"{args.dds_file}: " + ", ".join(f"{count} {section}" for section, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,101 @@
 import argparse
+import time
+from pathlib import Path
 from lxml import etree
 
+# compiled stylesheets by resolved path, with the modification time and size of the file they were compiled from;
+# compiling is a small part of one rendering, but batch, watch and service runs render many documents in one process and
+# pay it only once
+_TRANSFORMS: dict[str, tuple[tuple[int, int], etree.XSLT]] = {}
+# seconds spent compiling each stylesheet, for reporting
+COMPILE_TIMES: dict[str, float] = {}
+
+
+def get_transform(xsl_path):
+    """
+    Returns the compiled XSLT stylesheet, parsing and compiling it only on the first call for the path in this process
+    and again when the file has changed since it was compiled.
+    Args:
+        xsl_path (str): Path to the XSLT stylesheet file.
+    """
+    key, version = _stylesheet_version(xsl_path)
+    if not _is_compiled(key, version):
+        start = time.perf_counter()
+        _TRANSFORMS[key] = (version, etree.XSLT(etree.parse(key)))
+        COMPILE_TIMES[key] = time.perf_counter() - start
+    return _TRANSFORMS[key][1]
+
+
+def _stylesheet_version(xsl_path):
+    """return the resolved path of a stylesheet and the modification time and size of the file"""
+    path = Path(xsl_path).resolve()
+    stat = path.stat()
+    return str(path), (stat.st_mtime_ns, stat.st_size)
+
+
+def _is_compiled(key, version):
+    """return True if the stylesheet has been compiled from the current version of the file"""
+    return key in _TRANSFORMS and _TRANSFORMS[key][0] == version
+
+
 def transform_xml(xml_path, xsl_path, output_path):
     """
     Transforms an XML file using an XSLT stylesheet.
     Args:
-        xml_path (str): Path to the XML file.
+        xml_path (str): Path to the XML file, or an already parsed lxml tree.
         xsl_path (str): Path to the XSLT stylesheet file.
         output_path (str, optional): Path to save the transformed HTML file.
+    Returns:
+        dict: seconds spent compiling the stylesheet (0 when already compiled), parsing the XML and transforming it.
     """
-    xml_tree = etree.parse(xml_path)
-    xsl_tree = etree.parse(xsl_path)
-    transform = etree.XSLT(xsl_tree)
+    key, version = _stylesheet_version(xsl_path)
+    is_compiled = _is_compiled(key, version)
+    transform = get_transform(xsl_path)
+    timings = {"compile": 0.0 if is_compiled else COMPILE_TIMES[key], "parse": 0.0, "transform": 0.0}
+    start = time.perf_counter()
+    xml_tree = etree.parse(str(xml_path)) if isinstance(xml_path, (str, Path)) else xml_path
+    timings["parse"] = time.perf_counter() - start
+    start = time.perf_counter()
     result_tree = transform(xml_tree)
+    timings["transform"] = time.perf_counter() - start
 
     if output_path:
         with open(output_path, 'wb') as f:
             f.write(etree.tostring(result_tree, pretty_print=True))
     else:
         print(etree.tostring(result_tree, pretty_print=True).decode())
+    return timings
+
+
+def render_html(xml_tree, xsl_path):
+    """
+    Renders an already parsed Define-XML document as HTML in memory.
+    Args:
+        xml_tree: parsed lxml tree of the Define-XML document.
+        xsl_path (str): Path to the XSLT stylesheet file.
+    Returns:
+        bytes: the HTML document.
+    """
+    return etree.tostring(get_transform(xsl_path)(xml_tree), pretty_print=True)
+
+
+def transform_directory(define_dir, xsl_path, output_dir):
+    """
+    Transforms every Define-XML file in a directory, compiling the stylesheet once for the whole batch.
+    Args:
+        define_dir (str): Directory containing the Define-XML files.
+        xsl_path (str): Path to the XSLT stylesheet file.
+        output_dir (str): Directory for the HTML files, named after the Define-XML files.
+    Returns:
+        dict: timings returned by transform_xml for each Define-XML file.
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    results = {}
+    for xml_path in sorted(Path(define_dir).glob("*.xml")):
+        html_path = Path(output_dir).joinpath(xml_path.stem + ".html")
+        results[str(xml_path)] = transform_xml(str(xml_path), xsl_path, str(html_path))
+    return results
+
 
 def set_cmd_line_args():
     """
@@ -26,12 +103,13 @@ def set_cmd_line_args():
     :return: return the argparse template with the command-line parameters
     """
     parser = argparse.ArgumentParser()
-    parser.add_argument("-d", "--define", help="path and file name of Define-XML v2 file to create", required=True,
-                        dest="define_file", default="./data/define-360i.xml")
+    parser.add_argument("-d", "--define", help="path and file name of Define-XML v2 file, or a directory of Define-XML "
+                        "files, to render", required=True, dest="define_file", default="./data/define-360i.xml")
     parser.add_argument("-s", "--stylesheet", help="path and file name of the Define-XML style sheet", required=True,
                         dest="style_sheet", )
-    parser.add_argument("-o", "--output", help="path and file name of Define-XML HTML output", required=False,
-                        dest="output_file", default="./data/define-360i.html")
+    parser.add_argument("-o", "--output", help="path and file name of Define-XML HTML output, or the output directory "
+                        "when rendering a directory", required=False, dest="output_file",
+                        default="./data/define-360i.html")
     parser.add_argument("-v", "--verbose", help="turn on verbose processing", default=False, const=True,
                         nargs='?', dest="is_verbose")
     args = parser.parse_args()
@@ -40,7 +118,15 @@ def set_cmd_line_args():
 
 def main():
     args = set_cmd_line_args()
-    transform_xml(args.define_file, args.style_sheet, args.output_file)
+    if Path(args.define_file).is_dir():
+        results = transform_directory(args.define_file, args.style_sheet, args.output_file)
+    else:
+        results = {args.define_file: transform_xml(args.define_file, args.style_sheet, args.output_file)}
+    if args.is_verbose:
+        for xml_path, timings in results.items():
+            print(f"{xml_path}: parse {timings['parse']:.3f} s, transform {timings['transform']:.3f} s")
+        print(f"stylesheet compile {sum(COMPILE_TIMES.values()):.3f} s, "
+              f"transform {sum(t['transform'] for t in results.values()):.3f} s for {len(results)} file(s)")
 
 if __name__ == "__main__":
     main()
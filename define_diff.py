@@ -0,0 +1,281 @@
+"""
+define_diff.py - report the definitions added, removed and changed between two Define-XML versions.
+Example Cmd-line Args:
+    example: python define_diff.py -o ./defines/define-v1.xml -n ./defines/define-v2.xml
+    JSON report: python define_diff.py -o ./defines/define-v1.xml -n ./defines/define-v2.xml -j ./diff.json
+    DDS inputs: python define_diff.py -o ./specs/define-v1.json -n ./specs/define-v2.json
+
+A text diff of two define.xml files is slow on large files and noisy, since the ODM AsOfDateTime and CreationDateTime
+change on every run and reordering elements shows up as changes. This diff streams both documents with iterparse and
+indexes the ItemGroupDef, ItemDef, CodeList, WhereClauseDef, ValueListDef, MethodDef and CommentDef elements by OID.
+The old document is indexed first. The new document is then compared one definition at a time as it is read, so the
+time is linear in the size of the two files and only the index of the old document is held in memory.
+
+Each definition is compared at two levels: its attributes, and its child elements. Child elements are keyed by the
+attribute that identifies them (ItemRef ItemOID, CodeListItem CodedValue, ...) or by their position among children with
+the same name, and compared as canonical text. DDS JSON inputs (.json) are first generated in memory with the loaders.
+"""
+import argparse
+import io
+import json
+import logging
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, IO, Iterator
+from xml.sax.saxutils import escape
+from lxml import etree
+
+ODM_NS: str = "http://www.cdisc.org/ns/odm/v1.3"
+DEF_NS: str = "http://www.cdisc.org/ns/def/v2.1"
+# prefixes used in the report for the Define-XML namespaces; the ODM namespace is the default
+PREFIXES: dict[str, str] = {ODM_NS: "", DEF_NS: "def:", "http://www.w3.org/1999/xlink": "xlink:",
+                            "http://www.w3.org/XML/1998/namespace": "xml:"}
+# definitions compared by OID, with their qualified tags
+DIFF_ELEMENTS: dict[str, str] = {
+    "ItemGroupDef": f"{{{ODM_NS}}}ItemGroupDef", "ItemDef": f"{{{ODM_NS}}}ItemDef",
+    "CodeList": f"{{{ODM_NS}}}CodeList", "WhereClauseDef": f"{{{DEF_NS}}}WhereClauseDef",
+    "ValueListDef": f"{{{DEF_NS}}}ValueListDef", "MethodDef": f"{{{ODM_NS}}}MethodDef",
+    "CommentDef": f"{{{DEF_NS}}}CommentDef",
+}
+# attributes that identify a child element among its siblings, named with their report prefix (def:ItemOID); other
+# children are keyed by position. Children with the same key values, such as two Aliases with the same Context, are
+# numbered in document order
+CHILD_KEYS: dict[str, tuple[str, ...]] = {
+    "ItemRef": ("ItemOID",), "CodeListItem": ("CodedValue",), "EnumeratedItem": ("CodedValue",),
+    "RangeCheck": ("def:ItemOID", "Comparator"), "Alias": ("Context",),
+}
+# definitions listed by OID in the text summary for each element type and kind of difference
+SUMMARY_LIMIT: int = 20
+_QUOTE = {'"': "&quot;"}
+
+# a definition's attributes and its serialized child elements, by child key
+Definition = tuple[dict[str, str], dict[str, bytes]]
+
+
+def iter_definitions(source: str | Path | IO[bytes]) -> Iterator[tuple[str, str, Definition]]:
+    """
+    Stream a Define-XML document and yield each definition as it is read. Each element is cleared once yielded, so
+    memory use does not grow with the document.
+
+    :param source: path of a Define-XML file or a binary file object
+    :return: (element type, OID, definition) for each definition in document order
+    """
+    names = {tag: name for name, tag in DIFF_ELEMENTS.items()}
+    for _, elem in etree.iterparse(source, events=("end",), tag=list(names), huge_tree=True):
+        yield names[elem.tag], elem.get("OID", ""), _definition(elem)
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+def index_definitions(source: str | Path | IO[bytes]) -> dict[str, dict[str, Definition]]:
+    """
+    Index the definitions of a Define-XML document by element type and OID.
+
+    :param source: path of a Define-XML file or a binary file object
+    """
+    index = {name: {} for name in DIFF_ELEMENTS}
+    for name, oid, definition in iter_definitions(source):
+        if oid in index[name]:
+            logging.warning(f"define_diff: {name} OID {oid} is defined more than once; comparing the last one")
+        index[name][oid] = definition
+    return index
+
+
+def diff_defines(old: str | Path | IO[bytes], new: str | Path | IO[bytes]) -> dict[str, Any]:
+    """
+    Compare two Define-XML documents by OID.
+
+    :param old: path or binary file object of the earlier Define-XML
+    :param new: path or binary file object of the later Define-XML
+    :return: {"summary", "added", "removed", "changed"}; summary has the added, removed, changed and unchanged counts
+        for each element type, and changed lists the attribute and child element differences of each definition
+    """
+    old_index = index_definitions(old)
+    result = {"summary": {name: {"added": 0, "removed": 0, "changed": 0, "unchanged": 0} for name in DIFF_ELEMENTS},
+              "added": [], "removed": [], "changed": []}
+    for name, oid, definition in iter_definitions(new):
+        old_definition = old_index[name].pop(oid, None)
+        if old_definition is None:
+            result["added"].append({"element": name, "OID": oid})
+            result["summary"][name]["added"] += 1
+            continue
+        changes = compare_definitions(old_definition, definition)
+        if changes:
+            result["changed"].append({"element": name, "OID": oid, **changes})
+            result["summary"][name]["changed"] += 1
+        else:
+            result["summary"][name]["unchanged"] += 1
+    # the definitions left in the old index are not in the new document
+    for name, definitions in old_index.items():
+        result["removed"].extend({"element": name, "OID": oid} for oid in definitions)
+        result["summary"][name]["removed"] += len(definitions)
+    return result
+
+
+def compare_definitions(old: Definition, new: Definition) -> dict[str, Any]:
+    """
+    Compare one definition in two versions.
+
+    :param old: attributes and child elements of the earlier definition
+    :param new: attributes and child elements of the later definition
+    :return: {"attributes": {name: {"old", "new"}}, "children": {"added", "removed", "changed"}} with only the kinds of
+        difference found; empty when the definitions are the same
+    """
+    changes = {}
+    attributes = {name: {"old": old[0].get(name), "new": new[0].get(name)}
+                  for name in old[0].keys() | new[0].keys() if old[0].get(name) != new[0].get(name)}
+    if attributes:
+        changes["attributes"] = dict(sorted(attributes.items()))
+    children = {
+        "added": {key: _canonical_text(new[1][key]) for key in new[1].keys() - old[1].keys()},
+        "removed": {key: _canonical_text(old[1][key]) for key in old[1].keys() - new[1].keys()},
+        "changed": {},
+    }
+    for key in old[1].keys() & new[1].keys():
+        # the serialized children are equal unless something changed; only then are they put in canonical form, so
+        # that attribute order and indentation are not reported as changes
+        if old[1][key] != new[1][key]:
+            old_text, new_text = _canonical_text(old[1][key]), _canonical_text(new[1][key])
+            if old_text != new_text:
+                children["changed"][key] = {"old": old_text, "new": new_text}
+    children = {kind: dict(sorted(values.items())) for kind, values in children.items() if values}
+    if children:
+        changes["children"] = children
+    return changes
+
+
+def generate_define(dds_file: str, backend: str = "odmlib") -> bytes:
+    """
+    Generate the Define-XML for a DDS JSON file in memory with the loaders.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param backend: object model built by the loaders, "odmlib" or "fast"
+    """
+    from define_generator import DefineGenerator
+    generator = DefineGenerator(dds_file, None, log_level="WARNING", backend=backend)
+    generator.create()
+    return generator.xml
+
+
+def format_summary(result: dict[str, Any], limit: int = SUMMARY_LIMIT) -> list[str]:
+    """
+    Return a short text summary of a diff.
+
+    :param result: result of diff_defines()
+    :param limit: OIDs listed for each element type and kind of difference
+    """
+    lines = []
+    for name, counts in result["summary"].items():
+        if counts["added"] or counts["removed"] or counts["changed"]:
+            lines.append(f"{name}: {counts['added']} added, {counts['removed']} removed, {counts['changed']} changed, "
+                         f"{counts['unchanged']} unchanged")
+        for kind in ("added", "removed", "changed"):
+            entries = [entry for entry in result[kind] if entry["element"] == name]
+            for entry in entries[:limit]:
+                lines.append(f"  {kind} {entry['OID']}{_describe(entry) if kind == 'changed' else ''}")
+            if len(entries) > limit:
+                lines.append(f"  ... {len(entries) - limit} more {kind}")
+    return lines or ["no differences"]
+
+
+def _describe(change: dict[str, Any]) -> str:
+    """return the names of the attributes and child elements that changed in a definition"""
+    parts = [f"{name} {json.dumps(values['old'])} -> {json.dumps(values['new'])}"
+             for name, values in change.get("attributes", {}).items()]
+    for kind, children in change.get("children", {}).items():
+        parts.append(f"{kind} {', '.join(children)}")
+    return f": {'; '.join(parts)}"
+
+
+def _definition(elem: etree._Element) -> Definition:
+    """return the attributes of a definition and its serialized child elements keyed by child key"""
+    children = {}
+    positions = {}
+    for child in elem:
+        if not isinstance(child.tag, str):
+            continue
+        name = _name(child.tag)
+        attrs = _attributes(child)
+        key_attrs = [attr for attr in CHILD_KEYS.get(etree.QName(child).localname, ()) if attrs.get(attr) is not None]
+        if key_attrs:
+            key = f"{name}[{','.join(f'{attr}={attrs[attr]}' for attr in key_attrs)}]"
+            occurrence = 1
+            while (unique := key if occurrence == 1 else f"{key}[{occurrence}]") in children:
+                occurrence += 1
+            key = unique
+        else:
+            positions[name] = positions.get(name, 0) + 1
+            key = f"{name}[{positions[name]}]"
+        children[key] = etree.tostring(child, with_tail=False)
+    return _attributes(elem), children
+
+
+def _attributes(elem: etree._Element) -> dict[str, str]:
+    return {_name(name): value for name, value in elem.attrib.items()}
+
+
+def _canonical_text(xml: bytes) -> str:
+    return _canonical(etree.fromstring(xml))
+
+
+def _canonical(elem: etree._Element) -> str:
+    """serialize an element with sorted attributes and without the whitespace between elements"""
+    attrs = "".join(f' {name}="{escape(value, _QUOTE)}"' for name, value in sorted(_attributes(elem).items()))
+    text = escape((elem.text or "").strip())
+    content = text + "".join(_canonical(child) for child in elem if isinstance(child.tag, str))
+    name = _name(elem.tag)
+    return f"<{name}{attrs}>{content}</{name}>" if content else f"<{name}{attrs}/>"
+
+
+@lru_cache(maxsize=None)
+def _name(qname: str) -> str:
+    """return a qualified name with the usual Define-XML prefix instead of the namespace URI"""
+    if not qname.startswith("{"):
+        return qname
+    uri, local = qname[1:].split("}")
+    return f"{PREFIXES.get(uri, '{' + uri + '}')}{local}"
+
+
+def _open(path: str, backend: str) -> str | IO[bytes]:
+    """return a Define-XML path as is, or the in-memory Define-XML generated for a DDS JSON file"""
+    if Path(path).suffix.lower() == ".json":
+        return io.BytesIO(generate_define(path, backend))
+    return path
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the Define-XML diff.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--old", help="path and file name of the earlier Define-XML or DDS JSON file",
+                        required=True, dest="old_file")
+    parser.add_argument("-n", "--new", help="path and file name of the later Define-XML or DDS JSON file",
+                        required=True, dest="new_file")
+    parser.add_argument("-j", "--json", help="path and file name of the JSON diff report to write", dest="json_file")
+    parser.add_argument("--limit", help=f"OIDs listed in the text summary for each element type and kind of difference "
+                        f"(default: {SUMMARY_LIMIT})", type=int, default=SUMMARY_LIMIT, dest="limit")
+    parser.add_argument("--backend", help="object model used to generate DDS JSON inputs (default: odmlib)",
+                        default="odmlib", choices=["odmlib", "fast"], dest="backend")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = set_cmd_line_args()
+    result = diff_defines(_open(args.old_file, args.backend), _open(args.new_file, args.backend))
+    if args.json_file:
+        with open(args.json_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    for line in format_summary(result, args.limit):
+        print(line)
+    # like diff, exit with status 1 when the documents differ
+    if result["added"] or result["removed"] or result["changed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
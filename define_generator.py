@@ -1,54 +1,154 @@
 import argparse
+import importlib
+import io
 import json
 import logging
 import sys
-from pathlib import Path
-from typing import Any
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator
 import odm as ODM
 import supporting_docs as SD
+import dds_reader
+from define_registry import DefineRegistry
+from term_table import TermTable
+import stream_writer
+import parallel_loader
+import fragment_cache
+import define_records
+import define_snapshot
+import integrity
+from define_pipeline import DefinePipeline, DEFAULT_STYLESHEET
+from define_profiler import StageProfiler, NullProfiler, NULL_PROFILER
 import os.path
-from defineutils.validate import DefineSchemaValidator, DefineSchemaValidationError
-import study, standards, itemGroups, itemRefs, items, conditions, standards, annotatedCRF, concepts, conceptProperties
-import whereClauses, codeLists, dictionaries, methods, comments, documents, valueLevel
+from define_validator import DefineValidator, STREAM_THRESHOLD, ENGINES
 from constants import DEFAULT_LANGUAGE, ACRF_LEAF_ID, DEFAULT_OUTPUT_FILE
 
 ELEMENTS = ["ValueListDef", "WhereClauseDef", "ItemGroupDef", "ItemDef", "CodeList", "MethodDef", "CommentDef", "leaf"]
 
+
+class LazyLoaders(Mapping):
+    """Loader classes by DDS section, given as "module:Class" and imported the first time the section is loaded."""
+
+    def __init__(self, paths: dict[str, str]) -> None:
+        self.paths: dict[str, str] = paths
+        self._classes: dict[str, type] = {}
+
+    def __getitem__(self, section: str) -> type:
+        if section not in self._classes:
+            self._classes[section] = resolve_loader(self.paths[section])
+        return self._classes[section]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+def resolve_loader(path: str) -> type:
+    """
+    Import a loader module and return its loader class.
+
+    :param path: "module:Class", e.g. "itemGroups:ItemGroups"
+    """
+    module, name = path.split(":")
+    return getattr(importlib.import_module(module), name)
+
+
 # Loader classes for each section in the DDS JSON file
-LOADERS = {
-    "itemGroups": itemGroups.ItemGroups,
-    "conditions": conditions.Conditions,
-    "whereClauses": whereClauses.WhereClauses,
-    "codeLists": codeLists.CodeLists,
-    "methods": methods.Methods,
-    "standards": standards.Standards,
-    "annotatedCRF": annotatedCRF.AnnotatedCRF,
-    "concepts": concepts.Concepts,
-    "conceptProperties": conceptProperties.ConceptProperties,
-    "Dictionaries": dictionaries.Dictionaries,
-    "Comments": comments.Comments,
-    "Documents": documents.Documents,
-}
+LOADERS = LazyLoaders({
+    "itemGroups": "itemGroups:ItemGroups",
+    "conditions": "conditions:Conditions",
+    "whereClauses": "whereClauses:WhereClauses",
+    "codeLists": "codeLists:CodeLists",
+    "methods": "methods:Methods",
+    "standards": "standards:Standards",
+    "annotatedCRF": "annotatedCRF:AnnotatedCRF",
+    "concepts": "concepts:Concepts",
+    "conceptProperties": "conceptProperties:ConceptProperties",
+    "Dictionaries": "dictionaries:Dictionaries",
+    "Comments": "comments:Comments",
+    "Documents": "documents:Documents",
+})
+STUDY_LOADER: str = "study:Study"
 
 """
 define_generator.py - convert a define-360i.json file into a Define-XML v2.1 file.
 Example Cmd-line Args:
     example: -t ./data/define-360i.json -d ./data/define-360i.xml
+    streaming ingestion: -t ./data/define-360i.json -d ./data/define-360i.xml --stream
+    streaming writer: -t ./data/define-360i.json -d ./data/define-360i.xml --writer stream
+    parallel loading: -t ./data/define-360i.json -d ./data/define-360i.xml --workers 4
+    incremental regeneration: -t ./data/define-360i.json -d ./data/define-360i.xml --cache-dir ./.define_cache
+    fast backend: -t ./data/define-360i.json -d ./data/define-360i.xml --backend fast
+    validate and render: -t ./data/define-360i.json -d ./data/define-360i.xml -s --html ./data/define-360i.html --stats
+    profiling: -t ./data/define-360i.json -d ./data/define-360i.xml -s --profile-report ./profile.json
+    integrity check: -t ./data/define-360i.json -d ./data/define-360i.xml --check-integrity
+    watch mode: -t ./data/define-360i.json -d ./data/define-360i.xml -s --html ./data/define-360i.html --watch
+    save a snapshot: -t ./data/define-360i.json -d ./data/define-360i.xml --save-snapshot ./define-360i.snapshot
+    from a snapshot: --from-snapshot ./define-360i.snapshot -d ./data/define-360i.xml --html ./data/define-360i.html
 """
 
 class DefineGenerator:
     """Generate a Define-XML v2.1 file from the DDS JSON file."""
 
-    def __init__(self, dds_file: str, define_file: str, log_level: str = "INFO") -> None:
+    def __init__(self, dds_file: str | None, define_file: str | None, log_level: str = "INFO", stream: bool = False,
+                 writer: str = "odmlib", workers: int = 0, cache_dir: str | None = None,
+                 profiler: NullProfiler | None = None, backend: str = "odmlib", intern_terms: bool = True,
+                 check_integrity: bool = False, cache: fragment_cache.FragmentCache | None = None,
+                 template: dict[str, Any] | None = None, save_snapshot: str | None = None,
+                 from_snapshot: str | None = None, json_parser: str = "auto",
+                 dedup_where_clauses: bool = False) -> None:
         """
         Initialize the Define-XML generator.
 
-        :param dds_file: path and filename of the Data Definition Specification (DDS) JSON file
-        :param define_file: path and filename for the output Define-XML v2.1 file
+        :param dds_file: path and filename of the Data Definition Specification (DDS) JSON file; None when the DDS
+            content is passed as template
+        :param define_file: path and filename for the output Define-XML v2.1 file; None keeps the generated document in
+            memory as the xml attribute instead of writing a file
         :param log_level: logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        :param stream: read the DDS JSON incrementally, loading each section element as it is parsed
+        :param writer: "odmlib" to write the complete odmlib tree at the end or "stream" to spool each element to disk
+            as soon as the loader that created it finishes
+        :param workers: number of worker processes used to load sections and datasets in parallel (0 or 1 = serial)
+        :param cache_dir: directory of the fragment cache used to regenerate only the datasets, codelists and where
+            clauses that changed since the last run; implies the streaming writer
+        :param profiler: StageProfiler that records the wall and CPU time of each stage and the object counts
+        :param backend: "odmlib" to build odmlib objects or "fast" to build lightweight define_records records for
+            the datasets, variables, value lists, codelists and where clauses; "fast" implies the streaming writer,
+            which serializes the records directly
+        :param intern_terms: share identical CodeListItem, Decode and Alias objects between codelists
+        :param check_integrity: check that every OID reference resolves and no OID is defined twice after the loaders
+            have run; the report is kept in integrity_report
+        :param cache: an open fragment cache to use instead of cache_dir, such as the in-memory cache the watch mode
+            keeps between runs; implies the streaming writer
+        :param template: DDS content that has already been loaded, e.g. from a request payload, used instead of reading
+            dds_file
+        :param save_snapshot: path and filename of a snapshot of the state created by the loaders to write, so later
+            runs can start from it with from_snapshot; not supported with the streaming writer, the fragment cache or
+            the fast backend, which release the objects as soon as they are serialized
+        :param from_snapshot: path and filename of a snapshot written with save_snapshot, used instead of the DDS JSON
+        :param json_parser: JSON parser for the DDS file, "orjson", "json" or "auto" for the fastest one installed
+        :param dedup_where_clauses: collapse where clauses with the same range checks into one WhereClauseDef and
+            point the value-level WhereClauseRefs at it; the report is kept in where_clause_report. Not supported with
+            stream, which loads the value lists before the where clauses are read
         """
-        self.dds_file: str = dds_file
-        self.define_file: str = define_file
+        self.dds_file: str | None = dds_file
+        self.define_file: str | None = define_file
+        self.template: dict[str, Any] | None = template
+        self.save_snapshot: str | None = save_snapshot
+        self.from_snapshot: str | None = from_snapshot
+        # the generated document when define_file is None
+        self.xml: bytes | None = None
+        self.stream: bool = stream
+        if dedup_where_clauses and stream:
+            raise ValueError("Where clauses cannot be collapsed with streaming ingestion, which loads the value lists "
+                             "before the where clauses are read.")
+        self.dedup_where_clauses: bool = dedup_where_clauses
+        self.where_clause_report: dict[str, Any] | None = None
+        # resolved here so that an unknown or missing parser is reported before anything is loaded
+        self.json_parser: str = dds_reader.json_parser(json_parser)[0]
+        self.workers: int = workers
         logging.basicConfig(
             filename="define_generator.log",
             level=getattr(logging, log_level),
@@ -58,18 +158,105 @@ class DefineGenerator:
         self.lang: str = DEFAULT_LANGUAGE
         self.acrf: str = ACRF_LEAF_ID
         self.define_attributes: dict[str, Any] = {}
-        self.define_objects: dict[str, list[Any]] = {}
+        self.define_objects: DefineRegistry = DefineRegistry()
+        self.profiler: NullProfiler = profiler or NULL_PROFILER
+        self.define_objects.profiler = self.profiler
+        if backend not in define_records.BACKENDS:
+            raise ValueError(f"Unknown backend {backend}; expected one of {', '.join(define_records.BACKENDS)}")
+        self.define_objects.backend = backend
+        self.define_objects.terms = TermTable(enabled=intern_terms)
+        if self.profiler.enabled:
+            self.profiler.metadata.update(dds_file=dds_file, define_file=define_file, stream=stream, writer=writer,
+                                          workers=workers, cache_dir=cache_dir, backend=backend,
+                                          json_parser=self.json_parser)
+        self.integrity: integrity.IntegrityChecker | None = integrity.IntegrityChecker() if check_integrity else None
+        self.integrity_report: dict[str, Any] | None = None
+        self.writer: stream_writer.StreamingDefineWriter | None = None
+        if writer == "stream" or cache_dir or cache or backend == "fast":
+            self.writer = stream_writer.StreamingDefineWriter(ELEMENTS, self.integrity)
+        if save_snapshot and self.writer:
+            raise ValueError("A snapshot cannot be saved with the streaming writer, the fragment cache or the fast "
+                             "backend, as they release the define objects once they are serialized.")
+        self.cache: fragment_cache.FragmentCache | None = cache
+        if cache_dir and not cache:
+            self.cache = fragment_cache.FragmentCache(cache_dir, context=f"{self.lang}|{self.acrf}")
+        self.pool: parallel_loader.ParallelLoader | None = None
 
-    def create(self) -> None:
-        """Create the Define-XML v2.1 file from the DDS JSON input file."""
+    def create(self, pipeline: DefinePipeline | None = None) -> dict[str, Any] | None:
+        """
+        Create the Define-XML v2.1 file from the DDS JSON input file.
+
+        :param pipeline: post-generation steps (validation, HTML rendering, statistics) to run against the generated
+            document, parsed once, before the output files are written
+        :return: the pipeline results, or None when no pipeline is given
+        """
+        with self.profiler.stage("create"):
+            self._init_define_objects()
+            if self.from_snapshot:
+                with self.profiler.stage("snapshot:load"):
+                    self._load_snapshot()
+            else:
+                if self.workers > 1:
+                    self.pool = parallel_loader.ParallelLoader(self.workers, ELEMENTS, self._merge_chunk,
+                                                               self.define_objects.backend)
+                try:
+                    self._load_dds()
+                finally:
+                    if self.pool:
+                        self.pool.shutdown()
+            if self.save_snapshot:
+                # saved before _build_doc, which adds the annotated CRF leaf
+                with self.profiler.stage("snapshot:save"):
+                    size = define_snapshot.save_snapshot(self.save_snapshot, self.define_objects,
+                                                         self.define_attributes, self.lang, self.acrf)
+                logging.info(f"saved snapshot {self.save_snapshot} ({size} bytes)")
+            if self.integrity:
+                with self.profiler.stage("integrity"):
+                    self._check_integrity()
+
+            with self.profiler.stage("_build_doc"):
+                odm = self._build_doc()
+            results = self._write_define(odm, pipeline)
+        self.profiler.count_objects(self.define_objects, self.writer.counts if self.writer else None)
+        term_stats = self.define_objects.terms.stats()
+        if term_stats:
+            logging.info(f"interned terms: {term_stats}")
+            if self.profiler.enabled:
+                self.profiler.metadata["terms"] = term_stats
+        if self.cache:
+            self.cache.save()
+            stats = self.cache.stats()
+            logging.info(f"fragment cache: {stats['hits']} hits, {stats['misses']} misses "
+                         f"({stats['hit_rate']:.0%} hit rate)")
+        return results
+
+    def _load_dds(self) -> None:
+        """Load every section of the DDS JSON file, exiting with an error message if the JSON is invalid."""
         try:
-            with open(self.dds_file, 'r') as f:
-                template_objects = json.load(f)
+            if self.stream and self.template is None:
+                self._load_stream()
+            else:
+                self._load_template()
         except json.JSONDecodeError as e:
             logging.error(f"Invalid JSON in {self.dds_file}: {e.msg} at line {e.lineno}")
             print(f"ERROR: Invalid JSON in {self.dds_file}: {e.msg} at line {e.lineno}", file=sys.stderr)
             sys.exit(1)
-        self._init_define_objects()
+        if self.pool:
+            with self.profiler.stage("parallel:wait"):
+                self.pool.wait()
+
+    def _load_template(self) -> None:
+        """Load the DDS JSON file with a single json.load, or take the DDS content given, and process each section."""
+        template_objects = self.template
+        if template_objects is None:
+            with self.profiler.stage("json.load"):
+                template_objects = dds_reader.load_dds(self.dds_file, self.json_parser)
+        if self.dedup_where_clauses:
+            # imported here as it imports the where clause loaders
+            import where_clause_dedup
+            with self.profiler.stage("dedup_where_clauses"):
+                template_objects, self.where_clause_report = where_clause_dedup.collapse_where_clauses(template_objects)
+            logging.info(where_clause_dedup.format_report(self.where_clause_report))
         self._load_study(template_objects)
         for section, object in template_objects.items():
             if type(object) is list:
@@ -78,31 +265,134 @@ class DefineGenerator:
             else:
                 self.define_attributes[section] = object
 
-        odm = self._build_doc()
-        self._write_define(odm)
+    def _load_stream(self) -> None:
+        """
+        Load the DDS JSON file incrementally. Each list section is handed to its loader as a stream so every dataset,
+        codelist, condition and where clause is released once the loader has consumed it. Study-level metadata is
+        loaded last from the scalar sections as it does not depend on the other sections.
+        """
+        reader = dds_reader.DDSReader(self.dds_file)
+        for section, object in reader.sections():
+            if isinstance(object, dds_reader.SectionStream):
+                logging.info(f"processing {section}")
+                self._load(section, object)
+            else:
+                self.define_attributes[section] = object
+        self._load_study(self.define_attributes)
+
+    def _load_snapshot(self) -> None:
+        """Restore the define objects and study-level attributes created by the loaders from a snapshot."""
+        state = define_snapshot.load_snapshot(self.from_snapshot)
+        self.define_objects.update(state["define_objects"])
+        self.define_objects.backend = state["backend"]
+        self.define_attributes = state["define_attributes"]
+        self.lang = state["lang"]
+        self.acrf = state["acrf"]
+        logging.info(f"loaded snapshot {self.from_snapshot}")
+        if self.writer:
+            self.writer.spool(self.define_objects)
 
     def _init_define_objects(self) -> None:
         """Initialize empty lists for each Define-XML element type."""
         for elem in ELEMENTS:
             self.define_objects[elem] = []
 
-    def _load(self, section: str, data: list[dict[str, Any]]) -> None:
+    def _load(self, section: str, data: Iterable[dict[str, Any]]) -> None:
         """
         Load a section of the DDS JSON using the appropriate loader class.
 
         :param section: name of the section in the DDS JSON
-        :param data: list of dictionaries containing the section data
+        :param data: list (or stream) of dictionaries containing the section data
         """
         loader_class = LOADERS.get(section)
         if not loader_class:
             logging.warning(f"No loader registered for section: {section}")
             return
+        with self.profiler.stage(f"section:{section}"):
+            self._run_loader(section, loader_class, data)
+
+    def _run_loader(self, section: str, loader_class: type, data: Iterable[dict[str, Any]]) -> None:
+        """
+        Run the loader for a section inline, through the fragment cache or in the worker pool.
+
+        :param section: name of the section in the DDS JSON
+        :param loader_class: loader class registered for the section
+        :param data: list (or stream) of dictionaries containing the section data
+        """
+        if self.cache and section in fragment_cache.CACHED_SECTIONS:
+            self._load_cached(section, loader_class, data)
+            return
+        if self.pool:
+            self.pool.submit_section(section, loader_class, data, self.define_objects, self.lang, self.acrf)
+            return
         loader = loader_class()
         loader.create_define_objects(data, self.define_objects, self.lang, self.acrf)
+        if self.writer:
+            self.writer.spool(self.define_objects)
+
+    def _load_cached(self, section: str, loader_class: type, data: Iterable[dict[str, Any]]) -> None:
+        """
+        Load a section one element at a time, splicing the fragments of unchanged elements from the fragment cache
+        and generating and caching the fragments of new or changed elements.
+
+        :param section: name of the section in the DDS JSON
+        :param loader_class: loader class registered for the section
+        :param data: list (or stream) of dictionaries containing the section data
+        """
+        if self.pool:
+            self.pool.wait()
+        shared = {key: self.define_objects[key] for key in parallel_loader.DEPENDENCIES.get(section, ())
+                  if key in self.define_objects}
+        for item in data:
+            key = self.cache.key(section, fragment_cache.cache_payload(section, item, self.define_objects))
+            fragments = self.cache.get(key)
+            if fragments is None:
+                fragments = {}
+                result = parallel_loader.load_chunk(loader_class, [item], ELEMENTS, self.lang, self.acrf, shared,
+                                                    self.define_objects.backend)
+                for elem, objects, _ in result:
+                    if elem in ELEMENTS:
+                        fragments[elem] = [[xml, sorted(prefixes)] for xml, prefixes in
+                                           map(stream_writer.serialize_element, objects)]
+                self.cache.put(key, fragments)
+            for elem in ELEMENTS:
+                for xml, prefixes in fragments.get(elem, []):
+                    self.writer.spool_fragment(elem, xml, set(prefixes))
+
+    def _merge_chunk(self, result: parallel_loader.ChunkResult, replace: bool) -> None:
+        """
+        Merge the objects created by a parallel loader task into define_objects.
+
+        :param result: entries created, replaced or appended to by the task's loader
+        :param replace: True if entries the loader replaced also replace the existing entries
+        """
+        for key, value, replaced in result:
+            if isinstance(value, list) and key in self.define_objects and not (replaced and replace):
+                self.define_objects[key].extend(value)
+            else:
+                self.define_objects[key] = value
+        if self.writer:
+            self.writer.spool(self.define_objects)
+
+    def _check_integrity(self) -> None:
+        """
+        Check the OID references of the objects created by the loaders, including any the streaming writer has
+        already spooled, and report every dangling reference and duplicate OID.
+        """
+        self.integrity.collect_objects(self.define_objects, ELEMENTS)
+        # the annotated CRF leaf is created by _build_doc
+        self.integrity.define("leaf", self.acrf)
+        self.integrity_report = self.integrity.check()
+        problems = integrity.format_report(self.integrity_report)
+        for problem in problems:
+            logging.error(f"integrity: {problem}")
+            print(f"ERROR: {problem}", file=sys.stderr)
+        logging.info(f"integrity: {self.integrity_report['definitions']} OIDs defined, "
+                     f"{self.integrity_report['references']} references checked, {len(problems)} problems")
 
     def _load_study(self, template: dict[str, Any]) -> None:
         """Load study-level metadata from the DDS JSON."""
-        loader = study.Study()
+        loader = resolve_loader(STUDY_LOADER)()
         loader.create_define_objects(template, self.define_objects, self.lang, self.acrf)
 
     def _build_doc(self) -> Any:
@@ -138,33 +428,59 @@ class DefineGenerator:
         for obj in self.define_objects[elem_name]:
             elem_list.append(obj)
 
-    def _write_define(self, odm: Any) -> None:
+    def _write_define(self, odm: Any, pipeline: DefinePipeline | None = None) -> dict[str, Any] | None:
         """
-        Write the odmlib Define-XML to an XML file.
+        Write the odmlib Define-XML to an XML file, running the post-generation pipeline if one is given. The odmlib
+        writer hands the serialized document to the pipeline without a round trip through the file; the streaming
+        writer assembles the file on disk, which the pipeline then parses once.
 
         :param odm: the instantiated odmlib Define-XML ODM object
+        :param pipeline: post-generation steps to run against the generated document
+        :return: the pipeline results, or None when no pipeline is given
         """
-        odm.write_xml(self.define_file)
+        if self.writer:
+            with self.profiler.stage("write_xml"):
+                if self.define_file:
+                    self.writer.write(odm, self.define_file)
+                else:
+                    buffer = io.BytesIO()
+                    self.writer.write(odm, buffer)
+                    self.xml = buffer.getvalue()
+            if not pipeline:
+                return None
+            if self.define_file:
+                return pipeline.run_file(self.define_file, self.profiler)
+            return pipeline.run(self.xml, None, self.profiler)
+        if pipeline or not self.define_file:
+            with self.profiler.stage("write_xml"):
+                xml_bytes = odm.to_xml_string(xml_declaration=True).encode("utf-8")
+            if not self.define_file:
+                self.xml = xml_bytes
+            return pipeline.run(xml_bytes, self.define_file, self.profiler) if pipeline else None
+        with self.profiler.stage("write_xml"):
+            odm.write_xml(self.define_file)
+        return None
 
     def _check_file_existence(self) -> None:
         """Raise an error if the DDS input file cannot be found."""
-        if not os.path.isfile(self.dds_file):
+        if self.template is None and self.from_snapshot is None and not os.path.isfile(self.dds_file or ""):
             raise ValueError("The template file specified on the command-line cannot be found.")
 
-def validate_defile_file(define_file: str) -> None:
+def validate_defile_file(define_file: str) -> bool:
     """
-    Validate the Define-XML file against the schema.
+    Validate the Define-XML file against the schema. The schema is compiled on the first call and reused after that.
 
     :param define_file: path to the Define-XML file to validate
+    :return: True if the Define-XML file is schema valid
     """
-    validator = DefineSchemaValidator(Path(define_file))
-    try:
-        validator.validate_define_file()
-    except DefineSchemaValidationError as e:
-        logging.error(f"Define-XML schema validation failed: {e}")
-        print(f"ERROR: Schema validation failed: {e}", file=sys.stderr)
-    else:
-        logging.info("Define-XML file is valid.")
+    result = DefineValidator().validate(define_file)
+    if not result["valid"]:
+        errors = "\n".join(result["errors"])
+        logging.error(f"Define-XML schema validation failed: {errors}")
+        print(f"ERROR: Schema validation failed: {errors}", file=sys.stderr)
+        return False
+    logging.info("Define-XML file is valid.")
+    return True
 
 
 def set_cmd_line_args() -> argparse.Namespace:
@@ -176,25 +492,104 @@ def set_cmd_line_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("-d", "--define", help="path and file name of Define-XML v2 file to create", required=False,
                         dest="define_file", default=DEFAULT_OUTPUT_FILE)
-    parser.add_argument("-t", "--template", help="path and file name of the template file to load", required=True,
-                        dest="dds_file", )
+    parser.add_argument("-t", "--template", help="path and file name of the template file to load; required unless "
+                        "--from-snapshot is given", dest="dds_file")
     parser.add_argument("-l", "--log-level", default="INFO",
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
         help="Set the logging level (default: INFO)",
     )
     parser.add_argument("-s", "--validate", help="schema validate the define.xml", default=False, const=True,
                         nargs='?', dest="is_validate")
+    parser.add_argument("--validation-engine", help="schema validation engine for -s (default: xmlschema); lxml is "
+                        "much faster", default="xmlschema", choices=ENGINES, dest="validation_engine")
+    parser.add_argument("--stream-validation-threshold", help="with -s and the stream writer, validate define.xml "
+                        "files larger than this many MB one subtree at a time (default: "
+                        f"{STREAM_THRESHOLD // (1024 * 1024)})", type=float,
+                        default=STREAM_THRESHOLD / (1024 * 1024), dest="stream_validation_threshold")
+    parser.add_argument("--check-integrity", help="report dangling OID references and duplicate OIDs",
+                        default=False, action="store_true", dest="is_check_integrity")
+    parser.add_argument("--html", help="path and file name of the define.html to render from the define.xml",
+                        dest="html_file")
+    parser.add_argument("--stylesheet", help="path and file name of the Define-XML style sheet",
+                        default=DEFAULT_STYLESHEET, dest="style_sheet")
+    parser.add_argument("--stats", help="print element counts for the define.xml", default=False,
+                        action="store_true", dest="is_stats")
+    parser.add_argument("--profile-report", help="path and file name of a JSON report of the wall and CPU time of each "
+                        "stage and the number of objects of each element type", dest="profile_report")
+    parser.add_argument("--stream", help="read the DDS JSON incrementally to reduce peak memory", default=False,
+                        action="store_true", dest="is_stream")
+    parser.add_argument("--json-parser", help="JSON parser for the DDS file (default: auto, orjson if it is installed "
+                        "and otherwise the standard library json module)", default="auto",
+                        choices=["auto", *dds_reader.PARSERS], dest="json_parser")
+    parser.add_argument("--dedup-where-clauses", help="collapse where clauses that test the same range checks into "
+                        "one WhereClauseDef", default=False, action="store_true", dest="is_dedup_where_clauses")
+    parser.add_argument("--writer", help="Define-XML writer backend (default: odmlib)", default="odmlib",
+                        choices=["odmlib", "stream"], dest="writer")
+    parser.add_argument("--backend", help="object model built by the loaders (default: odmlib); fast builds "
+                        "lightweight records serialized by the streaming writer", default="odmlib",
+                        choices=["odmlib", "fast"], dest="backend")
+    parser.add_argument("--workers", help="number of worker processes for loading sections and datasets in parallel",
+                        type=int, default=0, dest="workers")
+    parser.add_argument("--watch", help="keep running and regenerate each time the DDS JSON file changes",
+                        default=False, action="store_true", dest="is_watch")
+    parser.add_argument("--watch-dir", help="with --watch, also regenerate when a DDS JSON or style sheet file in this "
+                        "directory changes", action="append", default=[], dest="watch_dirs")
+    parser.add_argument("--interval", help="with --watch, seconds between checks for changes (default: 1)",
+                        type=float, default=1.0, dest="interval")
+    parser.add_argument("--cache-dir", help="fragment cache directory for regenerating only changed content",
+                        dest="cache_dir")
+    parser.add_argument("--no-cache", help="ignore the fragment cache and regenerate everything", default=False,
+                        action="store_true", dest="is_no_cache")
+    parser.add_argument("--save-snapshot", help="path and file name of a snapshot of the loaded DDS to write for "
+                        "later runs with --from-snapshot", dest="save_snapshot")
+    parser.add_argument("--from-snapshot", help="path and file name of a snapshot to generate from instead of the DDS "
+                        "JSON", dest="from_snapshot")
     args = parser.parse_args()
+    if not args.dds_file and not args.from_snapshot:
+        parser.error("the -t/--template argument is required unless --from-snapshot is given")
     return args
 
 
 def main() -> None:
     """Main entry point that generates Define-XML v2.1 from a DDS JSON file."""
     args = set_cmd_line_args()
-    dg = DefineGenerator(dds_file=args.dds_file, define_file=args.define_file, log_level=args.log_level)
-    dg.create()
-    if args.is_validate:
-        validate_defile_file(args.define_file)
+
+    def make_pipeline() -> DefinePipeline | None:
+        if not (args.is_validate or args.html_file or args.is_stats):
+            return None
+        return DefinePipeline(validate=bool(args.is_validate), html_file=args.html_file, stylesheet=args.style_sheet,
+                              statistics=args.is_stats, engine=args.validation_engine,
+                              stream_threshold=int(args.stream_validation_threshold * 1024 * 1024))
+
+    if args.is_watch:
+        # imported here as the watcher builds DefineGenerator objects from this module
+        from define_watcher import DefineWatcher
+        options = {"log_level": args.log_level, "stream": args.is_stream, "workers": args.workers,
+                   "backend": args.backend, "check_integrity": args.is_check_integrity,
+                   "json_parser": args.json_parser, "dedup_where_clauses": args.is_dedup_where_clauses}
+        DefineWatcher(args.dds_file, args.define_file, options, make_pipeline, args.watch_dirs, args.interval,
+                      None if args.is_no_cache else args.cache_dir).run()
+        return
+    dg = DefineGenerator(dds_file=args.dds_file, define_file=args.define_file, log_level=args.log_level,
+                         stream=args.is_stream, writer=args.writer, workers=args.workers,
+                         cache_dir=None if args.is_no_cache else args.cache_dir,
+                         profiler=StageProfiler() if args.profile_report else None, backend=args.backend,
+                         check_integrity=args.is_check_integrity, save_snapshot=args.save_snapshot,
+                         from_snapshot=args.from_snapshot, json_parser=args.json_parser,
+                         dedup_where_clauses=args.is_dedup_where_clauses)
+    pipeline = make_pipeline()
+    results = dg.create(pipeline)
+    if dg.where_clause_report:
+        from where_clause_dedup import format_report
+        print(format_report(dg.where_clause_report))
+    if dg.cache:
+        stats = dg.cache.stats()
+        print(f"fragment cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+    if results and results["statistics"]:
+        for name, count in results["statistics"].items():
+            print(f"{name}: {count}")
+    if args.profile_report:
+        dg.profiler.write(args.profile_report)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ from typing import Any
 from odmlib.define_2_1 import model as DEFINE
 
 from constants import DEFAULT_LANGUAGE
+from define_registry import DefineRegistry
 
 
 class DefineObject(ABC):
@@ -12,6 +13,16 @@ class DefineObject(ABC):
     def __init__(self) -> None:
         self.lang: str = DEFAULT_LANGUAGE
         self.logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.model: Any = DEFINE
+
+    def set_model(self, define_objects: DefineRegistry) -> None:
+        """
+        Build the objects with the model selected for the define_objects registry: the odmlib Define-XML model or the
+        lightweight define_records records, which have the same class names and keyword arguments.
+
+        :param define_objects: registry of objects created by the loaders
+        """
+        self.model = getattr(define_objects, "model", DEFINE)
 
     def require_key(self, obj: dict[str, Any], key: str, context: str = "") -> Any:
         """
@@ -42,18 +53,16 @@ class DefineObject(ABC):
             oid = ".".join(descriptors).upper().replace(" ", "-")
         return oid
 
-    def find_object(self, objects: list[Any], oid: str) -> Any | None:
+    def find_object(self, define_objects: DefineRegistry, elem_name: str, oid: str) -> Any | None:
         """
-        Find an object in a list by its OID attribute.
+        Find an object by its OID using the OID index kept by the define_objects registry.
 
-        :param objects: list of odmlib objects with OID attribute
+        :param define_objects: registry of odmlib objects created by the loaders
+        :param elem_name: element type to search (e.g. "ItemDef", "ValueListDef", "_conditions")
         :param oid: OID to search for
         :return: object with matching OID or None if not found
         """
-        for o in objects:
-            if oid == o.OID:
-                return o
-        return None
+        return define_objects.find(elem_name, oid)
 
     def create_external_codelist(
         self, cl_oid: str, name: str, data_type: str, dictionary: str, version: str | None = None
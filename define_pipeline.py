@@ -0,0 +1,147 @@
+"""
+define_pipeline.py - post-generation processing of a Define-XML document held as one parsed tree.
+
+The generated document is parsed once with lxml. Schema validation, HTML rendering with the Define-XML stylesheet and
+optional element statistics all run against that tree, and the XML and HTML files are written at the end, instead of
+each step re-reading and re-parsing the output file.
+
+lxml and the style sheet module are imported when a document is processed, not when the generator imports this module.
+"""
+from __future__ import annotations
+import logging
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, TYPE_CHECKING
+from define_validator import DefineValidator, DEFAULT_XSD, STREAM_THRESHOLD
+from define_profiler import NullProfiler, NULL_PROFILER
+
+if TYPE_CHECKING:
+    from lxml import etree
+
+DEFAULT_STYLESHEET: str = str(Path(__file__).resolve().parent / "define2-1.xsl")
+# MetaDataVersion elements counted by the statistics step
+STATISTICS_ELEMENTS: list[str] = ["ItemGroupDef", "ItemRef", "ItemDef", "CodeList", "CodeListItem", "ValueListDef",
+                                  "WhereClauseDef", "RangeCheck", "MethodDef", "CommentDef", "leaf"]
+
+
+class DefinePipeline:
+    """Validate, render and summarize a generated Define-XML document from a single parsed tree."""
+
+    def __init__(self, validate: bool = False, html_file: str | None = None, stylesheet: str = DEFAULT_STYLESHEET,
+                 statistics: bool = False, engine: str = "xmlschema",
+                 stream_threshold: int | None = STREAM_THRESHOLD, render_html: bool = False) -> None:
+        """
+        :param validate: schema validate the document
+        :param html_file: path and filename of the HTML rendering to create, or None to skip rendering
+        :param stylesheet: path and filename of the Define-XML style sheet
+        :param statistics: count the Define-XML elements in the document
+        :param engine: schema validation engine, "xmlschema" or "lxml" (see define_validator)
+        :param stream_threshold: when only validating a written file, stream validate files larger than this many
+            bytes; None always parses the whole tree
+        :param render_html: keep the HTML rendering in results["html"], with or without an html_file
+        """
+        self.validate: bool = validate
+        self.html_file: str | None = html_file
+        self.stylesheet: str = stylesheet
+        self.statistics: bool = statistics
+        self.engine: str = engine
+        self.stream_threshold: int | None = stream_threshold
+        self.render_html: bool = render_html
+        self.results: dict[str, Any] = {}
+        self.profiler: NullProfiler = NULL_PROFILER
+
+    def run(self, xml_bytes: bytes, define_file: str | None,
+            profiler: NullProfiler = NULL_PROFILER) -> dict[str, Any]:
+        """
+        Parse the document once, run the requested steps against the tree and write the output files.
+
+        :param xml_bytes: serialized Define-XML document, including the XML declaration
+        :param define_file: path and filename of the Define-XML file to write, or None to only process the document
+        :param profiler: stage profiler that also records the wall and CPU time of each step
+        :return: results with "valid", "errors", "statistics", "html" and per-step "seconds"
+        """
+        self.profiler = profiler
+        self._process(xml_bytes, define_file or "<memory>")
+        if define_file:
+            self._timed("write", Path(define_file).write_bytes, xml_bytes)
+        return self.results
+
+    def run_file(self, define_file: str, profiler: NullProfiler = NULL_PROFILER) -> dict[str, Any]:
+        """
+        Run the pipeline for a Define-XML file that has already been written, such as the output of the streaming
+        writer. The file is read and parsed once and is not re-written. When validation is the only step and the file is
+        larger than the streaming threshold, it is validated one subtree at a time without building the tree.
+
+        :param define_file: path and filename of the Define-XML file
+        :param profiler: stage profiler that also records the wall and CPU time of each step
+        :return: results with "valid", "errors", "statistics" and per-step "seconds"
+        """
+        self.profiler = profiler
+        if self._stream_only(define_file):
+            self.results = {"valid": None, "errors": [], "statistics": None, "html": None, "seconds": {}}
+            validator = self._timed("schema_load", DefineValidator, DEFAULT_XSD, self.engine, self.stream_threshold)
+            self._timed("validate", self._validate, validator, define_file, define_file)
+            return self.results
+        self._process(Path(define_file).read_bytes(), define_file)
+        return self.results
+
+    def _stream_only(self, define_file: str) -> bool:
+        """return True if the file only needs validating and is large enough to validate without building a tree"""
+        if not self.validate or self.html_file or self.render_html or self.statistics or self.stream_threshold is None:
+            return False
+        return Path(define_file).stat().st_size > self.stream_threshold
+
+    def _process(self, xml_bytes: bytes, define_file: str) -> None:
+        self.results = {"valid": None, "errors": [], "statistics": None, "html": None, "seconds": {}}
+        tree = self._timed("parse", self._parse, xml_bytes)
+        if self.validate:
+            # compiling the schema is only paid by the first document in the process and is timed apart from validation
+            validator = self._timed("schema_load", DefineValidator, DEFAULT_XSD, self.engine)
+            self._timed("validate", self._validate, validator, tree, define_file)
+        if self.statistics:
+            self.results["statistics"] = self._timed("statistics", self._count_elements, tree, len(xml_bytes))
+        if self.html_file or self.render_html:
+            self._timed("html", self._render, tree)
+
+    @staticmethod
+    def _parse(xml_bytes: bytes) -> etree._ElementTree:
+        from lxml import etree
+        parser = etree.XMLParser(huge_tree=True, remove_blank_text=False)
+        return etree.ElementTree(etree.fromstring(xml_bytes, parser))
+
+    def _validate(self, validator: DefineValidator, source: etree._ElementTree | str, define_file: str) -> None:
+        result = validator.validate(source)
+        self.results["valid"] = result["valid"]
+        self.results["errors"].extend(result["errors"])
+        if result["valid"]:
+            logging.info("Define-XML file is valid.")
+        else:
+            errors = "\n".join(result["errors"])
+            logging.error(f"Define-XML schema validation failed for {define_file}: {errors}")
+            print(f"ERROR: Schema validation failed: {errors}", file=sys.stderr)
+
+    def _render(self, tree: etree._ElementTree) -> None:
+        import define2html
+        html = define2html.render_html(tree, self.stylesheet)
+        if self.html_file:
+            Path(self.html_file).write_bytes(html)
+        if self.render_html:
+            self.results["html"] = html
+
+    @staticmethod
+    def _count_elements(tree: etree._ElementTree, size: int) -> dict[str, int]:
+        from lxml import etree
+        counts = Counter(etree.QName(elem).localname for elem in tree.iter() if isinstance(elem.tag, str))
+        statistics = {name: counts.get(name, 0) for name in STATISTICS_ELEMENTS}
+        statistics["bytes"] = size
+        return statistics
+
+    def _timed(self, step: str, func, *args) -> Any:
+        start = time.perf_counter()
+        try:
+            with self.profiler.stage(step):
+                return func(*args)
+        finally:
+            self.results["seconds"][step] = time.perf_counter() - start
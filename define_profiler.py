@@ -0,0 +1,84 @@
+"""
+define_profiler.py - record wall and CPU time per generation stage and the number of objects of each element type.
+
+The generator attaches a profiler to the define_objects registry so that loaders can time their own sub-stages (for
+example each dataset in ItemGroups). When profiling is off the NullProfiler is attached instead; its stage() returns
+one shared no-op context manager, so the instrumented code costs one attribute lookup and a with statement.
+"""
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Iterator
+
+_NO_OP: ContextManager[None] = nullcontext()
+
+
+class NullProfiler:
+    """Profiler used when profiling is disabled; records nothing."""
+    enabled: bool = False
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """return a no-op context manager"""
+        return _NO_OP
+
+    def count_objects(self, define_objects: dict[str, Any], counts: dict[str, int] | None = None) -> None:
+        """ignore the object counts"""
+
+    def report(self) -> dict[str, Any]:
+        """return an empty report"""
+        return {}
+
+
+NULL_PROFILER: NullProfiler = NullProfiler()
+
+
+class StageProfiler(NullProfiler):
+    """Record the wall and CPU time of named stages and the number of objects of each element type."""
+    enabled: bool = True
+
+    def __init__(self) -> None:
+        self.stages: dict[str, dict[str, float]] = {}
+        self.counts: dict[str, int] = {}
+        self.metadata: dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the body of the with statement. Time for a stage entered more than once is added up.
+
+        :param name: stage name, e.g. "section:itemGroups" or "dataset:DM"
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            record["wall"] += time.perf_counter() - wall
+            record["cpu"] += time.process_time() - cpu
+            record["calls"] += 1
+
+    def count_objects(self, define_objects: dict[str, Any], counts: dict[str, int] | None = None) -> None:
+        """
+        Record the number of objects of each element type.
+
+        :param define_objects: registry of the objects created by the loaders
+        :param counts: counts that replace the registry counts, e.g. elements already written by a streaming writer
+        """
+        for name, objects in define_objects.items():
+            if isinstance(objects, list):
+                self.counts[name] = len(objects)
+        self.counts.update(counts or {})
+
+    def report(self) -> dict[str, Any]:
+        """return the metadata, stage timings and object counts as a JSON-serializable dictionary"""
+        return {**self.metadata, "stages": self.stages, "counts": self.counts}
+
+    def write(self, report_file: str) -> None:
+        """write the report to a JSON file"""
+        with open(report_file, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def get_profiler(define_objects: Any) -> NullProfiler:
+    """return the profiler attached to a define_objects registry, or the NullProfiler"""
+    return getattr(define_objects, "profiler", NULL_PROFILER)
@@ -0,0 +1,138 @@
+"""
+define_records.py - lightweight records for the Define-XML elements created by the dataset, variable, codelist and
+where clause loaders, and a serializer that writes Define-XML v2.1 directly from them.
+
+The odmlib model validates every attribute through descriptors and auto-creates child objects, which costs far more
+than the XML the objects become. The record classes here have the same names, keyword arguments and child element
+attributes as the odmlib Define-XML 2.1 model classes, so a loader can build either by switching its model module.
+Each record keeps its attributes in the keyword argument dictionary it was created with and its child elements in
+__slots__. The element names, namespaces and child element order are taken from the odmlib model so that serialize()
+produces the same XML as odmlib's to_xml for the same content.
+
+Records do not validate attribute values; schema validate the Define-XML file to check the content.
+"""
+import sys
+import xml.etree.ElementTree as ET
+from typing import Any
+from odmlib.define_2_1 import model as DEFINE
+import odmlib.typed as T
+
+# odmlib model classes with a record equivalent; the loaders that support the fast backend only use these
+RECORD_ELEMENTS: list[str] = [
+    "ItemGroupDef", "ItemRef", "ItemDef", "Description", "TranslatedText", "Alias", "Class", "CodeListRef", "Origin",
+    "DocumentRef", "PDFPageRef", "ValueListRef", "CodeList", "CodeListItem", "EnumeratedItem", "Decode",
+    "ExternalCodeList", "ValueListDef", "WhereClauseRef", "WhereClauseDef", "RangeCheck", "CheckValue",
+]
+
+
+class Record:
+    """Base class for a Define-XML element record."""
+    __slots__ = ("attrs",)
+    # set for each record class from the odmlib model class of the same name
+    tag: str = ""
+    attr_names: frozenset[str] = frozenset()
+    attr_ns: dict[str, str] = {}
+    elems: tuple[str, ...] = ()
+    list_elems: frozenset[str] = frozenset()
+    ns_prefix: str | None = None
+
+    def __init__(self, **attrs: Any) -> None:
+        if not self.attr_names.issuperset(attrs):
+            unknown = ", ".join(sorted(set(attrs) - self.attr_names))
+            raise TypeError(f"Unknown keyword argument {unknown} in {type(self).__name__}")
+        self.attrs: dict[str, Any] = attrs
+
+    def __getattr__(self, name: str) -> Any:
+        # called for child elements that have not been set and for XML attributes
+        if name.startswith("__") or name == "attrs":
+            # special method lookups, e.g. by pickle, on a record that is still being restored
+            raise AttributeError(name)
+        if name in self.list_elems:
+            children = []
+            setattr(self, name, children)
+            return children
+        try:
+            return self.attrs[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name}") from None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.attrs!r})"
+
+
+def _record_class(name: str) -> type[Record]:
+    """create the record class for an odmlib Define-XML 2.1 model class"""
+    model = getattr(DEFINE, name)
+    elems = tuple(model._elems)
+    attr_ns = dict(model.__dict__.get("_attr_ns", {}))
+    return type(name, (Record,), {
+        "__slots__": elems,
+        "__doc__": f"Record for the {name} element.",
+        "tag": name if model.namespace == "odm" else f"{model.namespace}:{name}",
+        "attr_names": frozenset(attr for attr in model._attrs if attr not in model._elems),
+        "attr_ns": attr_ns,
+        "elems": elems,
+        "list_elems": frozenset(elem for elem in elems if isinstance(model.__dict__.get(elem), T.ODMListObject)),
+        "ns_prefix": None if model.namespace == "odm" else model.namespace,
+    })
+
+
+for _name in RECORD_ELEMENTS:
+    setattr(sys.modules[__name__], _name, _record_class(_name))
+
+# model modules used by the loaders for each backend
+BACKENDS: dict[str, Any] = {"odmlib": DEFINE, "fast": sys.modules[__name__]}
+
+
+def serialize(record: Record) -> tuple[str, set[str]]:
+    """
+    Serialize a record to the XML text odmlib produces for the equivalent element.
+
+    :param record: Define-XML element record
+    :return: the XML fragment and the namespace prefixes it uses
+    """
+    parts = []
+    prefixes = set()
+    _write(record, parts, prefixes)
+    return "".join(parts), prefixes
+
+
+def _write(record: Record, parts: list[str], prefixes: set[str]) -> None:
+    cls = type(record)
+    if cls.ns_prefix:
+        prefixes.add(cls.ns_prefix)
+    parts.append("<" + cls.tag)
+    attr_ns = cls.attr_ns
+    text = None
+    for name, value in record.attrs.items():
+        if name == "_content":
+            text = value
+        elif value is not None:
+            if name in attr_ns:
+                prefixes.add(attr_ns[name])
+                name = attr_ns[name] + ":" + name
+            parts.append(f' {name}="{_escape_attrib(str(value))}"')
+    children = []
+    for elem in cls.elems:
+        try:
+            child = object.__getattribute__(record, elem)
+        except AttributeError:
+            continue
+        if isinstance(child, list):
+            children.extend(child)
+        elif child is not None:
+            children.append(child)
+    if not text and not children:
+        parts.append(" />")
+        return
+    parts.append(">")
+    if text:
+        parts.append(_escape_cdata(text))
+    for child in children:
+        _write(child, parts, prefixes)
+    parts.append("</" + cls.tag + ">")
+
+
+# the ElementTree escaping functions used when odmlib objects are serialized, so both paths escape the same way
+_escape_attrib = ET._escape_attrib
+_escape_cdata = ET._escape_cdata
@@ -0,0 +1,142 @@
+"""
+define_registry.py - the define_objects registry shared by the loaders.
+
+DefineRegistry is the dictionary of Define-XML element lists (ItemDef, CodeList, WhereClauseDef, ...) that every loader
+appends to. Each list is an OIDList that keeps a dictionary index of its members by OID alongside the list, so the
+loaders can resolve cross-references in constant time while the list preserves insertion order for the output.
+"""
+from typing import Any, Iterable
+from define_profiler import NullProfiler, NULL_PROFILER
+import define_records
+from term_table import TermTable
+
+
+def oid_of(obj: Any) -> str | None:
+    """
+    Return the identifier of a define object: the OID attribute, the ID of a leaf, or the "OID" key of a dictionary
+    such as the stashed conditions.
+
+    :param obj: odmlib object or dictionary
+    :return: the OID or None if the object does not have one
+    """
+    if isinstance(obj, dict):
+        return obj.get("OID")
+    return getattr(obj, "OID", None) or getattr(obj, "ID", None)
+
+
+class OIDList(list):
+    """List of define objects with a dictionary index by OID. The first object added with an OID wins lookups."""
+
+    def __init__(self, objects: Iterable[Any] = ()) -> None:
+        super().__init__(objects)
+        self._index: dict[str, Any] | None = None
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    @property
+    def index_by_oid(self) -> dict[str, Any]:
+        """dictionary of the objects in the list keyed by OID"""
+        if self._index is None:
+            self._index = {}
+            for obj in self:
+                self._add_to_index(obj)
+        return self._index
+
+    def find(self, oid: str) -> Any | None:
+        return self.index_by_oid.get(oid)
+
+    def append(self, obj: Any) -> None:
+        super().append(obj)
+        if self._index is not None:
+            self._add_to_index(obj)
+
+    def extend(self, objects: Iterable[Any]) -> None:
+        objects = list(objects)
+        super().extend(objects)
+        if self._index is not None:
+            for obj in objects:
+                self._add_to_index(obj)
+
+    def __iadd__(self, objects: Iterable[Any]) -> "OIDList":
+        self.extend(objects)
+        return self
+
+    def clear(self) -> None:
+        super().clear()
+        self._index = None
+
+    # any other mutation drops the index so that it is rebuilt on the next lookup
+    def insert(self, position: int, obj: Any) -> None:
+        super().insert(position, obj)
+        self._index = None
+
+    def remove(self, obj: Any) -> None:
+        super().remove(obj)
+        self._index = None
+
+    def pop(self, position: int = -1) -> Any:
+        self._index = None
+        return super().pop(position)
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self._index = None
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self._index = None
+
+    def _add_to_index(self, obj: Any) -> None:
+        oid = oid_of(obj)
+        if oid is not None:
+            self._index.setdefault(oid, obj)
+
+
+class DefineRegistry(dict):
+    """Dictionary of define objects keyed by element type. List values are stored as OIDList so they are indexed."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__()
+        self.update(*args, **kwargs)
+        # stage profiler used by the loaders; not pickled, so registries sent to worker processes do not profile
+        self.profiler: NullProfiler = NULL_PROFILER
+        # name of the object model the loaders build: "odmlib" objects or "fast" define_records records
+        self.backend: str = "odmlib"
+        # interned codelist terms and range checks shared by the codelists and where clauses of this registry
+        self.terms: TermTable = TermTable()
+
+    @property
+    def model(self) -> Any:
+        """the odmlib Define-XML model module or the define_records module, depending on the backend"""
+        return define_records.BACKENDS[self.backend]
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if type(value) is list:
+            value = OIDList(value)
+        super().__setitem__(key, value)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def find(self, elem_name: str, oid: str) -> Any | None:
+        """
+        Find a define object by element type and OID.
+
+        :param elem_name: element type (e.g. "ItemDef", "WhereClauseDef", "_conditions")
+        :param oid: OID to search for
+        :return: object with matching OID or None if not found
+        """
+        objects = self.get(elem_name)
+        if not isinstance(objects, OIDList):
+            return None
+        return objects.find(oid)
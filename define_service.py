@@ -0,0 +1,330 @@
+"""
+define_service.py - local HTTP service that generates Define-XML from a DDS JSON payload.
+Example Cmd-line Args:
+    example: python define_service.py --port 8360 --workers 4
+    request: curl --data-binary @./data/define-360i.json "http://localhost:8360/define?validate=1" -o define.xml
+
+Starting define_generator.py for each request pays for the interpreter start-up, the odmlib and loader imports, the
+schema compile and the style sheet compile every time. The service keeps a pool of worker processes that have done all
+of this once, and generates each Define-XML in memory from the request body.
+
+POST /define with the DDS JSON as the body. Query parameters:
+    validate=1      schema validate the generated Define-XML
+    engine=lxml     schema validation engine (default: xmlschema)
+    backend=fast    object model built by the loaders (default: odmlib)
+    format=xml      response body: the Define-XML (xml, the default), the HTML rendering (html), or a JSON object with
+                    the Define-XML, the validation result and the timings (json)
+    html=1          with format=json, also render the HTML
+GET /health returns the service settings and request counts.
+
+The Server-Timing response header has the time each request waited for a free slot and a worker, the time spent
+generating, and the time of each pipeline step. X-Define-Valid has the validation result. Requests larger than
+--max-request-mb are refused with 413. When --max-concurrent requests are already running and none finishes within
+--queue-timeout seconds, the request is refused with 503.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_HOST: str = "127.0.0.1"
+DEFAULT_PORT: int = 8360
+MAX_REQUEST_BYTES: int = 64 * 1024 * 1024
+QUEUE_TIMEOUT: float = 30.0
+FORMATS: dict[str, str] = {"xml": "application/xml", "html": "text/html; charset=utf-8", "json": "application/json"}
+
+
+class RequestError(Exception):
+    """A request that cannot be processed, with the HTTP status to return."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        # both are passed to Exception so that errors raised in a worker process can be pickled
+        super().__init__(status, message)
+        self.status: HTTPStatus = status
+        self.message: str = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def warm_worker(engine: str, stylesheet: str | None) -> None:
+    """
+    Initialize a worker process: import the generator and compile the schema and the style sheet once so that the
+    first request handled by the worker does not pay for them.
+
+    :param engine: schema validation engine to compile the schema for
+    :param stylesheet: path and filename of the Define-XML style sheet (default: define2-1.xsl)
+    """
+    import define_generator  # noqa: F401
+    import define2html
+    from define_pipeline import DEFAULT_STYLESHEET
+    from define_validator import get_schema
+    get_schema(engine=engine)
+    if Path(stylesheet or DEFAULT_STYLESHEET).exists():
+        define2html.get_transform(stylesheet or DEFAULT_STYLESHEET)
+
+
+def generate_define(payload: bytes, options: dict[str, Any]) -> dict[str, Any]:
+    """
+    Generate a Define-XML document in memory from a DDS JSON payload. Runs in a worker process.
+
+    :param payload: DDS JSON document
+    :param options: "validate", "engine", "backend", "html" and "stylesheet" settings for the request
+    :return: {"xml", "html", "valid", "errors", "seconds"}
+    """
+    from define_generator import DefineGenerator
+    from define_pipeline import DefinePipeline, DEFAULT_STYLESHEET
+    seconds = {}
+    start = time.perf_counter()
+    try:
+        template = json.loads(payload)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid DDS JSON: {e}") from None
+    if not isinstance(template, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Invalid DDS JSON: expected an object")
+    seconds["json.load"] = time.perf_counter() - start
+    pipeline = None
+    if options["validate"] or options["html"]:
+        pipeline = DefinePipeline(validate=options["validate"], engine=options["engine"], render_html=options["html"],
+                                  stylesheet=options.get("stylesheet") or DEFAULT_STYLESHEET)
+    start = time.perf_counter()
+    try:
+        generator = DefineGenerator(None, None, log_level="WARNING", backend=options["backend"], template=template)
+        results = generator.create(pipeline) or {}
+    except (KeyError, ValueError, TypeError) as e:
+        raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, f"Unable to generate Define-XML: {e!r}") from None
+    seconds["generate"] = time.perf_counter() - start
+    seconds.update(results.get("seconds", {}))
+    return {"xml": generator.xml, "html": results.get("html"), "valid": results.get("valid"),
+            "errors": results.get("errors", []), "seconds": seconds}
+
+
+class DefineService:
+    """Generate Define-XML for HTTP requests with a bounded pool of warm workers."""
+
+    def __init__(self, workers: int = 0, max_concurrent: int | None = None,
+                 max_request_bytes: int = MAX_REQUEST_BYTES, queue_timeout: float = QUEUE_TIMEOUT,
+                 engine: str = "xmlschema", stylesheet: str | None = None) -> None:
+        """
+        :param workers: number of worker processes; 0 generates in a thread of this process
+        :param max_concurrent: requests processed or waiting for a worker at once (default: twice the workers)
+        :param max_request_bytes: largest DDS JSON payload accepted
+        :param queue_timeout: seconds a request waits for a free slot before it is refused
+        :param engine: schema validation engine compiled by the workers at start-up and used by default
+        :param stylesheet: path and filename of the Define-XML style sheet (default: define2-1.xsl)
+        """
+        self.workers: int = workers
+        self.max_concurrent: int = max_concurrent or max(2 * workers, 2)
+        self.max_request_bytes: int = max_request_bytes
+        self.queue_timeout: float = queue_timeout
+        self.engine: str = engine
+        self.stylesheet: str | None = stylesheet
+        self.slots: threading.BoundedSemaphore = threading.BoundedSemaphore(self.max_concurrent)
+        if workers > 0:
+            self.executor: Executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker,
+                                                          initargs=(engine, stylesheet))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent, initializer=warm_worker,
+                                               initargs=(engine, stylesheet))
+        self.counts: dict[str, int] = {"requests": 0, "errors": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def generate(self, payload: bytes, query: dict[str, str]) -> dict[str, Any]:
+        """
+        Generate the Define-XML for one request once a slot is free.
+
+        :param payload: DDS JSON document
+        :param query: request query parameters
+        :return: the generate_define() result with the seconds waited for a slot and a worker added as "queue"
+        """
+        options = self.options(query)
+        start = time.perf_counter()
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            self._count("rejected")
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many requests in progress; try again later")
+        try:
+            result = self.executor.submit(generate_define, payload, options).result()
+        finally:
+            self.slots.release()
+        total = time.perf_counter() - start
+        # the time not spent in the worker was spent waiting for a slot and a worker and passing the data to it
+        worker_seconds = result["seconds"]["json.load"] + result["seconds"]["generate"]
+        result["seconds"] = {"queue": total - worker_seconds, **result["seconds"], "total": total}
+        self._count("requests")
+        return result
+
+    def options(self, query: dict[str, str]) -> dict[str, Any]:
+        """return the generation options for the request's query parameters"""
+        output_format = query.get("format", "xml")
+        if output_format not in FORMATS:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Unknown format {output_format}; expected one of "
+                                                       f"{', '.join(FORMATS)}")
+        engine = query.get("engine", self.engine)
+        if engine not in ("xmlschema", "lxml"):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Unknown validation engine {engine}")
+        backend = query.get("backend", "odmlib")
+        if backend not in ("odmlib", "fast"):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Unknown backend {backend}")
+        return {"validate": _is_true(query.get("validate")), "engine": engine, "backend": backend,
+                "html": output_format == "html" or _is_true(query.get("html")), "format": output_format,
+                "stylesheet": self.stylesheet}
+
+    def health(self) -> dict[str, Any]:
+        """return the service settings and request counts"""
+        return {"workers": self.workers, "max_concurrent": self.max_concurrent,
+                "max_request_bytes": self.max_request_bytes, "engine": self.engine, **self.counts}
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        self.executor.shutdown(cancel_futures=True)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+
+def _is_true(value: str | None) -> bool:
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+class DefineRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler for the Define-XML generation service."""
+    server_version = "define-service"
+    # the DefineService used by the handlers; set by make_server
+    service: DefineService
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self._send(HTTPStatus.OK, json.dumps(self.service.health()).encode("utf-8"), FORMATS["json"])
+        else:
+            self._send_error(RequestError(HTTPStatus.NOT_FOUND, "Not found"))
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/define":
+            self._send_error(RequestError(HTTPStatus.NOT_FOUND, "Not found"))
+            return
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            payload = self._read_payload()
+            result = self.service.generate(payload, query)
+        except RequestError as e:
+            self._send_error(e)
+            return
+        except Exception as e:
+            logging.exception("define service: request failed")
+            self._send_error(RequestError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Unable to generate Define-XML: {e!r}"))
+            return
+        output_format = query.get("format", "xml")
+        headers = {"Server-Timing": ", ".join(f"{step.replace(':', '-')};dur={seconds * 1000:.1f}"
+                                              for step, seconds in result["seconds"].items())}
+        if result["valid"] is not None:
+            headers["X-Define-Valid"] = str(result["valid"]).lower()
+        if output_format == "json":
+            body = json.dumps({"valid": result["valid"], "errors": result["errors"], "seconds": result["seconds"],
+                               "xml": result["xml"].decode("utf-8"),
+                               "html": result["html"].decode("utf-8") if result["html"] else None}).encode("utf-8")
+        else:
+            body = result[output_format]
+        self._send(HTTPStatus.OK, body, FORMATS[output_format], headers)
+
+    def _read_payload(self) -> bytes:
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            raise RequestError(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+        if int(length) > self.service.max_request_bytes:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"The DDS JSON is larger than "
+                                                                    f"{self.service.max_request_bytes} bytes")
+        return self.rfile.read(int(length))
+
+    def _send_error(self, error: RequestError) -> None:
+        if error.status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            self.service._count("errors")
+        self.close_connection = True
+        headers = {"Retry-After": "1"} if error.status == HTTPStatus.SERVICE_UNAVAILABLE else {}
+        self._send(error.status, json.dumps({"error": str(error)}).encode("utf-8"), FORMATS["json"], headers)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.info(f"define service: {self.address_string()} {format % args}")
+
+
+def make_server(service: DefineService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server for a service; call serve_forever() to handle requests.
+
+    :param service: the service that generates the Define-XML
+    :param host: interface to listen on (default: localhost only)
+    :param port: port to listen on; 0 picks a free port
+    """
+    handler = type("BoundDefineRequestHandler", (DefineRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the Define-XML generation service.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", help=f"interface to listen on (default: {DEFAULT_HOST})", default=DEFAULT_HOST,
+                        dest="host")
+    parser.add_argument("--port", help=f"port to listen on (default: {DEFAULT_PORT})", type=int, default=DEFAULT_PORT,
+                        dest="port")
+    parser.add_argument("-w", "--workers", help="number of worker processes (default: number of CPUs); 0 generates "
+                        "in threads of the server process", type=int, default=os.cpu_count() or 1, dest="workers")
+    parser.add_argument("--max-concurrent", help="requests processed or queued at once (default: twice the workers)",
+                        type=int, dest="max_concurrent")
+    parser.add_argument("--max-request-mb", help=f"largest DDS JSON accepted in MB (default: "
+                        f"{MAX_REQUEST_BYTES // (1024 * 1024)})", type=float,
+                        default=MAX_REQUEST_BYTES / (1024 * 1024), dest="max_request_mb")
+    parser.add_argument("--queue-timeout", help=f"seconds a request waits for a free slot (default: {QUEUE_TIMEOUT})",
+                        type=float, default=QUEUE_TIMEOUT, dest="queue_timeout")
+    parser.add_argument("--engine", help="default schema validation engine (default: xmlschema)", default="xmlschema",
+                        choices=["xmlschema", "lxml"], dest="engine")
+    parser.add_argument("--stylesheet", help="path and file name of the Define-XML style sheet", dest="style_sheet")
+    parser.add_argument("-l", "--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="logging level", dest="log_level")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = set_cmd_line_args()
+    logging.basicConfig(filename="define_service.log", level=getattr(logging, args.log_level),
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    service = DefineService(workers=args.workers, max_concurrent=args.max_concurrent,
+                            max_request_bytes=int(args.max_request_mb * 1024 * 1024),
+                            queue_timeout=args.queue_timeout, engine=args.engine, stylesheet=args.style_sheet)
+    server = make_server(service, args.host, args.port)
+    print(f"serving Define-XML generation on http://{args.host}:{server.server_address[1]}/define "
+          f"with {args.workers} workers (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+define_shards.py - write the Define-XML for each dataset as a separate shard in parallel and merge the shards into one
+define.xml.
+Example Cmd-line Args:
+    shard and merge: -t ./data/define-360i.json -s ./define_shards -d ./data/define-360i.xml -w 4
+    shard only: -t ./data/define-360i.json -s ./define_shards --no-merge
+    merge only: -s ./define_shards -d ./data/define-360i.xml --merge-only
+
+Each shard holds the serialized ItemGroupDef of one dataset with its ItemDefs, ValueListDefs, the WhereClauseDefs its
+value lists reference and the CodeLists its variables reference. Shards are written by a pool of worker processes that
+each parse the DDS JSON once. The common shard holds everything else: the methods, comments, standards and other
+sections, the codelists and where clauses no dataset references and the annotated CRF leaf. The ODM, Study and
+MetaDataVersion elements around the shards are kept in the manifest.
+
+Every fragment is keyed by the DDS section, the element of the section and its position among the objects that element
+created, so merging the shards in key order for each element type gives the same document as the generator. The merge
+streams the shards, reading one line of each at a time, and writes a codelist or where clause shared by several
+datasets once.
+
+The manifest records a digest of the DDS content of each shard. When the shards are written again, only the shards
+whose dataset, codelists, where clauses or conditions changed are regenerated, unless the generator code or the order
+of the datasets, codelists and where clauses changed.
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, IO, Iterator
+from xml.sax.saxutils import unescape
+import dds_reader
+import parallel_loader
+import stream_writer
+from define_generator import DefineGenerator, ELEMENTS, LOADERS
+from fragment_cache import cache_version
+from constants import DEFAULT_OUTPUT_FILE
+
+MANIFEST_FILE: str = "manifest.json"
+COMMON_SHARD: str = "common.jsonl"
+# sections loaded one element at a time into the dataset shards, or into the common shard if no dataset references them
+SHARDED_SECTIONS: tuple[str, ...] = ("itemGroups", "codeLists", "whereClauses")
+# dataset element types that reference the codelists and where clauses of its shard
+REFERENCING_ELEMENTS: frozenset[str] = frozenset(["ItemDef", "ValueListDef"])
+# reference attributes and the section of the elements they refer to
+REFERENCES: dict[str, str] = {"CodeListOID": "codeLists", "WhereClauseOID": "whereClauses"}
+
+# a shard line: (element type index in ELEMENTS, [section index, element index, object index], XML fragment)
+ShardLine = tuple[int, list[int], str]
+
+# characters of a dataset OID not used in its shard file name
+_UNSAFE = re.compile(r"[^\w.-]")
+_REFERENCE = re.compile(r"\b(CodeListOID|WhereClauseOID)=\"([^\"]*)\"")
+_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+# the DDS content of the worker process, set by init_worker
+_state: dict[str, Any] = {}
+
+
+def init_worker(dds_file: str, json_parser: str, backend: str, lang: str, acrf: str) -> None:
+    """
+    Parse the DDS JSON once in a worker process.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param json_parser: JSON parser for the DDS file
+    :param backend: object model the loaders build ("odmlib" or "fast")
+    :param lang: xml:lang setting for TranslatedText
+    :param acrf: annotated case report form leaf ID
+    """
+    set_state(dds_reader.load_dds(dds_file, json_parser), json_parser, backend, lang, acrf)
+
+
+def set_state(template: dict[str, Any], json_parser: str, backend: str, lang: str, acrf: str) -> None:
+    """index the DDS content that write_shard loads from"""
+    _state.clear()
+    _state.update(template=template, encode=_line_encoder(json_parser), backend=backend, lang=lang, acrf=acrf,
+                  sections=_section_index(template),
+                  codeLists=_oid_index(template.get("codeLists", [])),
+                  whereClauses=_oid_index(template.get("whereClauses", [])), fragments={})
+    result = parallel_loader.load_chunk(LOADERS["conditions"], template.get("conditions", []), ELEMENTS, lang, acrf,
+                                        None, backend) if "conditions" in template else []
+    _state["shared"] = {key: value for key, value, _ in result if key == "_conditions"}
+
+
+def write_shard(dataset_index: int, shard_file: str) -> dict[str, Any]:
+    """
+    Generate the shard of one dataset.
+
+    :param dataset_index: position of the dataset in the itemGroups section
+    :param shard_file: path and filename of the shard to write
+    :return: {"prefixes", "counts", "codeLists", "whereClauses"} with the codelist and where clause OIDs the dataset
+        references
+    """
+    sections = _state["sections"]
+    lines, prefixes = _load_fragments("itemGroups", sections["itemGroups"], dataset_index,
+                                      _state["template"]["itemGroups"][dataset_index], _state)
+    references = {section: set() for section in REFERENCES.values()}
+    for elem, _, xml in lines:
+        if ELEMENTS[elem] in REFERENCING_ELEMENTS:
+            for attribute, oid in _REFERENCE.findall(xml):
+                references[REFERENCES[attribute]].add(unescape(oid, _ENTITIES))
+    references = {section: sorted(oids) for section, oids in references.items()}
+    for section, oids in references.items():
+        for oid in oids:
+            for index, item in _state[section].get(oid, []):
+                # a codelist or where clause shared by several datasets is loaded once by each worker process
+                if (section, index) not in _state["fragments"]:
+                    _state["fragments"][(section, index)] = _load_fragments(section, sections[section], index, item,
+                                                                            _state)
+                section_lines, section_prefixes = _state["fragments"][(section, index)]
+                lines.extend(section_lines)
+                prefixes |= section_prefixes
+    return dict(_write_lines(shard_file, lines, _state["encode"]), prefixes=sorted(prefixes), **references)
+
+
+def write_shards(dds_file: str, shard_dir: str, workers: int = 0, backend: str = "odmlib",
+                 json_parser: str = "auto", log_level: str = "INFO") -> dict[str, Any]:
+    """
+    Write the shard of each dataset and the common shard, regenerating only the dataset shards whose DDS content
+    changed since the shards were last written to shard_dir.
+
+    :param dds_file: path and filename of the DDS JSON file
+    :param shard_dir: directory for the shards and their manifest; created if needed
+    :param workers: number of worker processes writing dataset shards (0 or 1 = write them in this process)
+    :param backend: object model the loaders build ("odmlib" or "fast")
+    :param json_parser: JSON parser for the DDS file, "orjson", "json" or "auto" for the fastest one installed
+    :param log_level: logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    :return: the manifest, with {"written", "reused"} counts of dataset shards
+    """
+    json_parser = dds_reader.json_parser(json_parser)[0]
+    template = dds_reader.load_dds(dds_file, json_parser)
+    # the generator handles the sections that are not sharded, the study-level metadata and the ODM skeleton
+    generator = DefineGenerator(None, None, log_level=log_level, template=template)
+    lang, acrf = generator.lang, generator.acrf
+    shard_path = Path(shard_dir)
+    shard_path.mkdir(parents=True, exist_ok=True)
+    datasets = template.get("itemGroups", [])
+    previous = _reusable_manifest(shard_path, template)
+    indexes = {section: _oid_index(template.get(section, [])) for section in SHARDED_SECTIONS[1:]}
+    condition_index = {condition["OID"]: condition for condition in template.get("conditions", [])}
+    shards = []
+    pending = []
+    for n, dataset in enumerate(datasets):
+        name = f"{n:05d}-{_UNSAFE.sub('_', str(dataset.get('OID')))}.jsonl"
+        shard = previous["shards"][n] if previous else None
+        if shard and (shard_path / shard["file"]).is_file() and shard["digest"] == _shard_digest(
+                dataset, shard, indexes, condition_index):
+            shards.append(shard)
+        else:
+            shards.append({"dataset": dataset.get("OID"), "file": name})
+            pending.append(n)
+    logging.info(f"writing {len(pending)} of {len(datasets)} dataset shards")
+
+    executor = None
+    if workers > 1 and len(pending) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                       initargs=(dds_file, json_parser, backend, lang, acrf))
+        futures = {n: executor.submit(write_shard, n, str(shard_path / shards[n]["file"])) for n in pending}
+    else:
+        set_state(template, json_parser, backend, lang, acrf)
+    try:
+        # the common shard is loaded while the workers write the dataset shards
+        common = _CommonShard(generator, template)
+        for n in pending:
+            result = futures[n].result() if executor else write_shard(n, str(shard_path / shards[n]["file"]))
+            shards[n].update(result)
+            shards[n]["digest"] = _shard_digest(datasets[n], shards[n], indexes, condition_index)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        _state.clear()
+
+    referenced = {section: {oid for shard in shards for oid in shard[section]} for section in SHARDED_SECTIONS[1:]}
+    prefixes = set().union(*(shard["prefixes"] for shard in shards))
+    manifest = common.write(str(shard_path / COMMON_SHARD), referenced, prefixes, backend, json_parser)
+    manifest.update(format=1, version=cache_version(), layout=_layout(template), shards=shards,
+                    written=len(pending), reused=len(datasets) - len(pending))
+    # remove the shards of datasets that are no longer in the DDS
+    current = {shard["file"] for shard in shards} | {COMMON_SHARD}
+    for stale in shard_path.glob("*.jsonl"):
+        if stale.name not in current:
+            stale.unlink()
+    _write_json(shard_path / MANIFEST_FILE, manifest)
+    logging.info(f"wrote {len(pending)} dataset shards and reused {manifest['reused']} in {shard_dir}")
+    return manifest
+
+
+def merge_shards(shard_dir: str, define_file: str) -> dict[str, int]:
+    """
+    Merge the shards in shard_dir into one Define-XML file, streaming the shards in key order and writing each
+    codelist and where clause shared by several datasets once.
+
+    :param shard_dir: directory written by write_shards
+    :param define_file: path and filename for the output Define-XML v2.1 file
+    :return: {"shards", "elements", "duplicates"} counts
+    """
+    shard_path = Path(shard_dir)
+    manifest = json.loads((shard_path / MANIFEST_FILE).read_text())
+    files = [shard_path / COMMON_SHARD] + [shard_path / shard["file"] for shard in manifest["shards"]]
+    stats = {"shards": len(files), "elements": 0, "duplicates": 0}
+    with ExitStack() as stack, open(define_file, "wb") as fh:
+        lines = [_read_lines(stack.enter_context(open(file, "rb"))) for file in files]
+        fh.write((stream_writer.XML_DECLARATION + manifest["head"]).encode("utf-8"))
+        last = None
+        for elem, key, xml in heapq.merge(*lines):
+            if (elem, key) == last:
+                stats["duplicates"] += 1
+                continue
+            last = (elem, key)
+            fh.write(xml.encode("utf-8"))
+            stats["elements"] += 1
+        fh.write(manifest["tail"].encode("utf-8"))
+    logging.info(f"merged {stats['shards']} shards into {define_file}: {stats['elements']} elements, "
+                 f"{stats['duplicates']} shared definitions written once")
+    return stats
+
+
+class _CommonShard:
+    """The content of a DDS that is not in a dataset shard, loaded by a DefineGenerator."""
+
+    def __init__(self, generator: DefineGenerator, template: dict[str, Any]) -> None:
+        """
+        Load the study-level metadata and the sections that are not sharded.
+
+        :param generator: generator initialized with the DDS content as its template
+        :param template: DDS content
+        """
+        self.generator: DefineGenerator = generator
+        self.template: dict[str, Any] = template
+        self.sections: dict[str, int] = _section_index(template)
+        generator._init_define_objects()
+        generator._load_study(template)
+        # the key of each object in the define_objects element lists, and the lists they were assigned for
+        self.keys: dict[str, list[list[int]]] = {elem: [] for elem in ELEMENTS}
+        self.lists: dict[str, list[Any]] = {}
+        for section, data in template.items():
+            if type(data) is not list:
+                generator.define_attributes[section] = data
+            elif section not in SHARDED_SECTIONS:
+                generator._load(section, data)
+                self._assign_keys(self.sections[section])
+
+    def write(self, shard_file: str, referenced: dict[str, set[str]], prefixes: set[str],
+              backend: str = "odmlib", json_parser: str = "json") -> dict[str, Any]:
+        """
+        Write the common shard with the codelists and where clauses not referenced by a dataset, and serialize the
+        ODM skeleton around the shards.
+
+        :param shard_file: path and filename of the common shard
+        :param referenced: codelist and where clause OIDs referenced by the dataset shards
+        :param prefixes: namespace prefixes used by the dataset shards
+        :param backend: object model the codelist and where clause loaders build ("odmlib" or "fast")
+        :param json_parser: JSON parser whose encoder writes the shard lines
+        :return: {"common", "head", "tail"} manifest entries
+        """
+        generator = self.generator
+        lines = []
+        prefixes = set(prefixes)
+        state = {"lang": generator.lang, "acrf": generator.acrf, "backend": backend,
+                 "shared": {key: generator.define_objects[key] for key in ("_conditions",)
+                            if key in generator.define_objects}}
+        for section in SHARDED_SECTIONS[1:]:
+            for index, item in enumerate(self.template.get(section, [])):
+                if item.get("OID") not in referenced[section]:
+                    section_lines, section_prefixes = _load_fragments(section, self.sections[section], index, item,
+                                                                      state)
+                    lines.extend(section_lines)
+                    prefixes |= section_prefixes
+        odm = generator._build_doc()
+        # the annotated CRF leaf created by _build_doc follows every section
+        self._assign_keys(len(self.template))
+        mdv = odm.Study.MetaDataVersion
+        for elem in ELEMENTS:
+            objects = getattr(mdv, elem)
+            for key, obj in zip(self.keys[elem], objects):
+                xml, obj_prefixes = stream_writer.serialize_element(obj)
+                lines.append((ELEMENTS.index(elem), key, xml))
+                prefixes |= obj_prefixes
+            objects.clear()
+        head, tail = stream_writer.serialize_skeleton(odm, prefixes)
+        common = dict(_write_lines(shard_file, lines, _line_encoder(json_parser)), file=Path(shard_file).name)
+        return {"common": common, "head": head, "tail": tail}
+
+    def _assign_keys(self, section_index: int) -> None:
+        """key the objects a section added to define_objects; a list the section replaced drops the earlier keys"""
+        for elem in ELEMENTS:
+            objects = self.generator.define_objects[elem]
+            if objects is not self.lists.get(elem):
+                self.lists[elem] = objects
+                self.keys[elem] = []
+            keys = self.keys[elem]
+            keys.extend([section_index, 0, n] for n in range(len(keys), len(objects)))
+
+
+def _load_fragments(section: str, section_index: int, index: int, item: dict[str, Any],
+                    state: dict[str, Any]) -> tuple[list[ShardLine], set[str]]:
+    """
+    Load one element of a sharded section and serialize the objects it creates.
+
+    :param section: name of the section in the DDS JSON
+    :param section_index: position of the section in the DDS JSON
+    :param index: position of the element in the section
+    :param item: the section element (dataset, codelist or where clause)
+    :param state: lang, acrf, backend and the shared conditions the where clause loader reads
+    :return: the shard lines and the namespace prefixes they use
+    """
+    shared = state["shared"] if section == "whereClauses" else None
+    result = parallel_loader.load_chunk(LOADERS[section], [item], ELEMENTS, state["lang"], state["acrf"], shared,
+                                        state["backend"])
+    lines = []
+    prefixes = set()
+    for elem, objects, _ in result:
+        if elem in ELEMENTS:
+            for n, obj in enumerate(objects):
+                xml, obj_prefixes = stream_writer.serialize_element(obj)
+                lines.append((ELEMENTS.index(elem), [section_index, index, n], xml))
+                prefixes |= obj_prefixes
+    return lines, prefixes
+
+
+def _write_lines(shard_file: str, lines: list[ShardLine], encode: Callable[[ShardLine], bytes]) -> dict[str, Any]:
+    """write the shard lines sorted by element type and key, one JSON array per line, and return their counts"""
+    lines.sort()
+    counts = {}
+    tmp_file = f"{shard_file}.tmp"
+    with open(tmp_file, "wb") as fh:
+        for line in lines:
+            fh.write(encode(line) + b"\n")
+            counts[ELEMENTS[line[0]]] = counts.get(ELEMENTS[line[0]], 0) + 1
+    os.replace(tmp_file, shard_file)
+    return {"counts": counts}
+
+
+def _line_encoder(json_parser: str) -> Callable[[ShardLine], bytes]:
+    """return a function that encodes a shard line as UTF-8 JSON, with orjson when it is the JSON parser"""
+    if json_parser == "orjson":
+        import orjson
+        return orjson.dumps
+    return lambda line: json.dumps(line, ensure_ascii=False).encode("utf-8")
+
+
+def _read_lines(fh: IO[bytes]) -> Iterator[ShardLine]:
+    """yield the lines of a shard as (element type index, key, XML fragment) tuples"""
+    loads = dds_reader.json_parser()[1]
+    for line in fh:
+        elem, key, xml = loads(line)
+        yield elem, key, xml
+
+
+def _reusable_manifest(shard_path: Path, template: dict[str, Any]) -> dict[str, Any] | None:
+    """return the manifest of the shards in shard_path if its dataset shards can be reused for this DDS content"""
+    manifest_file = shard_path / MANIFEST_FILE
+    if not manifest_file.is_file():
+        return None
+    try:
+        manifest = json.loads(manifest_file.read_text())
+    except json.JSONDecodeError:
+        logging.warning(f"Shard manifest {manifest_file} is invalid; regenerating all shards")
+        return None
+    if manifest.get("version") != cache_version() or manifest.get("layout") != _layout(template):
+        logging.info(f"Shards in {shard_path} were written by a different generator version or for different "
+                     "datasets, codelists or where clauses; regenerating all shards")
+        return None
+    return manifest
+
+
+def _layout(template: dict[str, Any]) -> str:
+    """digest of the section order and the OIDs of the sharded sections, which the shard keys are built from"""
+    layout = [list(template)] + [[item.get("OID") for item in template.get(section, [])]
+                                 for section in SHARDED_SECTIONS]
+    return hashlib.sha256(json.dumps(layout).encode("utf-8")).hexdigest()
+
+
+def _shard_digest(dataset: dict[str, Any], shard: dict[str, Any], indexes: dict[str, dict[str, list]],
+                  condition_index: dict[str, dict[str, Any]]) -> str:
+    """digest of the DDS content a dataset shard is generated from, with the conditions of its where clauses"""
+    codelists = [item for oid in shard["codeLists"] for _, item in indexes["codeLists"].get(oid, [])]
+    where_clauses = [{"whereClause": item,
+                      "conditions": [condition_index.get(oid) for oid in item.get("conditions", [])]}
+                     for oid in shard["whereClauses"] for _, item in indexes["whereClauses"].get(oid, [])]
+    payload = json.dumps([dataset, codelists, where_clauses], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _section_index(template: dict[str, Any]) -> dict[str, int]:
+    return {section: n for n, section in enumerate(template)}
+
+
+def _oid_index(items: list[dict[str, Any]]) -> dict[str, list[tuple[int, dict[str, Any]]]]:
+    """index section elements by OID, keeping every element that has the same OID"""
+    index = {}
+    for n, item in enumerate(items):
+        index.setdefault(item.get("OID"), []).append((n, item))
+    return index
+
+
+def _write_json(file: Path, content: dict[str, Any]) -> None:
+    tmp_file = file.with_name(file.name + ".tmp")
+    tmp_file.write_text(json.dumps(content, indent=1, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_file, file)
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the sharded Define-XML generator.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--template", help="path and file name of the template file to load; required unless "
+                        "--merge-only is given", dest="dds_file")
+    parser.add_argument("-s", "--shard-dir", help="directory for the shards and their manifest", required=True,
+                        dest="shard_dir")
+    parser.add_argument("-d", "--define", help="path and file name of Define-XML v2 file to merge the shards into",
+                        dest="define_file", default=DEFAULT_OUTPUT_FILE)
+    parser.add_argument("-w", "--workers", help="number of worker processes writing dataset shards (default: write "
+                        "them in this process)", type=int, default=0, dest="workers")
+    parser.add_argument("--no-merge", help="write the shards without merging them", default=False,
+                        action="store_true", dest="is_no_merge")
+    parser.add_argument("--merge-only", help="merge the shards already in the shard directory", default=False,
+                        action="store_true", dest="is_merge_only")
+    parser.add_argument("--backend", help="object model built by the loaders (default: odmlib)", default="odmlib",
+                        choices=["odmlib", "fast"], dest="backend")
+    parser.add_argument("--json-parser", help="JSON parser for the DDS file (default: auto, the fastest installed)",
+                        default="auto", choices=("auto",) + dds_reader.PARSERS, dest="json_parser")
+    parser.add_argument("-l", "--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level (default: INFO)")
+    args = parser.parse_args()
+    if not args.dds_file and not args.is_merge_only:
+        parser.error("the template (-t) is required unless --merge-only is given")
+    if args.is_no_merge and args.is_merge_only:
+        parser.error("--no-merge and --merge-only cannot be combined")
+    return args
+
+
+def main() -> None:
+    """Main entry point that writes the Define-XML shards of a DDS JSON file and merges them into one define.xml."""
+    args = set_cmd_line_args()
+    logging.basicConfig(filename="define_generator.log", level=getattr(logging, args.log_level),
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    if not args.is_merge_only:
+        if not os.path.isfile(args.dds_file):
+            print(f"ERROR: The template file {args.dds_file} cannot be found.", file=sys.stderr)
+            sys.exit(1)
+        manifest = write_shards(args.dds_file, args.shard_dir, workers=args.workers, backend=args.backend,
+                                json_parser=args.json_parser, log_level=args.log_level)
+        print(f"{manifest['written']} dataset shards written and {manifest['reused']} reused in {args.shard_dir}")
+    if not args.is_no_merge:
+        stats = merge_shards(args.shard_dir, args.define_file)
+        print(f"merged {stats['shards']} shards into {args.define_file}: {stats['elements']} elements, "
+              f"{stats['duplicates']} shared definitions written once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+define_snapshot.py - save and load the state the loaders build from a DDS JSON file.
+
+Rendering HTML, diffing or reporting on the same study re-runs the loaders from the DDS JSON each time, although the
+loaders produce the same define_objects on every run. A snapshot stores that state once the loaders have run: the
+define_objects registry (including the _conditions stash), the study-level define_attributes, the language and the
+annotated CRF leaf ID. The generator can then build and write the Define-XML straight from the snapshot.
+
+A snapshot file is a magic line, a JSON header line and a pickle (protocol 5) of the state. The file is memory-mapped
+and unpickled with the garbage collector paused, as the collector otherwise walks the growing object graph repeatedly
+while the objects are created. Snapshots are tied to the generator code: the header records the fragment cache version
+(generator version, odmlib version and source digest), and a snapshot written by another version is rejected.
+"""
+import gc
+import json
+import mmap
+import os
+import pickle
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+from define_registry import DefineRegistry
+from fragment_cache import cache_version
+
+SNAPSHOT_MAGIC: bytes = b"DEFINE-SNAPSHOT\n"
+SNAPSHOT_FORMAT: int = 1
+
+
+def save_snapshot(snapshot_file: str | os.PathLike, define_objects: DefineRegistry, define_attributes: dict[str, Any],
+                  lang: str, acrf: str) -> int:
+    """
+    Write the state created by the loaders to a snapshot file.
+
+    :param snapshot_file: path and filename of the snapshot to write
+    :param define_objects: registry of define objects created by the loaders
+    :param define_attributes: study-level sections of the DDS JSON
+    :param lang: language used for the TranslatedText elements
+    :param acrf: leaf ID of the annotated CRF
+    :return: size of the snapshot in bytes
+    """
+    header = {"format": SNAPSHOT_FORMAT, "version": cache_version(), "backend": define_objects.backend}
+    state = {"define_objects": dict(define_objects), "define_attributes": define_attributes, "lang": lang,
+             "acrf": acrf}
+    snapshot_file = Path(snapshot_file)
+    snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = snapshot_file.with_name(snapshot_file.name + ".tmp")
+    with _gc_paused(), open(tmp_file, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        pickle.dump(state, f, protocol=5)
+        size = f.tell()
+    os.replace(tmp_file, snapshot_file)
+    return size
+
+
+def load_snapshot(snapshot_file: str | os.PathLike) -> dict[str, Any]:
+    """
+    Load the state saved by save_snapshot().
+
+    :param snapshot_file: path and filename of the snapshot
+    :return: {"define_objects", "define_attributes", "lang", "acrf", "backend"}; define_objects is a DefineRegistry
+    :raises ValueError: if the file is not a snapshot or was written by a different generator version
+    """
+    with open(snapshot_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{snapshot_file} is not a Define-XML snapshot")
+        end = mapped.find(b"\n", len(SNAPSHOT_MAGIC))
+        header = json.loads(mapped[len(SNAPSHOT_MAGIC):end])
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != cache_version():
+            raise ValueError(f"{snapshot_file} was created by a different generator version "
+                             f"({header.get('version')}); regenerate it from the DDS JSON")
+        with memoryview(mapped) as view, view[end + 1:] as payload, _gc_paused():
+            state = pickle.loads(payload)
+    define_objects = DefineRegistry(state["define_objects"])
+    define_objects.backend = header["backend"]
+    return {**state, "define_objects": define_objects, "backend": header["backend"]}
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """disable the cyclic garbage collector, restoring its previous state on exit"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
@@ -0,0 +1,219 @@
+"""
+define_validator.py - schema validate Define-XML documents with a schema compiled once per process.
+Example Cmd-line Args:
+    example: python define_validator.py -d ./data/define-360i.xml
+    batch: python define_validator.py -d ./defines/*.xml --engine lxml -v
+    streaming: python define_validator.py -d ./data/define-360i.xml --stream-threshold 0
+
+DefineSchemaValidator loads and compiles the Define-XML v2.1 and ODM XSD set every time it is created and reads the
+document from disk. DefineValidator keeps the compiled schema in a process-level cache and validates a file, a bytes
+buffer or an lxml tree already in memory, so the generator can validate its output without writing and re-reading it
+and a batch of files costs one schema compile. The time spent loading the schema is reported separately from the time
+spent validating.
+
+Two engines are available for the same XSD: "xmlschema", which is what defineutils uses, and "lxml", which uses
+libxml2 and is much faster to compile and validate with.
+
+lxml, xmlschema and defineutils are imported on first use, so importing this module for its settings (as the generator
+does even when it does not validate) does not load the XSD machinery.
+"""
+from __future__ import annotations
+import argparse
+import glob
+import importlib.util
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from lxml import etree
+
+# the schema files installed with defineutils, located without importing defineutils.validate
+DEFAULT_XSD: Path = (Path(importlib.util.find_spec("defineutils").submodule_search_locations[0]) / "validate" /
+                     "schema" / "cdisc-define-2.1" / "define2-1-0.xsd")
+ENGINES: list[str] = ["xmlschema", "lxml"]
+# errors reported per document; validation stops collecting after this many
+MAX_ERRORS: int = 100
+# files larger than this many bytes are validated one subtree at a time by stream_validator
+STREAM_THRESHOLD: int = 100 * 1024 * 1024
+
+# compiled schemas and the seconds spent loading them, by (engine, resolved XSD path)
+_SCHEMAS: dict[tuple[str, str], Any] = {}
+LOAD_TIMES: dict[tuple[str, str], float] = {}
+_LOCK = threading.Lock()
+
+
+def get_schema(xsd_file: str | Path = DEFAULT_XSD, engine: str = "xmlschema") -> tuple[Any, float]:
+    """
+    Return the compiled schema, loading and compiling it only on the first call for the XSD and engine in this process.
+
+    :param xsd_file: path and filename of the Define-XML XSD
+    :param engine: "xmlschema" or "lxml"
+    :return: the compiled schema and the seconds spent loading it in this call (0 when it was already compiled)
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown schema validation engine {engine}; expected one of {', '.join(ENGINES)}")
+    key = (engine, str(Path(xsd_file).resolve()))
+    with _LOCK:
+        if key in _SCHEMAS:
+            return _SCHEMAS[key], 0.0
+        start = time.perf_counter()
+        if engine == "lxml":
+            from lxml import etree
+            _SCHEMAS[key] = etree.XMLSchema(etree.parse(key[1]))
+        else:
+            import xmlschema as XSD
+            _SCHEMAS[key] = XSD.XMLSchema(key[1])
+        LOAD_TIMES[key] = time.perf_counter() - start
+        logging.info(f"loaded {engine} schema {key[1]} in {LOAD_TIMES[key]:.3f} s")
+        return _SCHEMAS[key], LOAD_TIMES[key]
+
+
+class DefineValidator:
+    """Validate Define-XML documents against a schema compiled once per process."""
+
+    def __init__(self, xsd_file: str | Path = DEFAULT_XSD, engine: str = "xmlschema",
+                 stream_threshold: int | None = STREAM_THRESHOLD) -> None:
+        """
+        :param xsd_file: path and filename of the Define-XML XSD
+        :param engine: "xmlschema" (as used by defineutils) or "lxml" (libxml2)
+        :param stream_threshold: validate files larger than this many bytes with the streaming validator instead of
+            parsing the whole tree; None always parses the whole tree
+        """
+        self.xsd_file: str | Path = xsd_file
+        self.engine: str = engine
+        self.stream_threshold: int | None = stream_threshold
+        self.schema, self.load_seconds = get_schema(xsd_file, engine)
+
+    def validate(self, source: str | Path | bytes | etree._ElementTree | etree._Element) -> dict[str, Any]:
+        """
+        Validate one Define-XML document.
+
+        :param source: path to a Define-XML file, the document as bytes, or an lxml tree or root element
+        :return: {"valid", "errors", "seconds": {"schema_load", "parse", "validate"}}; schema_load is the time spent
+            compiling the schema for this validator, and is only non-zero for the first validator in the process
+        """
+        if self._use_stream(source):
+            # imported here because stream_validator uses this module's schema cache
+            from stream_validator import StreamingDefineValidator
+            result = StreamingDefineValidator(self.xsd_file, self.engine).validate(source)
+            result["seconds"]["schema_load"], self.load_seconds = self.load_seconds, 0.0
+            return result
+        from lxml import etree
+        result = {"valid": False, "errors": [], "seconds": {"schema_load": self.load_seconds, "parse": 0.0,
+                                                             "validate": 0.0}}
+        self.load_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            tree = self._parse(source)
+        except (OSError, etree.XMLSyntaxError) as e:
+            result["errors"].append(f"Unable to read Define-XML: {e}")
+            return result
+        finally:
+            result["seconds"]["parse"] = time.perf_counter() - start
+        start = time.perf_counter()
+        result["errors"] = self._lxml_errors(tree) if self.engine == "lxml" else self._xmlschema_errors(tree)
+        result["seconds"]["validate"] = time.perf_counter() - start
+        result["valid"] = not result["errors"]
+        return result
+
+    def validate_files(self, define_files: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Validate a batch of Define-XML files with the same compiled schema.
+
+        :param define_files: paths of the Define-XML files
+        :return: the validate() result for each file
+        """
+        return {define_file: self.validate(define_file) for define_file in define_files}
+
+    def _use_stream(self, source: Any) -> bool:
+        """return True if the source is a file larger than the streaming threshold"""
+        if self.stream_threshold is None or not isinstance(source, (str, Path)):
+            return False
+        try:
+            return Path(source).stat().st_size > self.stream_threshold
+        except OSError:
+            return False
+
+    @staticmethod
+    def _parse(source: str | Path | bytes | etree._ElementTree | etree._Element) -> etree._ElementTree:
+        from lxml import etree
+        if isinstance(source, (str, Path)):
+            return etree.parse(str(source), etree.XMLParser(huge_tree=True))
+        if isinstance(source, bytes):
+            return etree.ElementTree(etree.fromstring(source, etree.XMLParser(huge_tree=True)))
+        if isinstance(source, etree._Element):
+            return etree.ElementTree(source)
+        return source
+
+    def _xmlschema_errors(self, tree: etree._ElementTree) -> list[str]:
+        errors = []
+        for error in self.schema.iter_errors(tree):
+            errors.append(f"line {error.sourceline}: {error.path}: {error.reason}")
+            if len(errors) >= MAX_ERRORS:
+                break
+        return errors
+
+    def _lxml_errors(self, tree: etree._ElementTree) -> list[str]:
+        # the error log belongs to the schema object, so validations with the same schema are serialized
+        with _LOCK:
+            if self.schema.validate(tree):
+                return []
+            return [f"line {error.line}: {error.message}" for error in list(self.schema.error_log)[:MAX_ERRORS]]
+
+
+def set_cmd_line_args() -> argparse.Namespace:
+    """
+    Parse command-line arguments for the Define-XML validator.
+
+    :return: parsed command-line arguments
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--define", help="Define-XML files, directories of Define-XML files or glob patterns to "
+                        "validate", nargs="+", required=True, dest="define_files")
+    parser.add_argument("-x", "--xsd", help="path and file name of the Define-XML XSD", default=str(DEFAULT_XSD),
+                        dest="xsd_file")
+    parser.add_argument("--engine", help="schema validation engine (default: xmlschema)", default="xmlschema",
+                        choices=ENGINES, dest="engine")
+    parser.add_argument("--stream-threshold", help="validate files larger than this many MB one subtree at a time "
+                        f"(default: {STREAM_THRESHOLD // (1024 * 1024)}); 0 streams every file", type=float,
+                        default=STREAM_THRESHOLD / (1024 * 1024), dest="stream_threshold")
+    parser.add_argument("-v", "--verbose", help="print the schema load and per-file validation times", default=False,
+                        action="store_true", dest="is_verbose")
+    return parser.parse_args()
+
+
+def expand_paths(paths: list[str]) -> list[str]:
+    """return the Define-XML files named by a list of file names, directories and glob patterns"""
+    define_files = []
+    for path in paths:
+        if Path(path).is_dir():
+            define_files.extend(str(p) for p in sorted(Path(path).glob("*.xml")))
+        else:
+            define_files.extend(sorted(glob.glob(path)) or [path])
+    return define_files
+
+
+def main() -> None:
+    args = set_cmd_line_args()
+    validator = DefineValidator(args.xsd_file, args.engine, int(args.stream_threshold * 1024 * 1024))
+    load_seconds = validator.load_seconds
+    results = validator.validate_files(expand_paths(args.define_files))
+    for define_file, result in results.items():
+        line = f"{'valid' if result['valid'] else 'INVALID':8} {define_file}"
+        if args.is_verbose:
+            line += f"  parse {result['seconds']['parse']:.3f} s, validate {result['seconds']['validate']:.3f} s"
+        print(line)
+        for error in result["errors"]:
+            print(f"    {error}")
+    if args.is_verbose:
+        print(f"schema load {load_seconds:.3f} s, validation "
+              f"{sum(r['seconds']['validate'] for r in results.values()):.3f} s for {len(results)} file(s)")
+    if not all(result["valid"] for result in results.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+define_watcher.py - regenerate the Define-XML each time the DDS JSON file changes.
+
+The watcher runs in one long-lived process, so odmlib and the loaders are imported once, and the Define-XML schema and
+style sheet are compiled once. A style sheet that changed is compiled again for the next cycle. It keeps an in-memory
+fragment cache between runs (or uses --cache-dir), so each regeneration only rebuilds the datasets, codelists and where
+clauses that changed. The DDS file, and optionally the DDS JSON and style sheet files in a directory, are polled for
+changes. After a change the watcher waits until the files stop changing, regenerates the Define-XML and runs validation
+and HTML rendering if requested. It then prints the latency of the cycle.
+"""
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+from define_generator import DefineGenerator
+from define_pipeline import DefinePipeline
+import fragment_cache
+from constants import DEFAULT_LANGUAGE, ACRF_LEAF_ID
+
+# files in a watched directory that trigger a regeneration
+WATCH_PATTERNS: list[str] = ["*.json", "*.xsl"]
+DEFAULT_INTERVAL: float = 1.0
+
+# file modification time and size by path
+Snapshot = dict[str, tuple[int, int]]
+
+
+class DefineWatcher:
+    """Poll the DDS input for changes and regenerate the Define-XML with warm caches."""
+
+    def __init__(self, dds_file: str, define_file: str, options: dict[str, Any] | None = None,
+                 pipeline_factory: Callable[[], DefinePipeline | None] | None = None, watch_dirs: list[str] = (),
+                 interval: float = DEFAULT_INTERVAL, cache_dir: str | None = None) -> None:
+        """
+        :param dds_file: path and filename of the DDS JSON file
+        :param define_file: path and filename of the Define-XML file to create
+        :param options: other DefineGenerator keyword arguments, e.g. {"log_level": "WARNING", "backend": "fast"}
+        :param pipeline_factory: returns the post-generation pipeline (validation, HTML) to run in each cycle
+        :param watch_dirs: directories whose DDS JSON and style sheet files also trigger a regeneration
+        :param interval: seconds between polls
+        :param cache_dir: fragment cache directory; None keeps the fragment cache in memory
+        """
+        self.dds_file: str = dds_file
+        self.define_file: str = define_file
+        self.options: dict[str, Any] = options or {}
+        self.pipeline_factory: Callable[[], DefinePipeline | None] = pipeline_factory or (lambda: None)
+        self.watch_dirs: list[str] = list(watch_dirs)
+        self.interval: float = interval
+        self.cache: fragment_cache.FragmentCache | None = None
+        self.cache_dir: str | None = cache_dir
+        self.cycles: list[dict[str, Any]] = []
+
+    def snapshot(self) -> Snapshot:
+        """return the modification time and size of the DDS file and the files in the watched directories"""
+        paths = [Path(self.dds_file)]
+        for watch_dir in self.watch_dirs:
+            for pattern in WATCH_PATTERNS:
+                paths.extend(Path(watch_dir).glob(pattern))
+        snapshot = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def regenerate(self) -> dict[str, Any]:
+        """
+        Regenerate the Define-XML and run the pipeline once. Errors, including invalid JSON from a partly saved file,
+        are reported in the result so that the watcher keeps running.
+
+        :return: {"seconds", "valid", "hits", "misses", "error"} for the cycle
+        """
+        start = time.perf_counter()
+        cycle = {"seconds": 0.0, "valid": None, "hits": 0, "misses": 0, "error": None}
+        try:
+            if self.cache is None:
+                self.cache = fragment_cache.FragmentCache(self.cache_dir, context=f"{DEFAULT_LANGUAGE}|{ACRF_LEAF_ID}")
+            self.cache.start_run()
+            generator = DefineGenerator(self.dds_file, self.define_file, cache=self.cache, **self.options)
+            results = generator.create(self.pipeline_factory())
+            if results:
+                cycle["valid"] = results["valid"]
+            cycle.update({key: self.cache.stats()[key] for key in ("hits", "misses")})
+        except (Exception, SystemExit) as e:
+            # the generator exits on invalid JSON, which is expected while the file is being edited
+            cycle["error"] = f"exit status {e.code}" if isinstance(e, SystemExit) else str(e) or type(e).__name__
+            logging.error(f"watch: regeneration failed: {cycle['error']}")
+            if self.cache:
+                # keep every cached fragment rather than only those a partial run happened to use
+                self.cache.used.clear()
+        cycle["seconds"] = time.perf_counter() - start
+        self.cycles.append(cycle)
+        return cycle
+
+    def run(self, max_cycles: int | None = None) -> None:
+        """
+        Generate the Define-XML, then poll for changes and regenerate after each one until interrupted.
+
+        :param max_cycles: stop after this many regenerations, including the first one; None runs until interrupted
+        """
+        print(f"watching {', '.join([self.dds_file] + self.watch_dirs)} (Ctrl+C to stop)")
+        last = self.snapshot()
+        self._report(self.regenerate(), 0.0)
+        try:
+            while max_cycles is None or len(self.cycles) < max_cycles:
+                time.sleep(self.interval)
+                current = self.snapshot()
+                if current == last:
+                    continue
+                detected = time.perf_counter()
+                # wait for the editor to finish writing before regenerating
+                while True:
+                    time.sleep(min(self.interval, 0.2))
+                    settled = self.snapshot()
+                    if settled == current:
+                        break
+                    current = settled
+                last = current
+                cycle = self.regenerate()
+                self._report(cycle, time.perf_counter() - detected - cycle["seconds"])
+        except KeyboardInterrupt:
+            print("stopped watching")
+
+    @staticmethod
+    def _report(cycle: dict[str, Any], wait: float) -> None:
+        stamp = time.strftime("%H:%M:%S")
+        if cycle["error"]:
+            print(f"[{stamp}] regeneration failed after {cycle['seconds']:.2f} s: {cycle['error']}", file=sys.stderr)
+            return
+        valid = "" if cycle["valid"] is None else f", {'valid' if cycle['valid'] else 'INVALID'}"
+        print(f"[{stamp}] regenerated in {cycle['seconds']:.2f} s (waited {wait:.2f} s for the file to settle; "
+              f"fragment cache {cycle['hits']} hits, {cycle['misses']} misses{valid})")
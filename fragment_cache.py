@@ -0,0 +1,139 @@
+"""
+fragment_cache.py - on-disk cache of serialized Define-XML fragments keyed by a hash of the DDS content.
+
+Each dataset in itemGroups, each codelist and each where clause (together with the conditions it references) is hashed.
+The cache stores the XML fragments generated from it: the ItemGroupDef, ItemDefs and ValueListDefs of a dataset, the
+CodeList, and the WhereClauseDef. On the next run unchanged content is spliced from the cache and only the changed
+content is regenerated. The whole cache is discarded when the generator version, the odmlib version or the generator
+source code changes.
+"""
+import hashlib
+import json
+import logging
+import os
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+from constants import TOOL_VERSION
+
+CACHE_FILE: str = "fragments.json"
+# sections whose elements are cached individually
+CACHED_SECTIONS: frozenset[str] = frozenset(["itemGroups", "codeLists", "whereClauses"])
+
+# fragments generated from one DDS element: {element type: [[xml, [namespace prefixes]], ...]}
+Fragments = dict[str, list[list[Any]]]
+
+
+def cache_version() -> str:
+    """
+    Return the version string stored with the cache: the generator version, the odmlib version and a digest of the
+    generator source code, so that any change to the code that creates the fragments invalidates the cache.
+    """
+    digest = hashlib.sha256()
+    for source in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(source.read_bytes())
+    try:
+        odmlib_version = metadata.version("odmlib")
+    except metadata.PackageNotFoundError:
+        odmlib_version = "unknown"
+    return f"{TOOL_VERSION}/{odmlib_version}/{digest.hexdigest()[:16]}"
+
+
+class FragmentCache:
+    """Cache of Define-XML fragments stored as a JSON file in a cache directory, or only in memory."""
+
+    def __init__(self, cache_dir: str | None, context: str = "") -> None:
+        """
+        :param cache_dir: directory that holds the cache file; created if needed. None keeps the cache in memory only,
+            for a process that regenerates the same study repeatedly
+        :param context: settings that change the generated XML for the same DDS content (e.g. xml:lang)
+        """
+        self.cache_file: Path | None = Path(cache_dir) / CACHE_FILE if cache_dir else None
+        self.context: str = context
+        self.version: str = cache_version()
+        self.entries: dict[str, Fragments] = {}
+        self.used: dict[str, Fragments] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self._read()
+
+    def key(self, section: str, payload: Any) -> str:
+        """
+        Hash the DDS content that a set of fragments is generated from.
+
+        :param section: name of the section in the DDS JSON
+        :param payload: the section element and any content it references
+        :return: hex digest used as the cache key
+        """
+        text = json.dumps([self.context, section, payload], sort_keys=True, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Fragments | None:
+        """return the cached fragments for the key, or None, and count the hit or miss"""
+        fragments = self.entries.get(key)
+        if fragments is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.used[key] = fragments
+        return fragments
+
+    def put(self, key: str, fragments: Fragments) -> None:
+        """store the fragments generated for the key"""
+        self.entries[key] = fragments
+        self.used[key] = fragments
+
+    def save(self) -> None:
+        """Write the fragments used in this run to the cache file and drop entries for content that no longer exists."""
+        if self.cache_file is None:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "entries": self.used}, f)
+        os.replace(tmp_file, self.cache_file)
+
+    def start_run(self) -> None:
+        """
+        Begin another run with the same cache object. The fragments used by the last run become the cache entries, so
+        entries for content that no longer exists are dropped as they are by save(), and the counts are reset.
+        """
+        if self.used:
+            self.entries = self.used
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """return the number of hits and misses and the hit rate"""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def _read(self) -> None:
+        if self.cache_file is None or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Ignoring unreadable fragment cache {self.cache_file}: {e}")
+            return
+        if cache.get("version") != self.version:
+            logging.info(f"Fragment cache {self.cache_file} was created by a different generator version; rebuilding")
+            return
+        self.entries = cache.get("entries", {})
+
+
+def cache_payload(section: str, item: dict[str, Any], define_objects: Any) -> Any:
+    """
+    Return the content that the fragments of a section element depend on. A where clause also depends on the
+    conditions it references, which are stashed in define_objects by the conditions section.
+
+    :param section: name of the section in the DDS JSON
+    :param item: the section element (dataset, codelist or where clause)
+    :param define_objects: registry of define objects created by the earlier sections
+    """
+    if section == "whereClauses":
+        return {"whereClause": item,
+                "conditions": [define_objects.find("_conditions", oid) for oid in item.get("conditions", [])]}
+    return item
@@ -0,0 +1,156 @@
+"""
+integrity.py - check that every OID reference in the generated Define-XML resolves to a defined element.
+
+The IntegrityChecker keeps a hash index of the OIDs defined for each element type (ItemGroupDef, ItemDef, CodeList,
+ValueListDef, WhereClauseDef, MethodDef, CommentDef, leaf and Standard). It also keeps the OID references made by
+attributes such as ItemRef.ItemOID, CodeListRef.CodeListOID, WhereClauseRef.WhereClauseOID, MethodOID, CommentOID,
+ArchiveLocationID and DocumentRef.leafID. Definitions and references are collected in one pass over the objects the
+loaders created, or over the XML fragments as the streaming writer spools them, since it releases the objects. check()
+then reports all dangling references and duplicate OIDs at once.
+"""
+import re
+from collections import Counter
+from typing import Any, Iterable
+from xml.sax.saxutils import unescape
+import define_records
+
+# element types that define an OID and the attribute that holds it
+DEFINITIONS: dict[str, str] = {
+    "ItemGroupDef": "OID", "ItemDef": "OID", "CodeList": "OID", "ValueListDef": "OID", "WhereClauseDef": "OID",
+    "MethodDef": "OID", "CommentDef": "OID", "leaf": "ID", "Standard": "OID",
+}
+# reference attributes and the element type they refer to
+REFERENCES: dict[str, str] = {
+    "ItemOID": "ItemDef", "CodeListOID": "CodeList", "ValueListOID": "ValueListDef", "WhereClauseOID": "WhereClauseDef",
+    "MethodOID": "MethodDef", "CommentOID": "CommentDef", "ArchiveLocationID": "leaf", "leafID": "leaf",
+    "StandardOID": "Standard",
+}
+# define_objects entries walked by collect_objects() in addition to the MetaDataVersion element lists
+REGISTRY_ENTRIES: list[str] = ["MetaDataVersion", "Standards"]
+# references recorded by the loaders for content that could not be created, e.g. WhereClauseDefs with missing conditions
+MISSING_REFERENCES: str = "_missing_references"
+
+_START_TAG = re.compile(r"<(?:[\w.-]+:)?([\w.-]+)((?:\s+[\w.:-]+\s*=\s*\"[^\"]*\")*)\s*/?>")
+_ATTRIBUTE = re.compile(r"(?:[\w.-]+:)?([\w.-]+)\s*=\s*\"([^\"]*)\"")
+_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+
+
+class IntegrityChecker:
+    """Index of the OIDs defined and referenced by the generated Define-XML content."""
+
+    def __init__(self) -> None:
+        # defined OIDs by element type, and how often each OID was defined more than once
+        self.defined: dict[str, set[str]] = {elem: set() for elem in DEFINITIONS}
+        self.duplicates: Counter[tuple[str, str]] = Counter()
+        # each distinct reference (element type, OID) with the first element that made it
+        self.references: dict[tuple[str, str], dict[str, str]] = {}
+        self.missing: list[dict[str, str]] = []
+        self.reference_count: int = 0
+
+    def define(self, elem: str, oid: str) -> None:
+        """
+        Record an OID definition.
+
+        :param elem: element type, e.g. ItemDef
+        :param oid: the OID (or leaf ID) being defined
+        """
+        defined = self.defined[elem]
+        if oid in defined:
+            self.duplicates[(elem, oid)] += 1
+        else:
+            defined.add(oid)
+
+    def collect_objects(self, define_objects: dict[str, Any], elements: Iterable[str]) -> None:
+        """
+        Collect the definitions and references of the objects still held in define_objects.
+
+        :param define_objects: registry of objects created by the loaders
+        :param elements: MetaDataVersion element types to walk, e.g. the generator's ELEMENTS
+        """
+        for elem in list(elements) + REGISTRY_ENTRIES:
+            value = define_objects.get(elem)
+            for obj in value if isinstance(value, list) else [value]:
+                if obj is not None:
+                    self._walk(obj, None)
+        self.missing.extend(define_objects.get(MISSING_REFERENCES) or [])
+
+    def collect_fragment(self, fragment: str) -> None:
+        """
+        Collect the definitions and references of a serialized element, such as a fragment spooled by the streaming
+        writer or spliced from the fragment cache.
+
+        :param fragment: XML text of one MetaDataVersion child element
+        """
+        parent = None
+        for tag, attr_text in _START_TAG.findall(fragment):
+            attrs = {name: unescape(value, _ENTITIES) for name, value in _ATTRIBUTE.findall(attr_text)}
+            parent = self._add(tag, attrs, parent)
+
+    def check(self) -> dict[str, Any]:
+        """
+        Resolve every collected reference against the defined OIDs.
+
+        :return: {"dangling", "duplicates", "definitions", "references"} where dangling lists each unresolved
+            reference with the first element that made it and duplicates lists each OID defined more than once
+        """
+        dangling = [dict(reference, target=elem, reference=oid) for (elem, oid), reference in self.references.items()
+                    if oid not in self.defined[elem]]
+        dangling.extend(self.missing)
+        duplicates = [{"element": elem, "OID": oid, "count": count + 1}
+                      for (elem, oid), count in self.duplicates.items()]
+        return {"dangling": dangling, "duplicates": duplicates,
+                "definitions": sum(len(oids) for oids in self.defined.values()), "references": self.reference_count}
+
+    def _walk(self, obj: Any, parent: str | None) -> None:
+        """collect an odmlib object or define_records record and its child elements"""
+        if isinstance(obj, define_records.Record):
+            attrs = obj.attrs
+            children = [getattr(obj, elem, None) for elem in type(obj).elems if _is_set(obj, elem)]
+        else:
+            elems = type(obj)._elems
+            members = vars(obj)
+            attrs = {name: value for name, value in members.items() if name not in elems}
+            children = [value for name, value in members.items() if name in elems]
+        parent = self._add(type(obj).__name__, attrs, parent)
+        for child in children:
+            for grandchild in child if isinstance(child, list) else [child]:
+                if grandchild is not None:
+                    self._walk(grandchild, parent)
+
+    def _add(self, tag: str, attrs: dict[str, Any], parent: str | None) -> str | None:
+        """record the definition and references of one element and return the label of its top-level element"""
+        key = DEFINITIONS.get(tag)
+        if key and attrs.get(key) is not None:
+            self.define(tag, attrs[key])
+            if parent is None:
+                parent = f"{tag} {attrs[key]}"
+        for name, value in attrs.items():
+            elem = REFERENCES.get(name)
+            if elem and value is not None:
+                self.reference_count += 1
+                self.references.setdefault((elem, value), {"element": tag, "attribute": name, "parent": parent or ""})
+        return parent
+
+
+def _is_set(record: define_records.Record, elem: str) -> bool:
+    """return True if a record child element slot has been set, without creating an empty list for it"""
+    try:
+        object.__getattribute__(record, elem)
+    except AttributeError:
+        return False
+    return True
+
+
+def format_report(report: dict[str, Any]) -> list[str]:
+    """
+    Return one line for each problem in an integrity report.
+
+    :param report: result of IntegrityChecker.check()
+    """
+    lines = []
+    for reference in report["dangling"]:
+        lines.append(f"{reference['parent']}: {reference['element']} {reference['attribute']}="
+                     f"\"{reference['reference']}\" does not match any {reference['target']}")
+    for duplicate in report["duplicates"]:
+        lines.append(f"{duplicate['element']} OID \"{duplicate['OID']}\" is defined {duplicate['count']} times")
+    return lines
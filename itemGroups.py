@@ -1,9 +1,10 @@
 from typing import Any
-from odmlib.define_2_1 import model as DEFINE
 import define_object
 import itemRefs
 import items
 import valueLevel as VL
+from define_profiler import get_profiler
+from term_table import get_term_table
 from constants import TRIAL_DESIGN_DOMAINS, NON_REPEATING_DOMAINS, DEFAULT_PURPOSE
 
 
@@ -30,19 +31,25 @@ class ItemGroups(define_object.DefineObject):
         define_objects["ItemDef"] = []
 
         self.lang = lang
+
+        self.set_model(define_objects)
+        profiler = get_profiler(define_objects)
         for dataset in template:
-            self._generate_dataset(dataset, define_objects, lang, acrf)
-            if dataset.get("slices"):
-                self._generate_vlm(dataset, define_objects, lang, acrf)
+            with profiler.stage(f"dataset:{dataset.get('name', 'unknown')}"):
+                item_defs = self._generate_dataset(dataset, define_objects, lang, acrf)
+                if dataset.get("slices"):
+                    self._generate_vlm(dataset, define_objects, lang, acrf, item_defs)
+        # the value lists hold the shared WhereClauseRefs; the table is not needed once the section is loaded
+        get_term_table(define_objects).release()
 
 
-    def _generate_vlm(self, dataset, define_objects, lang, acrf):
-        for slice in dataset["slices"]:
-            if slice["type"] == "ValueList":
-                vlm = VL.ValueLevel()
-                vlm.create_define_objects(slice, define_objects, lang, acrf)
+    def _generate_vlm(self, dataset, define_objects, lang, acrf, item_defs):
+        """ create the value-level metadata for all the slices of a dataset in one batch """
+        vlm = VL.ValueLevel()
+        vlm.create_define_objects(dataset["slices"], define_objects, lang, acrf, item_defs=item_defs)
 
     def _generate_dataset(self, dataset, define_objects, lang, acrf):
+        """ create the ItemGroupDef and ItemDefs of a dataset and return the ItemDefs by OID """
         itg = self._create_itemgroupdef_object(dataset)
         define_objects["ItemGroupDef"].append(itg)
         # ItemRefs
@@ -52,13 +59,15 @@ class ItemGroups(define_object.DefineObject):
         vars.create_define_objects(items_list, define_objects, lang, acrf, item_group=itg)
         # ItemDefs
         itd = items.Items()
+        start = len(define_objects["ItemDef"])
         itd.create_define_objects(dataset["items"], define_objects, lang, acrf)
 
         # TODO review this assumption that we have 1 class per dataset
         # assumption: 1 class per dataset - many need to expand this for ADaM
         if dataset.get("class"):
             ds_class = dataset["class"].upper().replace("-", " ")
-            itg.Class = DEFINE.Class(Name=ds_class)
+            itg.Class = self.model.Class(Name=ds_class)
+        return {item.OID: item for item in define_objects["ItemDef"][start:]}
 
     def _create_itemgroupdef_object(self, obj):
         name = self.require_key(obj, "name", "ItemGroupDef")
@@ -94,10 +103,10 @@ class ItemGroups(define_object.DefineObject):
             attr["StandardOID"] = obj["wasDerivedFrom"]
         if obj.get("hasNoData"):
             attr["HasNoData"] = obj["hasNoData"]
-        igd = DEFINE.ItemGroupDef(**attr)
+        igd = self.model.ItemGroupDef(**attr)
         description = self.require_key(obj, "description", f"ItemGroupDef {name}")
-        tt = DEFINE.TranslatedText(_content=description, lang=self.lang)
-        igd.Description = DEFINE.Description()
+        tt = self.model.TranslatedText(_content=description, lang=self.lang)
+        igd.Description = self.model.Description()
         igd.Description.TranslatedText.append(tt)
         return igd
 
@@ -1,4 +1,3 @@
-from odmlib.define_2_1 import model as DEFINE
 import define_object
 
 
@@ -13,6 +12,7 @@ class ItemRefs(define_object.DefineObject):
 
     def create_define_objects(self, template, define_objects, lang, acrf, item_group=None):
         self.lang = lang
+        self.set_model(define_objects)
         self.acrf = acrf
         for variable in template:
             self._create_itemref_object(variable, define_objects, item_group, variable.get("OID"))
@@ -30,7 +30,7 @@ class ItemRefs(define_object.DefineObject):
                 mandatory = "No"
         attr = {"ItemOID": it_oid, "Mandatory": mandatory}
         self._add_optional_itemref_attributes(attr, obj)
-        item = DEFINE.ItemRef(**attr)
+        item = self.model.ItemRef(**attr)
         igd.ItemRef.append(item)
 
     @staticmethod
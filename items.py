@@ -1,5 +1,4 @@
 from typing import Any
-from odmlib.define_2_1 import model as DEFINE
 import define_object
 
 
@@ -29,6 +28,7 @@ class Items(define_object.DefineObject):
         :param acrf: annotated case report form leaf ID
         """
         self.lang = lang
+        self.set_model(define_objects)
         self.acrf = acrf
         for variable in template:
             it_oid = self.require_key(variable, "OID", "ItemDef")
@@ -40,10 +40,10 @@ class Items(define_object.DefineObject):
         data_type = self.require_key(obj, "dataType", f"ItemDef {oid}")
         attr = {"OID": oid, "Name": name, "DataType": data_type, "SASFieldName": name}
         self._add_optional_itemdef_attributes(attr, obj)
-        item = DEFINE.ItemDef(**attr)
+        item = self.model.ItemDef(**attr)
         if obj.get("description"):
-            tt = DEFINE.TranslatedText(_content=obj["description"], lang=self.lang)
-            item.Description = DEFINE.Description()
+            tt = self.model.TranslatedText(_content=obj["description"], lang=self.lang)
+            item.Description = self.model.Description()
             item.Description.TranslatedText.append(tt)
         self._add_optional_itemdef_elements(item, obj, oid)
         return item
@@ -55,7 +55,7 @@ class Items(define_object.DefineObject):
         # TODO do not find codeList in define.json example for items
         if obj.get("codeList"):
             cl_oid = self.generate_oid(["CL", obj["codeList"].split(".")[1]])
-            cl = DEFINE.CodeListRef(CodeListOID=cl_oid)
+            cl = self.model.CodeListRef(CodeListOID=cl_oid)
             item.CodeListRef = cl
         # TODO do not find origin content in define.json example for items (nice to have that information)
         attr = {}
@@ -65,13 +65,13 @@ class Items(define_object.DefineObject):
                 attr["Type"] =  obj["origin"]["type"]
             if obj.get("origin").get("source"):
                 attr["Source"] = obj["origin"]["source"]
-            item.Origin.append(DEFINE.Origin(**attr))
+            item.Origin.append(self.model.Origin(**attr))
             if obj.get("predecessor"):
-                item.Origin[0].Description = DEFINE.Description()
-                item.Origin[0].Description.TranslatedText.append(DEFINE.TranslatedText(_content=obj["Predecessor"]))
+                item.Origin[0].Description = self.model.Description()
+                item.Origin[0].Description.TranslatedText.append(self.model.TranslatedText(_content=obj["predecessor"]))
             if obj.get("pages"):
-                dr = DEFINE.DocumentRef(leafID=self.acrf)
-                dr.PDFPageRef.append(DEFINE.PDFPageRef(PageRefs=obj["Pages"], Type="PhysicalRef"))
+                dr = self.model.DocumentRef(leafID=self.acrf)
+                dr.PDFPageRef.append(self.model.PDFPageRef(PageRefs=obj["pages"], Type="PhysicalRef"))
                 item.Origin[0].DocumentRef.append(dr)
 
     @staticmethod
@@ -38,7 +38,7 @@ class Methods(define_object.DefineObject):
             methoddef.FormalExpression.append(DEFINE.FormalExpression(Context=method["context"], _content=method["code"]))
         if method.get("document"):
             self._add_document(method, methoddef)
-        return method
+        return methoddef
 
     def _add_document(self, method, methoddef):
         """
@@ -0,0 +1,113 @@
+"""
+parallel_loader.py - run DDS section loaders in a pool of worker processes.
+
+Each task runs one loader on a section (or on a single dataset of the itemGroups section) in a fresh define_objects
+registry inside a worker process and returns the objects it created. Results are merged back into the generator's
+define_objects strictly in submission order, so the output is identical to loading the sections one after another.
+"""
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Iterable
+from define_registry import DefineRegistry
+
+# sections split into one task per element (dataset) rather than one task for the whole section
+CHUNKED_SECTIONS: frozenset[str] = frozenset(["itemGroups"])
+# sections loaded in the main process because later sections depend on what they stash in define_objects
+SERIAL_SECTIONS: frozenset[str] = frozenset(["conditions"])
+# define_objects entries a section needs from earlier sections
+DEPENDENCIES: dict[str, tuple[str, ...]] = {"whereClauses": ("_conditions",)}
+
+# a chunk result: (define_objects key, value, True if the loader replaced the value rather than appending to it)
+ChunkResult = list[tuple[str, Any, bool]]
+
+
+def load_chunk(loader_class: type, data: list[dict[str, Any]], elements: list[str], lang: str, acrf: str,
+               shared: dict[str, Any] | None = None, backend: str = "odmlib") -> ChunkResult:
+    """
+    Run a loader on a section or chunk of a section in a fresh define_objects registry.
+
+    :param loader_class: loader class registered for the section
+    :param data: section elements to load
+    :param elements: element types initialized as empty lists in the registry
+    :param lang: xml:lang setting for TranslatedText
+    :param acrf: annotated case report form leaf ID
+    :param shared: define_objects entries created by earlier sections that the loader reads
+    :param backend: object model the loader builds ("odmlib" or "fast")
+    :return: the entries the loader created, replaced or appended to
+    """
+    define_objects = DefineRegistry({elem: [] for elem in elements})
+    define_objects.backend = backend
+    define_objects.update(shared or {})
+    initial = dict(define_objects)
+    loader_class().create_define_objects(data, define_objects, lang, acrf)
+    result = []
+    for key, value in define_objects.items():
+        replaced = value is not initial.get(key)
+        if replaced or (key in elements and value):
+            result.append((key, value, replaced))
+    return result
+
+
+class ParallelLoader:
+    """Submit loader tasks to a process pool and merge their results in submission order."""
+
+    def __init__(self, workers: int, elements: list[str], merge: Callable[[ChunkResult, bool], None],
+                 backend: str = "odmlib") -> None:
+        """
+        :param workers: number of worker processes
+        :param elements: element types initialized as empty lists in each task's registry
+        :param merge: called with each chunk result, in submission order, and whether it may replace entries
+        :param backend: object model the loaders build in the worker processes ("odmlib" or "fast")
+        """
+        self.backend: str = backend
+        self.executor: ProcessPoolExecutor = ProcessPoolExecutor(max_workers=workers)
+        self.elements: list[str] = elements
+        self.merge: Callable[[ChunkResult, bool], None] = merge
+        self.pending: deque[tuple[Future, bool]] = deque()
+        self.max_pending: int = workers * 4
+
+    def submit_section(self, section: str, loader_class: type, data: Iterable[dict[str, Any]],
+                       define_objects: DefineRegistry, lang: str, acrf: str) -> None:
+        """
+        Submit the tasks to load a DDS section.
+
+        :param section: name of the section in the DDS JSON
+        :param loader_class: loader class registered for the section
+        :param data: list (or stream) of dictionaries containing the section data
+        :param define_objects: registry that the results are merged into
+        :param lang: xml:lang setting for TranslatedText
+        :param acrf: annotated case report form leaf ID
+        """
+        if section in SERIAL_SECTIONS:
+            self.wait()
+            loader_class().create_define_objects(data, define_objects, lang, acrf)
+            return
+        shared = {key: define_objects[key] for key in DEPENDENCIES.get(section, ()) if key in define_objects}
+        if section in CHUNKED_SECTIONS:
+            # only the first chunk may replace an entry, as the loader would reset it once for the whole section
+            for n, item in enumerate(data):
+                self._submit(loader_class, [item], lang, acrf, shared, replace=(n == 0))
+        else:
+            self._submit(loader_class, list(data), lang, acrf, shared, replace=True)
+
+    def wait(self) -> None:
+        """Wait for all submitted tasks and merge their results."""
+        while self.pending:
+            self._merge_next()
+
+    def shutdown(self) -> None:
+        """Shut down the worker processes, cancelling any tasks that have not started."""
+        self.executor.shutdown(cancel_futures=True)
+
+    def _submit(self, loader_class: type, data: list[dict[str, Any]], lang: str, acrf: str,
+                shared: dict[str, Any], replace: bool) -> None:
+        future = self.executor.submit(load_chunk, loader_class, data, self.elements, lang, acrf, shared,
+                                      self.backend)
+        self.pending.append((future, replace))
+        # merge whatever has finished at the head of the queue and bound the number of results held in memory
+        while self.pending and (self.pending[0][0].done() or len(self.pending) > self.max_pending):
+            self._merge_next()
+
+    def _merge_next(self) -> None:
+        future, replace = self.pending.popleft()
+        self.merge(future.result(), replace)
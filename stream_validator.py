@@ -0,0 +1,185 @@
+"""
+stream_validator.py - validate very large Define-XML files without building the whole document tree.
+
+The file is read with lxml's incremental parser. The ODM, Study and MetaDataVersion elements are containers: their
+attributes are checked against the schema when they start, and the order and number of their child elements are
+checked against the sequence in the schema. Every other element under them, such as an ItemGroupDef, ItemDef, CodeList,
+ValueListDef, WhereClauseDef or MethodDef, is validated as a subtree against its global schema declaration once it has
+been parsed, and is then cleared. This checks element ordering, required attributes and attribute types within each
+subtree while only one subtree is held in memory, so memory is bounded by the largest ItemGroupDef or CodeList rather
+than the file.
+
+The xmlschema engine reports the same kinds of errors as validating the whole tree. The lxml engine has libxml2
+validate the document as it is parsed, which is much faster but stops at the first error.
+"""
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any
+from lxml import etree
+from define_validator import get_schema, DEFAULT_XSD, MAX_ERRORS
+
+ODM_NS: str = "{http://www.cdisc.org/ns/odm/v1.3}"
+# elements whose children are validated as separate subtrees, in nesting order
+CONTAINERS: list[str] = [f"{ODM_NS}ODM", f"{ODM_NS}Study", f"{ODM_NS}MetaDataVersion"]
+_NAMESPACE = re.compile(r"\{[^}]*}")
+
+
+class StreamingDefineValidator:
+    """Validate a Define-XML file one MetaDataVersion child subtree at a time."""
+
+    def __init__(self, xsd_file: str | Path = DEFAULT_XSD, engine: str = "xmlschema") -> None:
+        """
+        :param xsd_file: path and filename of the Define-XML XSD
+        :param engine: "xmlschema" (subtree validation, reports all errors) or "lxml" (stops at the first error)
+        """
+        self.engine: str = engine
+        self.schema, self.load_seconds = get_schema(xsd_file, engine)
+        self.errors: list[str] = []
+        self.largest_subtree: dict[str, Any] = {}
+
+    def validate(self, define_file: str | Path) -> dict[str, Any]:
+        """
+        Validate a Define-XML file incrementally.
+
+        :param define_file: path and filename of the Define-XML file
+        :return: {"valid", "errors", "seconds", "largest_subtree"} where seconds has the same keys as
+            DefineValidator.validate() and largest_subtree names the subtree with the most elements held at once
+        """
+        result = {"valid": False, "errors": [], "seconds": {"schema_load": self.load_seconds, "parse": 0.0,
+                                                             "validate": 0.0}, "largest_subtree": {}}
+        self.load_seconds = 0.0
+        self.errors = []
+        self.largest_subtree = {"element": None, "elements": 0}
+        start = time.perf_counter()
+        try:
+            self._iterate(str(define_file))
+        except OSError as e:
+            self.errors.append(f"Unable to read Define-XML: {e}")
+        except etree.XMLSyntaxError as e:
+            # libxml2 schema errors surface as syntax errors when the lxml engine validates during parsing
+            self.errors.append(f"line {e.lineno}: {e.msg}" if e.lineno else e.msg)
+        except _TooManyErrors:
+            pass
+        result["seconds"]["validate"] = time.perf_counter() - start
+        result["errors"] = self.errors[:MAX_ERRORS]
+        result["valid"] = not self.errors
+        result["largest_subtree"] = self.largest_subtree
+        logging.info(f"streaming validation of {define_file}: largest subtree {self.largest_subtree['element']} with "
+                     f"{self.largest_subtree['elements']} elements")
+        return result
+
+    def _iterate(self, define_file: str) -> None:
+        schema = self.schema if self.engine == "lxml" else None
+        # the open containers from the root down: [element, path, schema declaration, child position, child counts]
+        containers = []
+        depth = 0
+        for event, elem in etree.iterparse(define_file, events=("start", "end"), huge_tree=True, schema=schema):
+            if event == "start":
+                depth += 1
+                if depth == len(containers) + 1:
+                    if self.engine != "lxml":
+                        self._check_order(elem, containers[-1] if containers else None)
+                    if depth <= len(CONTAINERS) and (elem.tag == CONTAINERS[depth - 1] or not containers):
+                        self._start_container(elem, containers)
+                continue
+            if depth <= len(containers):
+                self._end_container(containers.pop())
+            elif depth == len(containers) + 1:
+                self._end_subtree(elem, containers[-1] if containers else None)
+                # drop the subtree and any earlier siblings that are still referenced by the parent
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+            depth -= 1
+
+    def _start_container(self, elem: etree._Element, containers: list[list[Any]]) -> None:
+        name = etree.QName(elem).localname
+        parent = containers[-1] if containers else None
+        path = f"{parent[1] if parent else ''}/{name}"
+        declaration = None
+        if elem.tag != CONTAINERS[len(containers)]:
+            self._error(elem.sourceline, path, f"unexpected element; expected "
+                                               f"{etree.QName(CONTAINERS[len(containers)]).localname}")
+        elif self.engine != "lxml":
+            declaration = self.schema.maps.elements.get(elem.tag)
+            self._check_attributes(elem, declaration, path)
+        containers.append([elem, path, declaration, 0, {}])
+
+    def _end_container(self, container: list[Any]) -> None:
+        elem, path, declaration, _, counts = container
+        if declaration is None:
+            return
+        for child in declaration.type.content.iter_elements():
+            if child.min_occurs and not counts.get(child.name):
+                self._error(elem.sourceline, path,
+                            f"the content is incomplete; {etree.QName(child.name).localname} is required")
+
+    def _end_subtree(self, elem: etree._Element, container: list[Any] | None) -> None:
+        size = sum(1 for _ in elem.iter())
+        label = f"{etree.QName(elem).localname} {elem.get('OID', '')}".strip()
+        if size > self.largest_subtree["elements"]:
+            self.largest_subtree = {"element": label, "elements": size}
+        if self.engine == "lxml" or container is None or container[2] is None:
+            return
+        counts = container[4]
+        path = f"{container[1]}/{etree.QName(elem).localname}[{counts.get(elem.tag, 0)}]"
+        declaration = self.schema.maps.elements.get(elem.tag)
+        if declaration is None:
+            return
+        for error in declaration.iter_errors(elem):
+            # error paths start at the subtree root; make them relative to the document like whole-tree validation
+            inner = _NAMESPACE.sub("", error.path or "").split("/", 2)[2:]
+            self._error(error.sourceline or elem.sourceline, "/".join([path] + inner), error.reason)
+
+    def _check_order(self, elem: etree._Element, container: list[Any] | None) -> None:
+        """
+        check that the element is allowed in its container, comes after the siblings before it and does not occur
+        more often than the schema allows
+        """
+        if container is None or container[2] is None:
+            return
+        particles = list(container[2].type.content.iter_elements())
+        expected = [child.name for child in particles]
+        counts = container[4]
+        counts[elem.tag] = counts.get(elem.tag, 0) + 1
+        path = f"{container[1]}/{etree.QName(elem).localname}"
+        if elem.tag not in expected:
+            self._error(elem.sourceline, path, "unexpected element")
+            return
+        position = expected.index(elem.tag)
+        max_occurs = particles[position].max_occurs
+        if max_occurs is not None and counts[elem.tag] > max_occurs:
+            self._error(elem.sourceline, path, f"unexpected element; at most {max_occurs} allowed")
+            return
+        if position < container[3]:
+            self._error(elem.sourceline, path, f"unexpected element; it must come before "
+                                    f"{etree.QName(expected[container[3]]).localname}")
+            return
+        container[3] = position
+
+    def _check_attributes(self, elem: etree._Element, declaration: Any, path: str) -> None:
+        """check the required attributes and the attribute types of a container element"""
+        if declaration is None:
+            return
+        attributes = declaration.type.attributes
+        for name, attribute in attributes.items():
+            if name and attribute.use == "required" and name not in elem.attrib:
+                self._error(elem.sourceline, path, f"missing required attribute {_NAMESPACE.sub('', name)}")
+        for name, value in elem.attrib.items():
+            attribute = attributes.get(name)
+            if attribute is None:
+                self._error(elem.sourceline, path, f"attribute {_NAMESPACE.sub('', name)} is not allowed")
+            elif not attribute.type.is_valid(value):
+                self._error(elem.sourceline, path, f"attribute {_NAMESPACE.sub('', name)}={value!r} is not a valid "
+                                        f"{_NAMESPACE.sub('', attribute.type.name or 'value')}")
+
+    def _error(self, line: int | None, path: str, reason: str) -> None:
+        self.errors.append(f"line {line}: {path}: {reason}")
+        if len(self.errors) >= MAX_ERRORS:
+            raise _TooManyErrors
+
+
+class _TooManyErrors(Exception):
+    """stop validating once MAX_ERRORS errors have been reported"""
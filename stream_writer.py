@@ -0,0 +1,162 @@
+"""
+stream_writer.py - write a Define-XML v2.1 file incrementally instead of serializing one complete odmlib tree.
+
+The generator hands the define_objects to the writer after each loader finishes. Each object is serialized to its XML
+fragment, appended to a temporary spool file for its element type, and removed from define_objects so that memory use
+does not grow with the size of the study. When all loaders have run, the ODM, Study and MetaDataVersion elements are
+written with the spooled fragments spliced into MetaDataVersion in the ELEMENTS order.
+"""
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from typing import Any, IO
+import odmlib.ns_registry as NS
+import define_records
+from integrity import IntegrityChecker
+
+XML_DECLARATION: str = "<?xml version='1.0' encoding='UTF-8'?>\n"
+MDV_END_TAG: str = "</MetaDataVersion>"
+
+
+class StreamingDefineWriter:
+    """Spool serialized Define-XML elements to disk as they are created and assemble the document at the end."""
+
+    def __init__(self, elements: list[str], integrity: IntegrityChecker | None = None) -> None:
+        """
+        :param elements: MetaDataVersion element names in the order they are written to the Define-XML file
+        :param integrity: checker that collects the OIDs defined and referenced by each fragment as it is spooled
+        """
+        self.elements: list[str] = elements
+        self.integrity: IntegrityChecker | None = integrity
+        self.spools: dict[str, IO[bytes]] = {elem: tempfile.TemporaryFile() for elem in elements}
+        self.prefixes: set[str] = set()
+        self.counts: dict[str, int] = {elem: 0 for elem in elements}
+
+    def spool(self, define_objects: dict[str, Any]) -> None:
+        """
+        Serialize the objects created so far for each element type and release them from define_objects.
+
+        :param define_objects: dictionary of odmlib objects created by the loaders
+        """
+        for elem in self.elements:
+            objects = define_objects.get(elem)
+            if objects:
+                self._spool_objects(elem, objects)
+                objects.clear()
+
+    def spool_fragment(self, elem: str, fragment: str, prefixes: set[str]) -> None:
+        """
+        Append an already serialized element to the spool for its element type.
+
+        :param elem: element type name (e.g. ItemDef)
+        :param fragment: serialized XML for one element
+        :param prefixes: namespace prefixes used in the fragment
+        """
+        if self.integrity:
+            self.integrity.collect_fragment(fragment)
+        self.spools[elem].write(fragment.encode("utf-8"))
+        self.prefixes.update(prefixes)
+        self.counts[elem] += 1
+
+    def write(self, odm: Any, define_file: str | os.PathLike | IO[bytes]) -> None:
+        """
+        Write the Define-XML file using the ODM skeleton with the spooled elements spliced into MetaDataVersion.
+
+        :param odm: odmlib ODM object; any elements still attached to its MetaDataVersion are spooled first
+        :param define_file: path and filename for the output Define-XML v2.1 file, or a binary file object
+        """
+        mdv = odm.Study.MetaDataVersion
+        for elem in self.elements:
+            objects = getattr(mdv, elem)
+            self._spool_objects(elem, objects)
+            objects.clear()
+        head, tail = self._serialize_skeleton(odm)
+        if isinstance(define_file, (str, os.PathLike)):
+            with open(define_file, "wb") as fh:
+                self._write_document(fh, head, tail)
+        else:
+            self._write_document(define_file, head, tail)
+        self.close()
+
+    def _write_document(self, fh: IO[bytes], head: str, tail: str) -> None:
+        fh.write((XML_DECLARATION + head).encode("utf-8"))
+        for elem in self.elements:
+            spool = self.spools[elem]
+            spool.seek(0)
+            shutil.copyfileobj(spool, fh)
+        fh.write(tail.encode("utf-8"))
+
+    def close(self) -> None:
+        """Remove the temporary spool files."""
+        for spool in self.spools.values():
+            spool.close()
+
+    def _spool_objects(self, elem: str, objects: list[Any]) -> None:
+        for obj in objects:
+            self.spool_fragment(elem, *serialize_element(obj))
+
+    def _serialize_skeleton(self, odm: Any) -> tuple[str, str]:
+        """
+        serialize the ODM element without the spooled elements and split it where they belong
+        :param odm: odmlib ODM object with an empty MetaDataVersion element list for each spooled element type
+        :return: the XML text before and after the spooled elements
+        """
+        return serialize_skeleton(odm, self.prefixes)
+
+
+def serialize_skeleton(odm: Any, prefixes: set[str]) -> tuple[str, str]:
+    """
+    Serialize the ODM element without the MetaDataVersion child elements written separately and split it where they
+    belong.
+
+    :param odm: odmlib ODM object with an empty MetaDataVersion element list for each element type written separately
+    :param prefixes: namespace prefixes used by the elements written separately, declared on the ODM element
+    :return: the XML text before and after the elements written separately
+    """
+    root = odm.to_xml()
+    nsr = NS.NamespaceRegistry()
+    snapshot = NS.get_document_namespaces(odm)
+    namespaces = snapshot["namespaces"] if snapshot else nsr.namespaces
+    nsr.set_odm_namespace_attributes(root, namespaces=namespaces, default=snapshot["default"] if snapshot else None)
+    # the skeleton only declares the prefixes it uses itself, so re-declare in registry order with the fragments'
+    declared = {name.split(":", 1)[1] for name in root.attrib if name.startswith("xmlns:")}
+    for prefix in declared:
+        del root.attrib["xmlns:" + prefix]
+    used = declared | prefixes
+    for prefix, uri in namespaces.items():
+        if prefix in used and prefix != "xml":
+            root.attrib["xmlns:" + prefix] = uri
+    xml_text = ET.tostring(root, encoding="unicode", short_empty_elements=True)
+    split = xml_text.rindex(MDV_END_TAG)
+    return xml_text[:split], xml_text[split:]
+
+
+def serialize_element(obj: Any) -> tuple[str, set[str]]:
+    """
+    Serialize an odmlib object to the XML it has inside the complete Define-XML document.
+
+    :param obj: odmlib object or define_records record such as an ItemDef or CodeList
+    :return: the XML fragment and the namespace prefixes it uses
+    """
+    if isinstance(obj, define_records.Record):
+        return define_records.serialize(obj)
+    xml_elem = obj.to_xml()
+    return ET.tostring(xml_elem, encoding="unicode", short_empty_elements=True), used_prefixes(xml_elem)
+
+
+def used_prefixes(xml_elem: ET.Element) -> set[str]:
+    """
+    Return the namespace prefixes used by the tags and attributes of an odmlib-serialized element tree.
+
+    :param xml_elem: ElementTree element created by an odmlib to_xml call
+    :return: set of namespace prefixes
+    """
+    used = set()
+    for elem in xml_elem.iter():
+        if ":" in elem.tag:
+            used.add(elem.tag.split(":", 1)[0])
+        for attr_name in elem.attrib:
+            if ":" in attr_name:
+                used.add(attr_name.split(":", 1)[0])
+    return used
@@ -0,0 +1,57 @@
+"""
+term_table.py - intern codelist terms so that identical CodeListItem, Decode and Alias structures are shared.
+
+Standard terms such as Y/N, sex, units and NCI c-codes repeat across many codelists. The CodeLists loader builds each
+distinct term once and appends the same object to every codelist that has it. The objects are not changed after they
+are created, so sharing them does not change the generated XML.
+"""
+from collections import Counter
+from typing import Any, Callable, Hashable
+
+
+class TermTable:
+    """Table of interned codelist objects keyed by the content they are built from."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+        :param enabled: share identical objects; when False every lookup builds a new object (for comparison)
+        """
+        self.enabled: bool = enabled
+        self.objects: dict[Hashable, Any] = {}
+        # number of objects requested and created for each element type
+        self.requested: Counter[str] = Counter()
+        self.created: Counter[str] = Counter()
+
+    def intern(self, key: Hashable, factory: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Return the object for the key, building it with factory(*args, **kwargs) the first time the key is seen.
+
+        :param key: tuple of the element type name and the content the object is built from
+        :param factory: function that builds the object
+        :param args: positional arguments for the factory
+        :param kwargs: keyword arguments for the factory
+        """
+        elem = key[0]
+        self.requested[elem] += 1
+        if not self.enabled:
+            self.created[elem] += 1
+            return factory(*args, **kwargs)
+        obj = self.objects.get(key)
+        if obj is None:
+            obj = self.objects[key] = factory(*args, **kwargs)
+            self.created[elem] += 1
+        return obj
+
+    def release(self) -> None:
+        """Drop the table's references to the interned objects, keeping the counts."""
+        self.objects.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """return the number of objects requested, created and shared for each element type"""
+        return {elem: {"requested": requested, "created": self.created[elem], "shared": requested - self.created[elem]}
+                for elem, requested in self.requested.items()}
+
+
+def get_term_table(define_objects: Any) -> TermTable:
+    """return the term table attached to a define_objects registry, or a new table for a plain dictionary"""
+    return getattr(define_objects, "terms", None) or TermTable()
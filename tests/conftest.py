@@ -64,3 +64,20 @@ def original_working_dir():
     original_dir = os.getcwd()
     yield original_dir
     os.chdir(original_dir)
+
+
+@pytest.fixture
+def fixed_timestamp(monkeypatch):
+    """Freeze the ODM AsOfDateTime/CreationDateTime so generated files can be compared byte for byte."""
+    import odm
+    monkeypatch.setattr(odm.ODM, "_set_datetime", staticmethod(lambda: "2025-01-01T00:00:00+00:00"))
+
+
+@pytest.fixture
+def synthetic_dds_file(temp_output_dir):
+    """Return the path to a small synthetic DDS JSON file created by benchmarks/synthetic_dds.py."""
+    from benchmarks.synthetic_dds import write_dds
+    dds_file = temp_output_dir / "synthetic.json"
+    write_dds(str(dds_file), datasets=3, variables=8, codelists=4, terms=3, slices=2, slice_items=2, conditions=5,
+              where_clauses=6, term_pool=5)
+    return dds_file
@@ -0,0 +1,63 @@
+"""
+Tests for the batch Define-XML generator.
+"""
+import json
+import os
+import shutil
+import pytest
+
+
+class TestManifest:
+    """Tests for reading the batch manifest."""
+
+    def test_json_manifest(self, temp_output_dir):
+        """Test that a JSON manifest accepts both paths and template/define objects."""
+        from batch_generator import read_manifest
+
+        manifest = temp_output_dir / "studies.json"
+        manifest.write_text(json.dumps(["a.json", {"template": "b.json", "define": "b-define.xml"}]))
+        assert read_manifest(str(manifest)) == [{"template": "a.json", "define": None},
+                                                 {"template": "b.json", "define": "b-define.xml"}]
+
+    def test_text_manifest(self, temp_output_dir):
+        """Test that a text manifest lists one DDS file per line, skipping blank and comment lines."""
+        from batch_generator import read_manifest
+
+        manifest = temp_output_dir / "studies.txt"
+        manifest.write_text("# nightly studies\na.json\n\nb.json\n")
+        assert [job["template"] for job in read_manifest(str(manifest))] == ["a.json", "b.json"]
+
+
+class TestRunBatch:
+    """Tests for generating a batch of studies."""
+
+    def test_failure_does_not_abort_batch(self, sample_dds_file, temp_output_dir, project_root):
+        """Test that an invalid study is reported while the other studies are still generated."""
+        os.chdir(project_root)
+        from batch_generator import expand_globs, run_batch
+
+        shutil.copy(sample_dds_file, temp_output_dir / "a.json")
+        (temp_output_dir / "b.json").write_text('{"invalid json": }')
+        shutil.copy(sample_dds_file, temp_output_dir / "c.json")
+        options = {"output_dir": str(temp_output_dir / "out"), "validate": False, "html": False, "stylesheet": None,
+                   "stream": False, "writer": "odmlib", "log_level": "WARNING"}
+        report = run_batch(expand_globs([str(temp_output_dir / "*.json")]), options)
+
+        assert [study["status"] for study in report["studies"]] == ["ok", "failed", "ok"]
+        assert report["succeeded"] == 2 and report["failed"] == 1
+        assert (temp_output_dir / "out" / "a.xml").exists()
+        assert (temp_output_dir / "out" / "c.xml").exists()
+        assert report["studies"][0]["seconds"]["generate"] > 0
+
+    def test_templates_with_the_same_name_are_refused(self, temp_output_dir):
+        """Test that two templates that would write the same file with -o fail before any output is written."""
+        from batch_generator import expand_globs, run_batch
+
+        for study in ("studyA", "studyB"):
+            (temp_output_dir / study).mkdir()
+            (temp_output_dir / study / "define.json").write_text("{}")
+        options = {"output_dir": str(temp_output_dir / "out"), "validate": False, "html": False, "stylesheet": None,
+                   "stream": False, "writer": "odmlib", "log_level": "WARNING"}
+        with pytest.raises(ValueError, match="define.xml <- .*studyA.*studyB"):
+            run_batch(expand_globs([str(temp_output_dir / "*" / "define.json")]), options)
+        assert not (temp_output_dir / "out").exists()
@@ -0,0 +1,117 @@
+"""
+Tests for the DDS JSON reader, its JSON parsers and the streaming ingestion mode of the generator.
+"""
+import importlib.util
+import json
+import os
+import sys
+import pytest
+
+
+def read_all(dds_file, chunk_size=65536):
+    """Read every section with DDSReader, materializing the list sections."""
+    from dds_reader import DDSReader, SectionStream
+    sections = {}
+    for section, value in DDSReader(str(dds_file), chunk_size=chunk_size).sections():
+        sections[section] = list(value) if isinstance(value, SectionStream) else value
+    return sections
+
+
+class TestDDSReader:
+    """Tests for DDSReader section iteration."""
+
+    @pytest.mark.parametrize("chunk_size", [7, 65536])
+    def test_sections_match_json_load(self, sample_dds_file, chunk_size):
+        """Test that the streamed sections equal json.load regardless of chunk size."""
+        with open(sample_dds_file) as f:
+            expected = json.load(f)
+        sections = read_all(sample_dds_file, chunk_size)
+        assert sections == expected
+        assert list(sections) == list(expected)
+
+    def test_unread_section_is_skipped(self, temp_output_dir):
+        """Test that list elements not consumed by the caller are skipped."""
+        from dds_reader import DDSReader
+        dds_file = temp_output_dir / "skip.json"
+        dds_file.write_text('{"a": [{"x": 1}, {"x": 2}], "b": "c"}')
+        sections = [section for section, _ in DDSReader(str(dds_file), chunk_size=3).sections()]
+        assert sections == ["a", "b"]
+
+    def test_invalid_json_reports_file_line(self, temp_output_dir):
+        """Test that decode errors report the same message and line as json.load."""
+        from dds_reader import DDSReader
+        text = '{"a": [\n  {"x": 1},\n  {"x": }\n]}'
+        dds_file = temp_output_dir / "bad.json"
+        dds_file.write_text(text)
+        with pytest.raises(json.JSONDecodeError) as expected:
+            json.loads(text)
+        with pytest.raises(json.JSONDecodeError) as exc_info:
+            read_all(dds_file, chunk_size=4)
+        assert exc_info.value.msg == expected.value.msg
+        assert exc_info.value.lineno == expected.value.lineno == 3
+        assert exc_info.value.colno == expected.value.colno
+
+
+class TestStreamingIngestion:
+    """Tests comparing the streaming and json.load ingestion paths."""
+
+    def test_stream_output_is_byte_identical(self, sample_dds_file, temp_output_dir, project_root, fixed_timestamp):
+        """Test that streaming ingestion writes exactly the same Define-XML."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        loaded = temp_output_dir / "loaded.xml"
+        streamed = temp_output_dir / "streamed.xml"
+        DefineGenerator(str(sample_dds_file), str(loaded), log_level="WARNING").create()
+        DefineGenerator(str(sample_dds_file), str(streamed), log_level="WARNING", stream=True).create()
+        assert loaded.read_bytes() == streamed.read_bytes()
+
+    def test_stream_malformed_json_exits(self, temp_output_dir, project_root):
+        """Test that streaming ingestion keeps the sys.exit(1) path for invalid JSON."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        bad_json_file = temp_output_dir / "bad.json"
+        bad_json_file.write_text('{"invalid json": }')
+        dg = DefineGenerator(str(bad_json_file), str(temp_output_dir / "output.xml"), log_level="WARNING",
+                             stream=True)
+        with pytest.raises(SystemExit) as exc_info:
+            dg.create()
+        assert exc_info.value.code == 1
+
+
+class TestLoadDDS:
+    """Tests for parsing the whole DDS file with the pluggable JSON parsers."""
+
+    def test_parsers_match_json_load(self, sample_dds_file, temp_output_dir, monkeypatch):
+        """Test that every installed parser returns what json.load does and reports errors by line."""
+        from dds_reader import load_dds, PARSERS, json_parser
+        with open(sample_dds_file) as f:
+            expected = json.load(f)
+        bad_json_file = temp_output_dir / "bad.json"
+        bad_json_file.write_text('{"a": [\n  {"x": 1},\n  {"x": }\n]}')
+        parsers = [parser for parser in PARSERS if importlib.util.find_spec(parser)]
+        for parser in parsers:
+            assert load_dds(str(sample_dds_file), parser) == expected
+            with pytest.raises(json.JSONDecodeError) as exc_info:
+                load_dds(str(bad_json_file), parser)
+            assert exc_info.value.lineno == 3
+
+        # without orjson the standard library parser is chosen
+        monkeypatch.setitem(sys.modules, "orjson", None)
+        assert json_parser("auto")[0] == "json"
+        with pytest.raises(ValueError):
+            json_parser("orjson")
+
+    def test_generator_logs_parser(self, sample_dds_file, temp_output_dir, project_root, original_working_dir,
+                                   caplog):
+        """Test that the generator logs the JSON parser it used and the parse time."""
+        os.chdir(project_root)
+        import logging
+        from define_generator import DefineGenerator
+
+        with caplog.at_level(logging.INFO):
+            DefineGenerator(str(sample_dds_file), str(temp_output_dir / "output.xml"), json_parser="json").create()
+        assert any(message.startswith(f"parsed {sample_dds_file} with json in ") for message in caplog.messages)
+        with pytest.raises(ValueError):
+            DefineGenerator(str(sample_dds_file), None, json_parser="yaml")
@@ -0,0 +1,55 @@
+"""
+Tests for the streaming Define-XML to DDS JSON converter.
+"""
+import json
+import os
+
+
+class TestDefineToDDS:
+    """Tests for converting Define-XML to DDS JSON and generating it again."""
+
+    def test_round_trip_sample_define(self, data_dir, temp_output_dir, project_root, original_working_dir):
+        """Test that data/define-360i.xml converted to DDS JSON generates the same definitions."""
+        os.chdir(project_root)
+        from define2dds import DefineToDDSConverter
+        from define_diff import diff_defines
+        from define_generator import DefineGenerator
+
+        dds_file = temp_output_dir / "define-360i.json"
+        counts = DefineToDDSConverter(data_dir / "define-360i.xml").convert(dds_file)
+        dds = json.loads(dds_file.read_text(encoding="utf-8"))
+        DefineGenerator(str(dds_file), str(temp_output_dir / "define-360i.xml"), log_level="WARNING").create()
+        result = diff_defines(str(data_dir / "define-360i.xml"), str(temp_output_dir / "define-360i.xml"))
+
+        assert counts["itemGroups"] == 15 and counts["whereClauses"] == 187
+        assert dds["studyName"] == "LZZT - NEW"
+        assert sum(len(dataset.get("slices", [])) for dataset in dds["itemGroups"]) == 12
+        assert not (result["added"] or result["removed"] or result["changed"])
+
+    def test_round_trip_optional_content(self, sample_dds_file, temp_output_dir, project_root, original_working_dir):
+        """Test that methods, origins, key sequences, term codes and value list order survive a round trip."""
+        os.chdir(project_root)
+        from define2dds import DefineToDDSConverter
+        from define_diff import diff_defines
+        from define_generator import DefineGenerator
+
+        dds = json.loads(sample_dds_file.read_text(encoding="utf-8"))
+        items = dds["itemGroups"][0]["items"]
+        items[1].update(origin={"type": "Predecessor"}, predecessor="DM.DOMAIN")
+        items[2].update(origin={"type": "Collected", "source": "Investigator"}, pages="12 14")
+        items[3].update(method="MT.DS.DERIVED", order=4, keySequence=2, length=8)
+        dds["methods"] = [{"OID": "MT.DS.DERIVED", "name": "Derivation", "type": "Computation",
+                           "description": "Derived value", "context": "SAS", "code": "x = 1;"}]
+        next(slice for dataset in dds["itemGroups"] for slice in dataset.get("slices", []))["items"][0]["order"] = 1
+        dds["codeLists"][0]["nciCodelistCode"] = "C66742"
+        dds["codeLists"][0]["codeListItems"][0].update(nciTermCode="C49488", order=1)
+        dds_file = temp_output_dir / "edited.json"
+        dds_file.write_text(json.dumps(dds), encoding="utf-8")
+        DefineGenerator(str(dds_file), str(temp_output_dir / "edited.xml"), log_level="WARNING").create()
+        DefineToDDSConverter(str(temp_output_dir / "edited.xml")).convert(temp_output_dir / "converted.json")
+        DefineGenerator(str(temp_output_dir / "converted.json"), str(temp_output_dir / "converted.xml"),
+                        log_level="WARNING").create()
+        result = diff_defines(str(temp_output_dir / "edited.xml"), str(temp_output_dir / "converted.xml"))
+
+        assert result["summary"]["MethodDef"]["unchanged"] == 1
+        assert not (result["added"] or result["removed"] or result["changed"])
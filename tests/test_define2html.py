@@ -0,0 +1,33 @@
+"""
+Tests for rendering Define-XML as HTML with a compiled stylesheet that is reused across documents.
+"""
+import shutil
+
+
+class TestDefine2Html:
+    """Tests for the define2html stylesheet cache and batch rendering."""
+
+    def test_stylesheet_is_compiled_once(self, project_root):
+        """Test that the compiled stylesheet is reused for the same path."""
+        import define2html
+
+        xsl_path = project_root / "define2-1.xsl"
+        assert define2html.get_transform(str(xsl_path)) is define2html.get_transform(xsl_path)
+
+    def test_transform_directory(self, data_dir, project_root, temp_output_dir):
+        """Test that every Define-XML file in a directory is rendered and compile time is reported once."""
+        import define2html
+
+        define_dir = temp_output_dir / "defines"
+        define_dir.mkdir()
+        for name in ("a.xml", "b.xml"):
+            shutil.copy(data_dir / "define-360i.xml", define_dir / name)
+        results = define2html.transform_directory(str(define_dir), str(project_root / "define2-1.xsl"),
+                                                  str(temp_output_dir / "html"))
+
+        assert sorted((temp_output_dir / "html").iterdir()) == [temp_output_dir / "html" / "a.html",
+                                                                 temp_output_dir / "html" / "b.html"]
+        timings = list(results.values())
+        assert timings[1]["compile"] == 0.0
+        assert all(t["transform"] > 0 for t in timings)
+        assert (temp_output_dir / "html" / "a.html").read_bytes() == (temp_output_dir / "html" / "b.html").read_bytes()
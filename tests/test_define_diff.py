@@ -0,0 +1,85 @@
+"""
+Tests for the OID-keyed diff between two Define-XML versions.
+"""
+import io
+import json
+import os
+
+
+class TestDefineDiff:
+    """Tests for comparing Define-XML documents and DDS JSON inputs by OID."""
+
+    def test_regenerated_define_has_no_differences(self, sample_dds_file, temp_output_dir, project_root,
+                                                   original_working_dir):
+        """Test that two runs with different timestamps and reordered datasets are reported as the same."""
+        os.chdir(project_root)
+        from define_diff import diff_defines, format_summary
+        from define_generator import DefineGenerator
+
+        dds = json.loads(sample_dds_file.read_text(encoding="utf-8"))
+        dds["itemGroups"].reverse()
+        reordered_file = temp_output_dir / "reordered.json"
+        reordered_file.write_text(json.dumps(dds), encoding="utf-8")
+        DefineGenerator(str(sample_dds_file), str(temp_output_dir / "old.xml"), log_level="WARNING").create()
+        DefineGenerator(str(reordered_file), str(temp_output_dir / "new.xml"), log_level="WARNING").create()
+        result = diff_defines(str(temp_output_dir / "old.xml"), str(temp_output_dir / "new.xml"))
+
+        assert not (result["added"] or result["removed"] or result["changed"])
+        assert result["summary"]["ItemDef"]["unchanged"] == 449
+        assert format_summary(result) == ["no differences"]
+
+    def test_dds_edits_are_reported_by_oid(self, sample_dds_file, temp_output_dir, project_root,
+                                           original_working_dir):
+        """Test that attribute, child element and removed definition changes between two DDS inputs are reported."""
+        os.chdir(project_root)
+        from define_diff import diff_defines, generate_define
+
+        dds = json.loads(sample_dds_file.read_text(encoding="utf-8"))
+        dds["codeLists"][0]["name"] += " (edited)"
+        removed = dds["itemGroups"][0]["items"].pop()
+        edited_file = temp_output_dir / "edited.json"
+        edited_file.write_text(json.dumps(dds), encoding="utf-8")
+        result = diff_defines(io.BytesIO(generate_define(str(sample_dds_file))),
+                              io.BytesIO(generate_define(str(edited_file), backend="fast")))
+        changed = {(entry["element"], entry["OID"]): entry for entry in result["changed"]}
+        codelist = changed[("CodeList", dds["codeLists"][0]["OID"])]
+        dataset = changed[("ItemGroupDef", dds["itemGroups"][0]["OID"])]
+
+        assert result["removed"] == [{"element": "ItemDef", "OID": removed["OID"]}]
+        assert codelist["attributes"]["Name"]["new"].endswith(" (edited)")
+        assert list(dataset["children"]["removed"]) == [f"ItemRef[ItemOID={removed['OID']}]"]
+        assert len(result["changed"]) == 2
+
+    def test_reordered_range_checks_are_matched_by_item(self):
+        """Test that RangeChecks are keyed by def:ItemOID, so reordering them is not a change but editing one is."""
+        from define_diff import diff_defines
+
+        document = ('<ODM xmlns="http://www.cdisc.org/ns/odm/v1.3" xmlns:def="http://www.cdisc.org/ns/def/v2.1">'
+                    '<def:WhereClauseDef OID="WC.1">{}</def:WhereClauseDef></ODM>')
+        range_check = ('<RangeCheck Comparator="EQ" SoftHard="Soft" def:ItemOID="{}">'
+                       '<CheckValue>{}</CheckValue></RangeCheck>')
+        first, second = range_check.format("IT.A", "X"), range_check.format("IT.B", "Y")
+        old = document.format(first + second).encode("utf-8")
+        reordered = diff_defines(io.BytesIO(old), io.BytesIO(document.format(second + first).encode("utf-8")))
+        edited = diff_defines(io.BytesIO(old), io.BytesIO(
+            document.format(range_check.format("IT.B", "Z") + first).encode("utf-8")))
+
+        assert reordered["changed"] == []
+        assert list(edited["changed"][0]["children"]["changed"]) == ["RangeCheck[def:ItemOID=IT.B,Comparator=EQ]"]
+
+    def test_range_checks_on_the_same_item_are_all_compared(self):
+        """Test that a change to the second of two RangeChecks on the same item and comparator is reported."""
+        from define_diff import diff_defines
+
+        document = ('<ODM xmlns="http://www.cdisc.org/ns/odm/v1.3" xmlns:def="http://www.cdisc.org/ns/def/v2.1">'
+                    '<def:WhereClauseDef OID="WC.AGE">{}</def:WhereClauseDef></ODM>')
+        range_check = ('<RangeCheck Comparator="{}" SoftHard="Soft" def:ItemOID="IT.AGE">'
+                       '<CheckValue>{}</CheckValue></RangeCheck>')
+        old = document.format(range_check.format("GE", "18") + range_check.format("LE", "65")
+                              + range_check.format("NE", "30") + range_check.format("NE", "40"))
+        new = document.format(range_check.format("GE", "21") + range_check.format("LE", "65")
+                              + range_check.format("NE", "30") + range_check.format("NE", "45"))
+        result = diff_defines(io.BytesIO(old.encode("utf-8")), io.BytesIO(new.encode("utf-8")))
+
+        assert sorted(result["changed"][0]["children"]["changed"]) == [
+            "RangeCheck[def:ItemOID=IT.AGE,Comparator=GE]", "RangeCheck[def:ItemOID=IT.AGE,Comparator=NE][2]"]
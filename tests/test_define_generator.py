@@ -6,6 +6,8 @@ and produce valid Define-XML output.
 """
 import json
 import os
+import subprocess
+import sys
 import pytest
 import xml.etree.ElementTree as ET
 
@@ -41,6 +43,38 @@ class TestDefineGeneratorImports:
         import valueLevel
         assert True  # If we get here, all imports succeeded
 
+    def test_loaders_resolve_lazily(self):
+        """Test that every registered loader class resolves from its "module:Class" path."""
+        from define_generator import LOADERS, STUDY_LOADER, resolve_loader
+
+        assert all(LOADERS[section].__name__ == path.split(":")[1] for section, path in LOADERS.paths.items())
+        assert resolve_loader(STUDY_LOADER).__name__ == "Study"
+        assert LOADERS.get("unknownSection") is None
+
+
+class TestImportTime:
+    """Start-up cost of the generator CLI, measured with python -X importtime."""
+
+    # cumulative import time budget for define_generator, in seconds; odmlib accounts for most of it
+    IMPORT_BUDGET = 1.0
+    # modules only needed for validation, HTML rendering or a specific section, which must not load at start-up
+    DEFERRED_MODULES = ["xmlschema.validators", "defineutils.validate", "lxml.etree", "itemGroups", "codeLists",
+                        "whereClauses", "valueLevel", "study"]
+
+    def test_import_time_within_budget(self, project_root):
+        """Test that importing define_generator stays within budget and does not load the deferred modules."""
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import define_generator"],
+                                cwd=project_root, capture_output=True, text=True, check=True)
+        # each line is "import time: <self us> | <cumulative us> | <indented module name>"
+        times = {}
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if line.startswith("import time:") and fields[1].strip().isdigit():
+                times[fields[2].strip()] = int(fields[1]) / 1_000_000
+
+        assert times["define_generator"] < self.IMPORT_BUDGET
+        assert not [module for module in self.DEFERRED_MODULES if module in times]
+
 
 class TestDefineGeneratorBasic:
     """Basic tests for DefineGenerator initialization."""
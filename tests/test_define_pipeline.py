@@ -0,0 +1,54 @@
+"""
+Tests for the post-generation pipeline that validates, renders and summarizes the generated Define-XML from one parse.
+"""
+import os
+
+
+class TestDefinePipeline:
+    """Tests for running validation, HTML rendering and statistics against a single parsed tree."""
+
+    def test_pipeline_output_matches_plain_write(self, sample_dds_file, temp_output_dir, project_root,
+                                                 original_working_dir, fixed_timestamp):
+        """Test that the pipeline writes the same Define-XML as the odmlib writer and renders the HTML."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_pipeline import DefinePipeline
+
+        plain_file = temp_output_dir / "plain.xml"
+        DefineGenerator(str(sample_dds_file), str(plain_file)).create()
+        define_file = temp_output_dir / "define.xml"
+        html_file = temp_output_dir / "define.html"
+        pipeline = DefinePipeline(validate=True, html_file=str(html_file), statistics=True)
+        results = DefineGenerator(str(sample_dds_file), str(define_file)).create(pipeline)
+
+        assert define_file.read_bytes() == plain_file.read_bytes()
+        assert html_file.stat().st_size > 0
+        assert results["valid"] is True
+        assert results["statistics"]["bytes"] == define_file.stat().st_size
+        assert results["statistics"]["ItemGroupDef"] > 0
+        assert set(results["seconds"]) == {"parse", "schema_load", "validate", "statistics", "html", "write"}
+
+    def test_pipeline_with_stream_writer(self, sample_dds_file, temp_output_dir, project_root, original_working_dir):
+        """Test that the pipeline runs against the file assembled by the streaming writer without re-writing it."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_pipeline import DefinePipeline
+
+        define_file = temp_output_dir / "define.xml"
+        pipeline = DefinePipeline(statistics=True)
+        results = DefineGenerator(str(sample_dds_file), str(define_file), writer="stream").create(pipeline)
+
+        assert "write" not in results["seconds"]
+        assert results["statistics"]["bytes"] == define_file.stat().st_size
+
+    def test_invalid_document_is_reported(self, temp_output_dir, project_root):
+        """Test that schema errors are returned in the results instead of raised."""
+        from define_pipeline import DefinePipeline
+
+        define_file = temp_output_dir / "invalid.xml"
+        results = DefinePipeline(validate=True).run(b"<?xml version='1.0' encoding='UTF-8'?>\n<ODM/>",
+                                                    str(define_file))
+
+        assert results["valid"] is False
+        assert results["errors"]
+        assert define_file.exists()
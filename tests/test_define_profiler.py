@@ -0,0 +1,53 @@
+"""
+Tests for the per-stage timing and object-count profiler.
+"""
+import json
+import os
+
+
+class TestDefineProfiler:
+    """Tests for StageProfiler reports from the generator and the disabled NullProfiler."""
+
+    def test_profile_report(self, sample_dds_file, temp_output_dir, project_root, original_working_dir):
+        """Test that the report has timings for the sections, datasets and output stages and the object counts."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_profiler import StageProfiler
+
+        profiler = StageProfiler()
+        dg = DefineGenerator(str(sample_dds_file), str(temp_output_dir / "define.xml"), profiler=profiler)
+        dg.create()
+        report_file = temp_output_dir / "profile.json"
+        profiler.write(str(report_file))
+        report = json.loads(report_file.read_text())
+
+        for stage in ("json.load", "section:itemGroups", "section:codeLists", "dataset:DM", "_build_doc", "write_xml",
+                      "create"):
+            assert report["stages"][stage]["calls"] == 1
+            assert report["stages"][stage]["wall"] >= 0
+        assert report["counts"]["ItemGroupDef"] == 15
+        assert report["counts"]["CodeList"] == 46
+        assert report["writer"] == "odmlib"
+
+    def test_counts_with_stream_writer(self, sample_dds_file, temp_output_dir, project_root, original_working_dir):
+        """Test that elements already written by the streaming writer are still counted."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_profiler import StageProfiler
+
+        profiler = StageProfiler()
+        DefineGenerator(str(sample_dds_file), str(temp_output_dir / "define.xml"), writer="stream",
+                        profiler=profiler).create()
+
+        assert profiler.counts["ItemGroupDef"] == 15
+        assert profiler.counts["ItemDef"] > 0
+
+    def test_null_profiler(self):
+        """Test that the disabled profiler records nothing and reuses one context manager."""
+        from define_profiler import NULL_PROFILER, get_profiler
+
+        assert NULL_PROFILER.stage("a") is NULL_PROFILER.stage("b")
+        with NULL_PROFILER.stage("a"):
+            pass
+        assert NULL_PROFILER.report() == {}
+        assert get_profiler({}) is NULL_PROFILER
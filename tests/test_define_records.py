@@ -0,0 +1,57 @@
+"""
+Tests for the fast backend that builds define_records records instead of odmlib objects.
+"""
+import os
+import pickle
+import xml.etree.ElementTree as ET
+import pytest
+
+
+class TestDefineRecords:
+    """Tests for the record classes, their serializer and the fast backend."""
+
+    @pytest.mark.parametrize("dds", ["sample", "synthetic"])
+    def test_fast_backend_matches_odmlib(self, dds, sample_dds_file, synthetic_dds_file, temp_output_dir,
+                                         project_root, original_working_dir, fixed_timestamp):
+        """Test that the fast backend produces the same canonical XML, and the same bytes, as the odmlib backend."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        dds_file = str(sample_dds_file if dds == "sample" else synthetic_dds_file)
+        odmlib_file = temp_output_dir / "odmlib.xml"
+        fast_file = temp_output_dir / "fast.xml"
+        DefineGenerator(dds_file, str(odmlib_file)).create()
+        DefineGenerator(dds_file, str(fast_file), backend="fast").create()
+
+        assert ET.canonicalize(from_file=fast_file) == ET.canonicalize(from_file=odmlib_file)
+        assert fast_file.read_bytes() == odmlib_file.read_bytes()
+
+    def test_serialize_matches_odmlib(self):
+        """Test that a record serializes like the odmlib object built with the same arguments."""
+        from odmlib.define_2_1 import model as DEFINE
+        import define_records
+        import stream_writer
+
+        def build(model):
+            item = model.ItemDef(OID="IT.DM.AGE", Name="AGE", DataType="integer", Length=3, DisplayFormat="3")
+            item.Description = model.Description()
+            item.Description.TranslatedText.append(model.TranslatedText(_content='Age <"years">', lang="en"))
+            item.Origin.append(model.Origin(Type="Collected", Source="Investigator"))
+            return item
+
+        record_xml, record_prefixes = stream_writer.serialize_element(build(define_records))
+        odmlib_xml, odmlib_prefixes = stream_writer.serialize_element(build(DEFINE))
+        assert record_xml == odmlib_xml
+        assert record_prefixes == odmlib_prefixes
+
+    def test_record_attributes_and_pickle(self):
+        """Test attribute access, unknown keyword arguments and pickling for worker processes."""
+        import define_records
+
+        codelist = define_records.CodeList(OID="CL.SEX", Name="Sex", DataType="text")
+        codelist.CodeListItem.append(define_records.CodeListItem(CodedValue="F"))
+        assert codelist.OID == "CL.SEX"
+        restored = pickle.loads(pickle.dumps(codelist))
+        assert define_records.serialize(restored) == define_records.serialize(codelist)
+        with pytest.raises(TypeError):
+            define_records.ItemRef(ItemOID="IT.DM.AGE", Order=1)
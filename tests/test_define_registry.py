@@ -0,0 +1,65 @@
+"""
+Tests for the OID-indexed define_objects registry.
+"""
+import pickle
+
+
+class TestDefineRegistry:
+    """Tests for DefineRegistry and OIDList."""
+
+    def test_lists_are_indexed(self):
+        """Test that list values assigned to the registry are indexed by OID as they are appended."""
+        from define_registry import DefineRegistry, OIDList
+        from odmlib.define_2_1 import model as DEFINE
+
+        registry = DefineRegistry()
+        registry["ItemDef"] = []
+        assert isinstance(registry["ItemDef"], OIDList)
+        first = DEFINE.ItemDef(OID="IT.DM.AGE", Name="AGE", DataType="integer")
+        registry["ItemDef"].append(first)
+        assert registry.find("ItemDef", "IT.DM.AGE") is first
+        registry["ItemDef"].append(DEFINE.ItemDef(OID="IT.DM.AGE", Name="AGE", DataType="text"))
+        assert registry.find("ItemDef", "IT.DM.AGE") is first
+        assert registry.find("ItemDef", "IT.DM.SEX") is None
+        assert registry.find("CodeList", "CL.SEX") is None
+
+    def test_index_follows_clear_and_reassignment(self):
+        """Test that the index is rebuilt after the list is cleared or replaced."""
+        from define_registry import DefineRegistry
+
+        registry = DefineRegistry({"_conditions": [{"OID": "COND.1"}]})
+        assert registry.find("_conditions", "COND.1") == {"OID": "COND.1"}
+        registry["_conditions"].clear()
+        registry["_conditions"].append({"OID": "COND.2"})
+        assert registry.find("_conditions", "COND.1") is None
+        registry["_conditions"] = [{"OID": "COND.3"}]
+        assert registry.find("_conditions", "COND.3") == {"OID": "COND.3"}
+
+    def test_registry_pickles(self):
+        """Test that the registry and its indexed lists survive a pickle round trip."""
+        from define_registry import DefineRegistry, OIDList
+
+        registry = DefineRegistry({"leaf": [], "_conditions": [{"OID": "COND.1"}]})
+        copy = pickle.loads(pickle.dumps(registry))
+        assert isinstance(copy, DefineRegistry)
+        assert isinstance(copy["_conditions"], OIDList)
+        assert copy.find("_conditions", "COND.1") == {"OID": "COND.1"}
+
+
+class TestRegistryLookups:
+    """Tests for loaders resolving cross-references through the registry."""
+
+    def test_where_clause_uses_stashed_conditions(self):
+        """Test that WhereClauseDef range checks are built from the conditions found by OID."""
+        import conditions
+        import whereClauses
+        from define_registry import DefineRegistry
+
+        define_objects = DefineRegistry({"WhereClauseDef": []})
+        conds = [{"OID": f"COND.{n}", "rangeChecks": [{"item": "IT.VS.VSTESTCD", "comparator": "EQ",
+                                                        "checkValues": [f"T{n}"]}]} for n in range(3)]
+        conditions.Conditions().create_define_objects(conds, define_objects, "en", "LF.acrf")
+        wcs = [{"OID": "WC.1", "conditions": ["COND.2", "COND.0"]}]
+        whereClauses.WhereClauses().create_define_objects(wcs, define_objects, "en", "LF.acrf")
+        wc = define_objects.find("WhereClauseDef", "WC.1")
+        assert [rc.CheckValue[0]._content for rc in wc.RangeCheck] == ["T2", "T0"]
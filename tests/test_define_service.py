@@ -0,0 +1,69 @@
+"""
+Tests for the local HTTP service that generates Define-XML from a DDS JSON payload.
+"""
+import http.client
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+
+def _post(server, body: bytes, query: str = "") -> tuple[int, dict[str, str], bytes]:
+    """POST a body to the /define endpoint of a running server and return the status, headers and body"""
+    url = f"http://127.0.0.1:{server.server_address[1]}/define{query}"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body, method="POST"), timeout=120) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+class TestDefineService:
+    """Tests for generating Define-XML over HTTP."""
+
+    def test_in_memory_generation_matches_file_output(self, sample_dds_file, temp_output_dir, project_root,
+                                                      original_working_dir, fixed_timestamp):
+        """Test that generating from an in-memory template gives the same bytes as writing the file."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        define_file = temp_output_dir / "define.xml"
+        DefineGenerator(str(sample_dds_file), str(define_file), log_level="WARNING").create()
+        template = json.loads(sample_dds_file.read_text(encoding="utf-8"))
+        generator = DefineGenerator(None, None, log_level="WARNING", template=template)
+        generator.create()
+
+        assert generator.xml == define_file.read_bytes()
+
+    def test_post_returns_validated_define(self, sample_dds_file, project_root, original_working_dir):
+        """Test that a POST returns the Define-XML with the validation result and timings, and bad input is refused."""
+        os.chdir(project_root)
+        from define_service import DefineService, make_server
+
+        service = DefineService(workers=0, max_request_bytes=sample_dds_file.stat().st_size, engine="lxml")
+        server = make_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            status, headers, body = _post(server, sample_dds_file.read_bytes(), "?validate=1")
+            bad_status, _, bad_body = _post(server, b'{"study": ')
+            # only the headers are sent: the service refuses the request before reading the body
+            connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=30)
+            connection.putrequest("POST", "/define")
+            connection.putheader("Content-Length", str(service.max_request_bytes + 1))
+            connection.endheaders()
+            large_status = connection.getresponse().status
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.shutdown()
+
+        assert status == 200
+        assert headers["X-Define-Valid"] == "true"
+        assert "generate;dur=" in headers["Server-Timing"]
+        assert body.startswith(b"<?xml") and b"<ItemGroupDef" in body
+        assert bad_status == 400 and "Invalid DDS JSON" in json.loads(bad_body)["error"]
+        assert large_status == 413
+        assert service.counts["requests"] == 1
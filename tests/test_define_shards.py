@@ -0,0 +1,54 @@
+"""
+Tests for writing per-dataset Define-XML shards and merging them into one define.xml.
+"""
+import json
+import os
+
+
+class TestDefineShards:
+    """Tests for define_shards write_shards and merge_shards."""
+
+    def test_merged_define_matches_generator(self, sample_dds_file, temp_output_dir, project_root,
+                                             original_working_dir, fixed_timestamp):
+        """Test that the shards written by worker processes merge into the define.xml the generator writes."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_shards import write_shards, merge_shards
+
+        shard_dir = temp_output_dir / "shards"
+        manifest = write_shards(str(sample_dds_file), str(shard_dir), workers=2, log_level="WARNING")
+        stats = merge_shards(str(shard_dir), str(temp_output_dir / "define.xml"))
+        dg = DefineGenerator(str(sample_dds_file), None, log_level="WARNING")
+        dg.create()
+
+        assert manifest["written"] == len(manifest["shards"]) == stats["shards"] - 1 == 15
+        assert stats["duplicates"] > 0
+        assert (temp_output_dir / "define.xml").read_bytes() == dg.xml
+        assert all("IG." in shard["dataset"] and shard["codeLists"] for shard in manifest["shards"])
+
+    def test_only_changed_shards_regenerated(self, synthetic_dds_file, temp_output_dir, project_root,
+                                             original_working_dir, fixed_timestamp):
+        """Test that a second run regenerates only the shards whose dataset or referenced codelist changed."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_shards import write_shards, merge_shards
+
+        shard_dir = str(temp_output_dir / "shards")
+        manifest = write_shards(str(synthetic_dds_file), shard_dir, backend="fast", log_level="WARNING")
+        assert write_shards(str(synthetic_dds_file), shard_dir, log_level="WARNING")["reused"] == 3
+
+        dds = json.loads(synthetic_dds_file.read_text())
+        # a codelist of the first dataset shared by as few other datasets as possible
+        codelist = min(manifest["shards"][0]["codeLists"],
+                       key=lambda oid: sum(oid in shard["codeLists"] for shard in manifest["shards"]))
+        next(cl for cl in dds["codeLists"] if cl["OID"] == codelist)["codeListItems"][0]["decode"] = "Changed"
+        dds["itemGroups"][2]["description"] = "Changed dataset"
+        synthetic_dds_file.write_text(json.dumps(dds))
+        manifest = write_shards(str(synthetic_dds_file), shard_dir, backend="fast", log_level="WARNING")
+        changed = [n for n, shard in enumerate(manifest["shards"]) if codelist in shard["codeLists"] or n == 2]
+        assert manifest["written"] == len(changed) and manifest["reused"] == 3 - len(changed) > 0
+
+        merge_shards(shard_dir, str(temp_output_dir / "define.xml"))
+        dg = DefineGenerator(str(synthetic_dds_file), None, log_level="WARNING")
+        dg.create()
+        assert (temp_output_dir / "define.xml").read_bytes() == dg.xml
@@ -0,0 +1,49 @@
+"""
+Tests for the snapshot of the define objects created by the loaders.
+"""
+import os
+import pytest
+
+
+class TestDefineSnapshot:
+    """Generating Define-XML from a snapshot instead of the DDS JSON."""
+
+    def test_snapshot_produces_same_define(self, sample_dds_file, temp_output_dir, project_root, original_working_dir,
+                                           fixed_timestamp):
+        """Test that the Define-XML generated from a snapshot is identical to the one generated from the DDS JSON."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        snapshot_file = temp_output_dir / "define.snapshot"
+        from_json = DefineGenerator(str(sample_dds_file), None, log_level="WARNING", save_snapshot=str(snapshot_file))
+        from_json.create()
+        assert snapshot_file.exists()
+
+        from_snapshot = DefineGenerator(None, None, log_level="WARNING", from_snapshot=str(snapshot_file))
+        from_snapshot.create()
+        assert from_snapshot.xml == from_json.xml
+        assert from_snapshot.define_attributes == from_json.define_attributes
+
+        streamed = DefineGenerator(None, None, log_level="WARNING", from_snapshot=str(snapshot_file), writer="stream")
+        streamed.create()
+        assert streamed.xml == from_json.xml
+
+        with pytest.raises(ValueError):
+            DefineGenerator(str(sample_dds_file), None, writer="stream", save_snapshot=str(snapshot_file))
+
+    def test_snapshot_from_other_version_rejected(self, sample_dds_file, temp_output_dir, project_root,
+                                                  original_working_dir, monkeypatch):
+        """Test that a snapshot from a different generator version, or a file that is not a snapshot, is rejected."""
+        os.chdir(project_root)
+        import define_snapshot
+        from define_generator import DefineGenerator
+
+        snapshot_file = temp_output_dir / "define.snapshot"
+        DefineGenerator(str(sample_dds_file), None, log_level="WARNING", save_snapshot=str(snapshot_file)).create()
+        assert define_snapshot.load_snapshot(snapshot_file)["define_objects"].find("ItemGroupDef", "IG.DM")
+
+        monkeypatch.setattr(define_snapshot, "cache_version", lambda: "0.0/0.0/0000")
+        with pytest.raises(ValueError, match="different generator version"):
+            define_snapshot.load_snapshot(snapshot_file)
+        with pytest.raises(ValueError, match="not a Define-XML snapshot"):
+            define_snapshot.load_snapshot(sample_dds_file)
@@ -0,0 +1,48 @@
+"""
+Tests for validating Define-XML documents with a schema compiled once per process.
+"""
+
+
+class TestDefineValidator:
+    """Tests for the cached schema and validating files, bytes and trees."""
+
+    def test_schema_is_compiled_once(self, project_root):
+        """Test that validators share the compiled schema and only the first reports the schema load time."""
+        from define_validator import DefineValidator, get_schema
+
+        first = DefineValidator()
+        second = DefineValidator()
+
+        assert first.schema is second.schema
+        assert get_schema()[1] == 0.0
+        assert second.validate(b"<ODM/>")["seconds"]["schema_load"] == 0.0
+
+    def test_file_bytes_and_tree_give_the_same_result(self, project_root):
+        """Test that the sample Define-XML is valid from a path, a bytes buffer and a parsed tree with both engines."""
+        from lxml import etree
+        from define_validator import DefineValidator
+
+        define_file = project_root / "data" / "define-360i.xml"
+        xml_bytes = define_file.read_bytes()
+        for engine in ["xmlschema", "lxml"]:
+            validator = DefineValidator(engine=engine)
+            for source in [define_file, xml_bytes, etree.fromstring(xml_bytes)]:
+                result = validator.validate(source)
+                assert result["valid"] is True, result["errors"]
+                assert set(result["seconds"]) == {"schema_load", "parse", "validate"}
+
+    def test_errors_are_reported(self, project_root, temp_output_dir):
+        """Test that schema errors and unreadable files are returned in a batch instead of raised."""
+        from define_validator import DefineValidator
+
+        invalid_file = temp_output_dir / "invalid.xml"
+        xml = (project_root / "data" / "define-360i.xml").read_text(encoding="utf-8")
+        invalid_file.write_text(xml.replace('Repeating="No"', 'Repeating="Maybe"', 1), encoding="utf-8")
+        missing_file = temp_output_dir / "missing.xml"
+
+        results = DefineValidator().validate_files([str(invalid_file), str(missing_file)])
+
+        assert results[str(invalid_file)]["valid"] is False
+        assert "Maybe" in results[str(invalid_file)]["errors"][0]
+        assert results[str(missing_file)]["valid"] is False
+        assert results[str(missing_file)]["errors"][0].startswith("Unable to read Define-XML")
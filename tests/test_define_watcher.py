@@ -0,0 +1,68 @@
+"""
+Tests for the watch mode that regenerates the Define-XML when the DDS JSON file changes.
+"""
+import json
+import os
+
+
+class TestDefineWatcher:
+    """Tests for regenerating with a warm in-memory fragment cache."""
+
+    def test_regeneration_reuses_unchanged_content(self, sample_dds_file, temp_output_dir, project_root,
+                                                   original_working_dir, fixed_timestamp):
+        """Test that a cycle after an edit only regenerates the changed codelist and matches a cold run."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_watcher import DefineWatcher
+
+        dds_file = temp_output_dir / "watched.json"
+        dds = json.loads(sample_dds_file.read_text(encoding="utf-8"))
+        dds_file.write_text(json.dumps(dds), encoding="utf-8")
+        watcher = DefineWatcher(str(dds_file), str(temp_output_dir / "watched.xml"), {"log_level": "WARNING"})
+        first = watcher.regenerate()
+        dds["codeLists"][0]["name"] += " (edited)"
+        dds_file.write_text(json.dumps(dds), encoding="utf-8")
+        second = watcher.regenerate()
+        cold_file = temp_output_dir / "cold.xml"
+        DefineGenerator(str(dds_file), str(cold_file), log_level="WARNING").create()
+
+        assert first["hits"] == 0 and first["misses"] > 0
+        assert second["misses"] == 1 and second["hits"] == first["misses"] - 1
+        assert (temp_output_dir / "watched.xml").read_bytes() == cold_file.read_bytes()
+        assert not list(temp_output_dir.glob("**/fragments.json"))
+
+    def test_invalid_json_does_not_stop_the_watcher(self, temp_output_dir, project_root, original_working_dir):
+        """Test that a partly saved DDS file is reported as a failed cycle instead of ending the process."""
+        os.chdir(project_root)
+        from define_watcher import DefineWatcher
+
+        dds_file = temp_output_dir / "partial.json"
+        dds_file.write_text('{"study": ', encoding="utf-8")
+        watcher = DefineWatcher(str(dds_file), str(temp_output_dir / "partial.xml"), {"log_level": "WARNING"})
+        watcher.run(max_cycles=1)
+
+        assert watcher.cycles[0]["error"] == "exit status 1"
+
+    def test_edited_stylesheet_is_used_in_next_cycle(self, sample_dds_file, temp_output_dir, project_root,
+                                                     original_working_dir):
+        """Test that a style sheet edited between two cycles is compiled again and used for the HTML rendering."""
+        os.chdir(project_root)
+        from define_pipeline import DefinePipeline
+        from define_watcher import DefineWatcher
+
+        xsl_file = temp_output_dir / "define.xsl"
+        html_file = temp_output_dir / "watched.html"
+        stylesheet = ('<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">'
+                      '<xsl:template match="/"><html><body>{}</body></html></xsl:template></xsl:stylesheet>')
+        xsl_file.write_text(stylesheet.format("first"), encoding="utf-8")
+        watcher = DefineWatcher(str(sample_dds_file), str(temp_output_dir / "watched.xml"), {"log_level": "WARNING"},
+                                pipeline_factory=lambda: DefinePipeline(html_file=str(html_file),
+                                                                        stylesheet=str(xsl_file)),
+                                watch_dirs=[str(temp_output_dir)])
+        watcher.regenerate()
+        assert b"first" in html_file.read_bytes()
+        xsl_file.write_text(stylesheet.format("second edit"), encoding="utf-8")
+        watcher.regenerate()
+
+        assert b"second edit" in html_file.read_bytes()
+        assert all(cycle["error"] is None for cycle in watcher.cycles)
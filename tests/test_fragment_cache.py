@@ -0,0 +1,63 @@
+"""
+Tests for fragment-level incremental regeneration with the fragment cache.
+"""
+import json
+import os
+
+
+def generate(dds_file, define_file, **options):
+    from define_generator import DefineGenerator
+    dg = DefineGenerator(str(dds_file), str(define_file), log_level="WARNING", **options)
+    dg.create()
+    return dg
+
+
+class TestFragmentCache:
+    """Tests for generating Define-XML with the fragment cache."""
+
+    def test_cold_and_warm_runs_match_uncached_output(self, sample_dds_file, temp_output_dir, project_root,
+                                                      fixed_timestamp):
+        """Test that cached generation is byte-identical and a second run is served entirely from the cache."""
+        os.chdir(project_root)
+        cache_dir = temp_output_dir / "cache"
+        generate(sample_dds_file, temp_output_dir / "plain.xml")
+        cold = generate(sample_dds_file, temp_output_dir / "cold.xml", cache_dir=str(cache_dir))
+        warm = generate(sample_dds_file, temp_output_dir / "warm.xml", cache_dir=str(cache_dir))
+
+        plain = (temp_output_dir / "plain.xml").read_bytes()
+        assert (temp_output_dir / "cold.xml").read_bytes() == plain
+        assert (temp_output_dir / "warm.xml").read_bytes() == plain
+        assert cold.cache.stats()["hits"] == 0
+        assert warm.cache.stats()["misses"] == 0
+        assert warm.cache.stats()["hit_rate"] == 1.0
+
+    def test_only_changed_content_is_regenerated(self, sample_dds_file, temp_output_dir, project_root,
+                                                 fixed_timestamp):
+        """Test that changing one codelist and one condition regenerates only the affected fragments."""
+        os.chdir(project_root)
+        cache_dir = temp_output_dir / "cache"
+        generate(sample_dds_file, temp_output_dir / "first.xml", cache_dir=str(cache_dir))
+
+        with open(sample_dds_file) as f:
+            template = json.load(f)
+        template["codeLists"][0]["name"] = "Changed Name"
+        changed_condition = template["conditions"][0]["OID"]
+        template["conditions"][0]["rangeChecks"][0]["checkValues"] = ["CHANGED"]
+        changed_file = temp_output_dir / "changed.json"
+        changed_file.write_text(json.dumps(template))
+        dependent = sum(1 for wc in template["whereClauses"] if changed_condition in wc["conditions"])
+
+        dg = generate(changed_file, temp_output_dir / "cached.xml", cache_dir=str(cache_dir))
+        generate(changed_file, temp_output_dir / "plain.xml")
+        assert (temp_output_dir / "cached.xml").read_bytes() == (temp_output_dir / "plain.xml").read_bytes()
+        assert dg.cache.stats()["misses"] == 1 + dependent
+
+    def test_version_change_invalidates_cache(self, sample_dds_file, temp_output_dir, project_root, monkeypatch):
+        """Test that a cache written by another generator version is discarded."""
+        os.chdir(project_root)
+        import fragment_cache
+        cache_dir = temp_output_dir / "cache"
+        generate(sample_dds_file, temp_output_dir / "first.xml", cache_dir=str(cache_dir))
+        monkeypatch.setattr(fragment_cache, "cache_version", lambda: "another-version")
+        dg = generate(sample_dds_file, temp_output_dir / "second.xml", cache_dir=str(cache_dir))
+        assert dg.cache.stats()["hits"] == 0
@@ -0,0 +1,48 @@
+"""
+Tests for the referential integrity check run between the loaders and _build_doc.
+"""
+import json
+import os
+
+
+class TestIntegrity:
+    """Tests for collecting OID definitions and references and reporting the problems."""
+
+    def test_sample_has_no_problems(self, sample_dds_file, temp_output_dir, project_root, original_working_dir):
+        """Test that the sample DDS resolves with the odmlib writer and when the streaming writer releases objects."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        reports = []
+        for writer in ["odmlib", "stream"]:
+            generator = DefineGenerator(str(sample_dds_file), str(temp_output_dir / f"{writer}.xml"), writer=writer,
+                                        check_integrity=True)
+            generator.create()
+            reports.append(generator.integrity_report)
+
+        assert reports[0] == reports[1]
+        assert reports[0]["dangling"] == [] and reports[0]["duplicates"] == []
+        assert reports[0]["definitions"] > 0 and reports[0]["references"] > 0
+
+    def test_all_problems_are_reported(self, sample_dds_file, temp_output_dir, project_root, original_working_dir):
+        """Test that a missing condition no longer fails the load and is reported with a dangling codelist reference
+        and a duplicate ItemDef OID."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        dds = json.loads(sample_dds_file.read_text(encoding="utf-8"))
+        dds["whereClauses"][0]["conditions"].append("COND.MISSING")
+        dds["itemGroups"][0]["items"][0]["codeList"] = "CL.MISSING"
+        dds["itemGroups"][1]["items"].append(dict(dds["itemGroups"][1]["items"][0]))
+        dds_file = temp_output_dir / "broken.json"
+        dds_file.write_text(json.dumps(dds), encoding="utf-8")
+
+        generator = DefineGenerator(str(dds_file), str(temp_output_dir / "broken.xml"), writer="stream",
+                                    check_integrity=True)
+        generator.create()
+        report = generator.integrity_report
+
+        assert {(d["target"], d["reference"]) for d in report["dangling"]} == {("CodeList", "CL.MISSING"),
+                                                                              ("condition", "COND.MISSING")}
+        assert report["duplicates"] == [{"element": "ItemDef", "OID": dds["itemGroups"][1]["items"][0]["OID"],
+                                         "count": 2}]
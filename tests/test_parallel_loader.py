@@ -0,0 +1,57 @@
+"""
+Tests for parallel section and dataset loading.
+"""
+import json
+import os
+import pytest
+
+
+class TestParallelLoading:
+    """Tests comparing parallel loading with serial loading."""
+
+    @pytest.mark.parametrize("options", [{}, {"stream": True, "writer": "stream"}])
+    def test_parallel_output_is_byte_identical(self, sample_dds_file, temp_output_dir, project_root,
+                                               fixed_timestamp, options):
+        """Test that loading with a worker pool writes exactly the serial output."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        serial_xml = temp_output_dir / "serial.xml"
+        parallel_xml = temp_output_dir / "parallel.xml"
+        DefineGenerator(str(sample_dds_file), str(serial_xml), log_level="WARNING").create()
+        DefineGenerator(str(sample_dds_file), str(parallel_xml), log_level="WARNING", workers=2, **options).create()
+        assert serial_xml.read_bytes() == parallel_xml.read_bytes()
+
+    def test_worker_errors_propagate(self, sample_dds_file, temp_output_dir, project_root):
+        """Test that a loader error in a worker process is raised by create()."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        with open(sample_dds_file) as f:
+            template = json.load(f)
+        del template["itemGroups"][3]["name"]
+        bad_json_file = temp_output_dir / "missing_name.json"
+        bad_json_file.write_text(json.dumps(template))
+        dg = DefineGenerator(str(bad_json_file), str(temp_output_dir / "output.xml"), log_level="WARNING", workers=2)
+        with pytest.raises(ValueError, match="Required field 'name' missing"):
+            dg.create()
+
+
+class TestLoadChunk:
+    """Tests for the worker task function."""
+
+    def test_load_chunk_reports_replaced_entries(self, sample_dds_file, project_root):
+        """Test that entries reset by a loader are flagged as replaced and appended entries are not."""
+        os.chdir(project_root)
+        import itemGroups
+        from define_generator import ELEMENTS
+        from parallel_loader import load_chunk
+
+        with open(sample_dds_file) as f:
+            dataset = json.load(f)["itemGroups"][0]
+        result = {key: (value, replaced) for key, value, replaced in
+                  load_chunk(itemGroups.ItemGroups, [dataset], ELEMENTS, "en", "LF.acrf")}
+        assert result["ItemDef"][1] is True
+        assert result["ItemGroupDef"][1] is False
+        assert len(result["ItemDef"][0]) == len(dataset["items"])
+        assert "CodeList" not in result
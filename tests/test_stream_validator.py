@@ -0,0 +1,48 @@
+"""
+Tests for validating Define-XML files one subtree at a time.
+"""
+
+
+class TestStreamingDefineValidator:
+    """Tests for the streaming validator and its selection by file size."""
+
+    def test_valid_file(self, project_root):
+        """Test that the sample Define-XML is valid with both engines and the largest subtree is reported."""
+        from stream_validator import StreamingDefineValidator
+
+        for engine in ["xmlschema", "lxml"]:
+            result = StreamingDefineValidator(engine=engine).validate(project_root / "data" / "define-360i.xml")
+            assert result["valid"] is True, result["errors"]
+            assert result["largest_subtree"]["element"].startswith("CodeList ")
+
+    def test_errors_match_whole_tree_validation(self, project_root, temp_output_dir):
+        """Test that attribute, container, ordering and duplicate element errors are reported with document paths."""
+        from define_validator import DefineValidator
+        from stream_validator import StreamingDefineValidator
+
+        xml = (project_root / "data" / "define-360i.xml").read_text(encoding="utf-8")
+        xml = xml.replace('Repeating="No"', 'Repeating="Maybe"', 1).replace('def:Context="Other"', "", 1)
+        gv_start, gv_end = xml.index("<GlobalVariables>"), xml.index("</GlobalVariables>") + len("</GlobalVariables>")
+        global_variables = xml[gv_start:gv_end]
+        xml = xml.replace(global_variables, global_variables * 2, 1)
+        start, end = xml.index("<CodeList "), xml.index("</CodeList>") + len("</CodeList>")
+        first_dataset = xml.index("<ItemGroupDef ")
+        invalid_file = temp_output_dir / "invalid.xml"
+        invalid_file.write_text(xml[:first_dataset] + xml[start:end] + xml[first_dataset:start] + xml[end:],
+                                encoding="utf-8")
+
+        errors = StreamingDefineValidator().validate(invalid_file)["errors"]
+
+        assert errors[0].endswith("/ODM: missing required attribute Context")
+        assert any("/ODM/Study/MetaDataVersion/ItemGroupDef[2]: attribute Repeating='Maybe'" in e for e in errors)
+        assert any("ItemGroupDef: unexpected element; it must come before CodeList" in e for e in errors)
+        assert any("/ODM/Study/GlobalVariables: unexpected element; at most 1 allowed" in e for e in errors)
+        assert not DefineValidator().validate(invalid_file)["valid"]
+
+    def test_large_files_are_streamed(self, project_root):
+        """Test that DefineValidator only streams files larger than the threshold."""
+        from define_validator import DefineValidator
+
+        define_file = project_root / "data" / "define-360i.xml"
+        assert "largest_subtree" in DefineValidator(stream_threshold=0).validate(define_file)
+        assert "largest_subtree" not in DefineValidator().validate(define_file)
@@ -0,0 +1,45 @@
+"""
+Tests for the streaming Define-XML writer backend.
+"""
+import os
+import xml.etree.ElementTree as ET
+
+
+class TestStreamingWriter:
+    """Tests comparing the streaming writer with the odmlib writer."""
+
+    def test_stream_writer_is_byte_identical(self, sample_dds_file, temp_output_dir, project_root, fixed_timestamp):
+        """Test that the streaming writer produces exactly the odmlib writer output."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        odmlib_xml = temp_output_dir / "odmlib.xml"
+        stream_xml = temp_output_dir / "stream.xml"
+        DefineGenerator(str(sample_dds_file), str(odmlib_xml), log_level="WARNING").create()
+        DefineGenerator(str(sample_dds_file), str(stream_xml), log_level="WARNING", writer="stream").create()
+        assert odmlib_xml.read_bytes() == stream_xml.read_bytes()
+
+    def test_stream_writer_with_stream_ingestion(self, sample_dds_file, temp_output_dir, project_root,
+                                                 fixed_timestamp):
+        """Test that streaming ingestion and the streaming writer together match the default path."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        odmlib_xml = temp_output_dir / "odmlib.xml"
+        stream_xml = temp_output_dir / "stream.xml"
+        DefineGenerator(str(sample_dds_file), str(odmlib_xml), log_level="WARNING").create()
+        DefineGenerator(str(sample_dds_file), str(stream_xml), log_level="WARNING", stream=True,
+                        writer="stream").create()
+        assert odmlib_xml.read_bytes() == stream_xml.read_bytes()
+
+    def test_loaded_objects_are_released(self, sample_dds_file, temp_output_xml, project_root):
+        """Test that the writer removes spooled objects from define_objects after each loader."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator, ELEMENTS
+
+        dg = DefineGenerator(str(sample_dds_file), str(temp_output_xml), log_level="WARNING", writer="stream")
+        dg.create()
+        assert all(len(dg.define_objects[elem]) == 0 for elem in ELEMENTS if elem != "leaf")
+        assert dg.writer.counts["ItemDef"] > 0
+        root = ET.parse(temp_output_xml).getroot()
+        assert len([e for e in root.iter() if e.tag.endswith("}ItemDef")]) == dg.writer.counts["ItemDef"]
@@ -0,0 +1,39 @@
+"""
+Tests for the synthetic DDS generator used by the benchmarks.
+"""
+import os
+
+
+class TestSyntheticDDS:
+    """Tests that synthetic DDS files have the requested size and generate a Define-XML file."""
+
+    def test_generate_dds_sizes(self):
+        """Test that the generated DDS has the requested number of each element."""
+        from benchmarks.synthetic_dds import generate_dds
+
+        dds = generate_dds(datasets=4, variables=10, codelists=3, terms=5, slices=2, slice_items=3, conditions=7,
+                           where_clauses=9)
+
+        assert len(dds["itemGroups"]) == 4
+        assert all(len(dataset["items"]) == 10 for dataset in dds["itemGroups"])
+        assert all(len(dataset["slices"]) == 2 for dataset in dds["itemGroups"])
+        assert all(len(codelist["codeListItems"]) == 5 for codelist in dds["codeLists"])
+        assert len(dds["conditions"]) == 7
+        assert len(dds["whereClauses"]) == 9
+        assert generate_dds(datasets=4) == generate_dds(datasets=4)
+
+    def test_synthetic_dds_generates_define(self, synthetic_dds_file, temp_output_dir, project_root,
+                                            original_working_dir):
+        """Test that a synthetic DDS file can be converted to Define-XML."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+        from define_pipeline import DefinePipeline
+
+        define_file = temp_output_dir / "synthetic.xml"
+        results = DefineGenerator(str(synthetic_dds_file), str(define_file)).create(DefinePipeline(statistics=True))
+
+        assert results["statistics"]["ItemGroupDef"] == 3
+        assert results["statistics"]["ItemDef"] == 3 * 8 + 3 * 2 * 2
+        assert results["statistics"]["ValueListDef"] == 6
+        assert results["statistics"]["WhereClauseDef"] == 6
+        assert results["statistics"]["CodeListItem"] == 12
@@ -0,0 +1,38 @@
+"""
+Tests for interning codelist terms shared by several codelists.
+"""
+import os
+
+
+class TestTermTable:
+    """Tests for the TermTable and the CodeLists loader sharing identical terms."""
+
+    def test_identical_terms_are_shared(self):
+        """Test that identical terms in different codelists are the same object and the counts are reported."""
+        from codeLists import CodeLists
+        from define_registry import DefineRegistry
+
+        terms = [{"codedValue": "Y", "decode": "Yes", "nciTermCode": "C49488"}, {"codedValue": "N", "decode": "No"}]
+        codelists = [{"OID": "CL.NY", "name": "No Yes Response", "codeListItems": terms},
+                     {"OID": "CL.NY2", "name": "No Yes Response 2", "codeListItems": terms[:1]}]
+        define_objects = DefineRegistry({"CodeList": []})
+        CodeLists().create_define_objects(codelists, define_objects, "en", "LF.acrf")
+
+        first, second = define_objects["CodeList"]
+        assert first.CodeListItem[0] is second.CodeListItem[0]
+        assert first.CodeListItem[1] is not second.CodeListItem[0]
+        assert define_objects.terms.stats()["CodeListItem"] == {"requested": 3, "created": 2, "shared": 1}
+        assert define_objects.terms.objects == {}
+
+    def test_interning_does_not_change_output(self, synthetic_dds_file, temp_output_dir, project_root,
+                                              original_working_dir, fixed_timestamp):
+        """Test that the Define-XML is the same with and without interning."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        interned_file = temp_output_dir / "interned.xml"
+        plain_file = temp_output_dir / "plain.xml"
+        DefineGenerator(str(synthetic_dds_file), str(interned_file)).create()
+        DefineGenerator(str(synthetic_dds_file), str(plain_file), intern_terms=False).create()
+
+        assert interned_file.read_bytes() == plain_file.read_bytes()
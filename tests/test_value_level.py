@@ -0,0 +1,57 @@
+"""
+Tests for the value-level metadata created for the slices of a dataset.
+"""
+import os
+import xml.etree.ElementTree as ET
+
+ODM_NS = "{http://www.cdisc.org/ns/odm/v1.3}"
+DEF_NS = "{http://www.cdisc.org/ns/def/v2.1}"
+
+
+class TestValueLevel:
+    """Tests for ValueLevel ValueListDefs, their ItemRefs and the ValueListRefs of the parent ItemDefs."""
+
+    def test_value_lists_referenced_by_parent_itemdef(self, sample_dds_file, project_root, original_working_dir):
+        """Test that every ValueListDef in the sample is referenced from the ItemDef of its variable."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        dg = DefineGenerator(str(sample_dds_file), None, log_level="WARNING", check_integrity=True)
+        dg.create()
+        root = ET.fromstring(dg.xml)
+        value_lists = [vld.get("OID") for vld in root.iter(f"{DEF_NS}ValueListDef")]
+        refs = {ref.get("ValueListOID"): item.get("OID") for item in root.iter(f"{ODM_NS}ItemDef")
+                for ref in item.iter(f"{DEF_NS}ValueListRef")}
+        assert value_lists and sorted(refs) == sorted(value_lists)
+        assert all(refs[oid] == "IT." + oid.removeprefix("VL.") for oid in value_lists)
+        assert dg.integrity_report["dangling"] == []
+
+    def test_slices_loaded_in_one_batch(self, caplog):
+        """Test multiple where clauses per item, slices that share a value list OID and a value list without a
+        variable."""
+        from define_registry import DefineRegistry
+        from valueLevel import ValueLevel
+
+        define_objects = DefineRegistry(ValueListDef=[], ItemDef=[])
+        parent = define_objects.model.ItemDef(OID="IT.LB.LBORRES", Name="LBORRES", DataType="text")
+        item = {"mandatory": False, "name": "LBORRES", "dataType": "float"}
+        slices = [
+            {"OID": "VL.LB.LBORRES", "type": "ValueList",
+             "items": [{**item, "OID": "IT.LB.LBORRES.GLUC",
+                        "applicableWhen": ["WC.LB.GLUC.SERUM", "WC.LB.GLUC.URINE"]}]},
+            {"OID": "VL.LB.LBORRES", "type": "ValueList",
+             "items": [{**item, "OID": "IT.LB.LBORRES.ALB", "applicableWhen": ["WC.LB.ALB"]}]},
+            {"OID": "VL.LB.LBSTRESC", "type": "ValueList",
+             "items": [{**item, "OID": "IT.LB.LBSTRESC.ALB", "applicableWhen": ["WC.LB.ALB"]}]},
+        ]
+        ValueLevel().create_define_objects(slices, define_objects, "en", "LF.acrf",
+                                           item_defs={"IT.LB.LBORRES": parent})
+
+        assert [vld.OID for vld in define_objects["ValueListDef"]] == ["VL.LB.LBORRES", "VL.LB.LBSTRESC"]
+        item_refs = define_objects["ValueListDef"][0].ItemRef
+        assert [ref.ItemOID for ref in item_refs] == ["IT.LB.LBORRES.GLUC", "IT.LB.LBORRES.ALB"]
+        assert [wc.WhereClauseOID for wc in item_refs[0].WhereClauseRef] == ["WC.LB.GLUC.SERUM", "WC.LB.GLUC.URINE"]
+        assert parent.ValueListRef.ValueListOID == "VL.LB.LBORRES"
+        assert [item_def.OID for item_def in define_objects["ItemDef"]] == [
+            "IT.LB.LBORRES.GLUC", "IT.LB.LBORRES.ALB", "IT.LB.LBSTRESC.ALB"]
+        assert any("VL.LB.LBSTRESC has no variable IT.LB.LBSTRESC" in message for message in caplog.messages)
@@ -0,0 +1,61 @@
+"""
+Tests for collapsing identical where clauses and sharing their range checks.
+"""
+import copy
+import os
+import pytest
+
+
+class TestWhereClauseDedup:
+    """Tests for where_clause_dedup and the --dedup-where-clauses generator option."""
+
+    def test_collapsed_define_is_smaller_and_resolves(self, sample_dds_file, project_root, original_working_dir,
+                                                      fixed_timestamp):
+        """Test that the collapsed where clauses save the reported bytes and every reference still resolves."""
+        os.chdir(project_root)
+        from define_generator import DefineGenerator
+
+        full = DefineGenerator(str(sample_dds_file), None, log_level="WARNING")
+        full.create()
+        assert full.define_objects.terms.stats()["RangeCheck"]["shared"] > 0
+        collapsed = DefineGenerator(str(sample_dds_file), None, log_level="WARNING", dedup_where_clauses=True,
+                                    check_integrity=True)
+        collapsed.create()
+
+        report = collapsed.where_clause_report
+        assert report["where_clauses"] == 187
+        assert 0 < report["collapsed"] == len(report["aliases"])
+        assert len(collapsed.define_objects["WhereClauseDef"]) == 187 - report["collapsed"]
+        assert report["bytes_saved"] == len(full.xml) - len(collapsed.xml)
+        assert collapsed.integrity_report["dangling"] == [] and collapsed.integrity_report["duplicates"] == []
+        for alias in report["aliases"]:
+            assert f'WhereClauseOID="{alias}"'.encode() not in collapsed.xml
+
+        with pytest.raises(ValueError):
+            DefineGenerator(str(sample_dds_file), None, stream=True, dedup_where_clauses=True)
+
+    def test_canonical_form_ignores_order(self):
+        """Test that where clauses with the same checks in a different order collapse and the input is not changed."""
+        from where_clause_dedup import collapse_where_clauses
+
+        template = {
+            "conditions": [
+                {"OID": "COND.1", "rangeChecks": [{"item": "IT.A", "comparator": "IN", "checkValues": ["X", "Y"]}]},
+                {"OID": "COND.2", "rangeChecks": [{"item": "IT.A", "comparator": "IN", "checkValues": ["Y", "X"]}]},
+                {"OID": "COND.3", "rangeChecks": [{"item": "IT.B", "comparator": "EQ", "checkValues": ["Z"]}]},
+            ],
+            "whereClauses": [{"OID": "WC.1", "conditions": ["COND.1", "COND.3"]},
+                             {"OID": "WC.2", "conditions": ["COND.3", "COND.2"]},
+                             {"OID": "WC.3", "conditions": ["COND.3"]},
+                             {"OID": "WC.4", "conditions": ["COND.MISSING"]}],
+            "itemGroups": [{"OID": "IG.A", "slices": [{"OID": "VL.A", "items": [
+                {"OID": "IT.A.1", "applicableWhen": ["WC.1"]}, {"OID": "IT.A.2", "applicableWhen": ["WC.2"]}]}]}],
+        }
+        original = copy.deepcopy(template)
+        result, report = collapse_where_clauses(template)
+        assert template == original
+        assert report["aliases"] == {"WC.2": "WC.1"}
+        assert [wc["OID"] for wc in result["whereClauses"]] == ["WC.1", "WC.3", "WC.4"]
+        assert [c["OID"] for c in result["conditions"]] == ["COND.1", "COND.3"]
+        items = result["itemGroups"][0]["slices"][0]["items"]
+        assert [item["applicableWhen"] for item in items] == [["WC.1"], ["WC.1"]]
@@ -1,27 +1,26 @@
-from odmlib.define_2_1 import model as DEFINE
+from typing import Any
 import define_object
-import whereClauses as WC
 import items
+from term_table import TermTable, get_term_table
 
 # TODO
 """
-- Value List definitions are created for variables like VSORRES - this name is referenced in the items and should have the OID of the original variable being redefined
 - we have "VL.VS.TEMP" under itemGroups - but this OID isn't used anywhere is it? The value list is V:.VS.VSORRES
 - we have itemGroup types, but just one for DataSpecialization. We should have one for datasets as well.
 - DataSpecialization should be DatasetSpecialization
 """
 
 class ValueLevel(define_object.DefineObject):
-    """ create a Define-XML v2.0 ValueListDef element template """
+    """ create the Define-XML v2.1 ValueListDef elements for the value lists (slices) of a dataset """
     def __init__(self):
         super().__init__()
-        self.lookup_oid = None
-        self.vld = None
+        self.items = items.Items()
+        self.terms = TermTable()
 
-    # def create_define_objects(self, template, define_objects, oid, item_oids, lang, acrf):
-    def create_define_objects(self, slice, define_objects, lang, acrf):
+    def create_define_objects(self, template, define_objects, lang, acrf, item_defs=None):
         """
-        parse the define-template and create a odmlib define_objects to return in the define_objects dictionary
+        parse the value lists of a dataset in one batch and create the ValueListDef and ItemDef odmlib objects; each
+        ValueListDef is referenced from the ItemDef of the variable it describes with a ValueListRef
                     {
                       "OID": "IT.VS.VSORRES.TEMP",
                       "mandatory": false,
@@ -37,52 +36,68 @@ class ValueLevel(define_object.DefineObject):
                         "source": "Investigator"
                       }
                     },
+        :param template: the slices of a dataset from the DDS JSON
+        :param define_objects: dictionary of odmlib define_objects updated by this method
+        :param lang: xml:lang setting for TranslatedText
+        :param acrf: annotated case report form leaf ID
+        :param item_defs: ItemDefs of the dataset's variables by OID, which receive the ValueListRefs
         """
         self.lang = lang
+        self.set_model(define_objects)
         self.acrf = acrf
-        # create ValueListDef
-        vld_obj = self._create_valuelistdef_object(slice["OID"], define_objects)
-        define_objects["ValueListDef"].append(vld_obj)
+        self.terms = get_term_table(define_objects)
+        item_defs = item_defs or {}
+        value_list_items = []
+        for slice in template:
+            if slice["type"] != "ValueList":
+                continue
+            vld_obj = self._get_vld(slice["OID"], define_objects)
+            if vld_obj is None:
+                vld_obj = self._create_valuelistdef_object(slice["OID"])
+                define_objects["ValueListDef"].append(vld_obj)
+                self._add_valuelistref(vld_obj, item_defs)
+            # create ItemRefs in ValueListDef
+            for item in slice["items"]:
+                itr = self._create_itemref_object(item)
+                vld_obj.ItemRef.append(itr)
+            value_list_items.extend(slice["items"])
 
-        # create ItemRefs in ValueListDef
-        for item in slice["items"]:
-            itr = self._create_itemref_object(vld_obj, item)
-            vld_obj.ItemRef.append(itr)
+        # create ItemDefs referenced by the ValueListDef ItemRefs of all the dataset's value lists
+        self.items.create_define_objects(value_list_items, define_objects, lang, acrf)
 
-        # create ItemDefs referenced by ValueListDef ItemRefs
-        itd = items.Items()
-        itd.create_define_objects(slice["items"], define_objects, lang, acrf)
+    def _get_vld(self, vld_oid, define_objects):
+        return self.find_object(define_objects, "ValueListDef", vld_oid)
 
-    def _create_whereclause_object(self, object, define_objects, wc, wc_oid, dataset):
-        where_clause = WC.WhereClauses()
-        where_clause.create_define_objects(object, define_objects, wc, wc_oid, dataset, self.lang, self.acrf)
-
-
-    def _get_vld(self, vld_oid, item, define_objects):
-        for vld in define_objects["ValueListDef"]:
-            if vld.OID == vld_oid:
-                return vld
-        return None
-
-    def _create_valuelistdef_object(self, oid, define_objects):
+    def _create_valuelistdef_object(self, oid):
         """
         use the values from the VLM define-template to create a ValueListDef odmlib template
         """
-        vld = DEFINE.ValueListDef(OID=oid)
+        vld = self.model.ValueListDef(OID=oid)
         return vld
 
-    def _create_itemref_object(self, vld_obj, item): #   wc, dataset, variable, it_oid):
+    def _add_valuelistref(self, vld_obj, item_defs):
+        """ reference the ValueListDef from the ItemDef of the variable it describes, VL.<dataset>.<variable> """
+        it_oid = f"IT.{vld_obj.OID.removeprefix('VL.')}"
+        item_def = item_defs.get(it_oid)
+        if item_def is None:
+            self.logger.warning(f"ValueListDef {vld_obj.OID} has no variable {it_oid} to reference it")
+            return
+        item_def.ValueListRef = self.model.ValueListRef(ValueListOID=vld_obj.OID)
+
+    def _create_itemref_object(self, item: dict[str, Any]):
         attr = {"ItemOID": item["OID"]}
         if item.get("order"):
-            attr["Order"] = item["order"]
+            attr["OrderNumber"] = item["order"]
         if item.get("method"):
             attr["MethodOID"] = item["method"]
         if item.get("mandatory", False):
             attr["Mandatory"] = "Yes"
         else:
             attr["Mandatory"] = "No"
-        ir = DEFINE.ItemRef(**attr)
-        # TODO determine how to process when there are multiple applicableWhen values
-        wc = DEFINE.WhereClauseRef(WhereClauseOID=item["applicableWhen"][0])
-        ir.WhereClauseRef.append(wc)
+        ir = self.model.ItemRef(**attr)
+        # an item applies when any of its where clauses is true; the items that share a where clause share one
+        # WhereClauseRef object
+        for wc_oid in self.require_key(item, "applicableWhen", f"ValueListDef ItemRef {item['OID']}"):
+            ir.WhereClauseRef.append(self.terms.intern(("WhereClauseRef", wc_oid), self.model.WhereClauseRef,
+                                                       WhereClauseOID=wc_oid))
         return ir
@@ -1,11 +1,13 @@
-from odmlib.define_2_1 import model as DEFINE
 import define_object
+from integrity import MISSING_REFERENCES
+from term_table import TermTable, get_term_table
 
 
 class WhereClauses(define_object.DefineObject):
     """ create a Define-XML v2.1 WhereClauseDef element objects """
     def __init__(self):
         super().__init__()
+        self.terms = TermTable()
 
     def create_define_objects(self, template, define_objects, lang, acrf):
         """
@@ -16,32 +18,39 @@ class WhereClauses(define_object.DefineObject):
         :param acrf: part of the common interface but not used by this class
         """
         self.lang = lang
-        # read conditions from define_objects (stored by conditions.py)
-        range_checks = define_objects.get("_conditions", [])
+        self.set_model(define_objects)
+        self.terms = get_term_table(define_objects)
         for wc_obj in template:
-            wc = self._create_whereclausedef_object(wc_obj, range_checks)
+            wc = self._create_whereclausedef_object(wc_obj, define_objects)
             define_objects["WhereClauseDef"].append(wc)
+        # the where clauses hold the shared range checks; the table is not needed once the section is loaded
+        self.terms.release()
 
-    def _create_whereclausedef_object(self, wc_obj, range_checks):
+    def _create_whereclausedef_object(self, wc_obj, define_objects):
         attr = {"OID": wc_obj["OID"]}
-        where_clause = DEFINE.WhereClauseDef(**attr)
+        where_clause = self.model.WhereClauseDef(**attr)
         for condition_oid in wc_obj["conditions"]:
-            stashed_rc = self._get_range_checks(range_checks, condition_oid)
-            cond = stashed_rc[condition_oid]
+            # read conditions from define_objects (stored by conditions.py)
+            cond = self.find_object(define_objects, "_conditions", condition_oid)
+            if cond is None:
+                # reported by the integrity check instead of failing on the first missing condition
+                self.logger.warning(f"WhereClauseDef {wc_obj['OID']} references undefined condition {condition_oid}")
+                define_objects.setdefault(MISSING_REFERENCES, []).append(
+                    {"parent": f"WhereClauseDef {wc_obj['OID']}", "element": "WhereClauseDef",
+                     "attribute": "conditions", "reference": condition_oid, "target": "condition"})
+                continue
             rc_list = cond["RangeCheck"]
             for rc_obj in rc_list:
-                rc_attr = {"SoftHard": "Soft", "ItemOID": rc_obj["ItemOID"], "Comparator": rc_obj["Comparator"]}
-                rc = DEFINE.RangeCheck(**rc_attr)
-                for value in rc_obj["CheckValue"]:
-                    cv = DEFINE.CheckValue(_content=value)
-                    rc.CheckValue.append(cv)
+                # where clauses that share a condition, or test the same values, share one RangeCheck object
+                key = ("RangeCheck", rc_obj["ItemOID"], rc_obj["Comparator"], tuple(rc_obj["CheckValue"]))
+                rc = self.terms.intern(key, self._create_rangecheck_object, rc_obj)
                 where_clause.RangeCheck.append(rc)
         return where_clause
 
-    @staticmethod
-    def _get_range_checks(range_checks, condition_oid):
-        for rc in range_checks:
-            oid = list(rc.keys())[0]
-            if oid == condition_oid:
-                return rc
-        return None
\ No newline at end of file
+    def _create_rangecheck_object(self, rc_obj):
+        rc_attr = {"SoftHard": "Soft", "ItemOID": rc_obj["ItemOID"], "Comparator": rc_obj["Comparator"]}
+        rc = self.model.RangeCheck(**rc_attr)
+        for value in rc_obj["CheckValue"]:
+            cv = self.model.CheckValue(_content=value)
+            rc.CheckValue.append(cv)
+        return rc
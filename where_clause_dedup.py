@@ -0,0 +1,131 @@
+"""
+where_clause_dedup.py - collapse where clauses that test the same range checks into one WhereClauseDef.
+
+Value-level metadata often has many where clauses that differ only in their OID, for example one per value list that
+tests PARAMCD EQ "SYSBP". Each where clause is reduced to a canonical form: its range checks as (item, comparator,
+sorted check values), sorted, across all of its conditions. The first where clause with a canonical form is kept. The
+others are removed, and the applicableWhen references of the value-level items are rewritten to the kept OID. The
+conditions only used by removed where clauses are dropped too.
+
+This runs on the DDS content before the loaders, so every backend and writer generates the collapsed where clauses. It
+needs the whole DDS, so it is not available with streaming ingestion. The report counts the where clauses collapsed,
+the WhereClauseDef, RangeCheck and CheckValue objects not created, and the bytes the removed WhereClauseDef elements
+would have taken in the Define-XML.
+"""
+import copy
+from typing import Any, Hashable
+import conditions
+import stream_writer
+import whereClauses
+from define_registry import DefineRegistry
+
+
+def canonical_key(where_clause: dict[str, Any], condition_index: dict[str, dict[str, Any]]) -> Hashable | None:
+    """
+    Return the canonical form of a where clause.
+
+    :param where_clause: where clause from the whereClauses section of the DDS JSON
+    :param condition_index: conditions section of the DDS JSON by OID
+    :return: sorted tuple of (item, comparator, sorted check values) for its range checks, or None if a condition is
+        missing, so that the where clause is kept for the integrity check to report
+    """
+    range_checks = []
+    for condition_oid in where_clause.get("conditions", []):
+        condition = condition_index.get(condition_oid)
+        if condition is None:
+            return None
+        range_checks.extend((rc["item"], rc["comparator"], tuple(sorted(rc["checkValues"])))
+                            for rc in condition["rangeChecks"])
+    return tuple(sorted(range_checks))
+
+
+def collapse_where_clauses(template: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Collapse the identical where clauses of a DDS.
+
+    :param template: DDS content; not changed
+    :return: the DDS content with the duplicate where clauses removed and the references to them rewritten, and a
+        report {"where_clauses", "collapsed", "objects_saved", "bytes_saved", "aliases"} where aliases maps each
+        removed where clause OID to the OID it was collapsed into
+    """
+    condition_index = {condition["OID"]: condition for condition in template.get("conditions", [])}
+    kept = {}
+    kept_clauses = []
+    aliases = {}
+    duplicates = {}
+    for where_clause in template.get("whereClauses", []):
+        key = canonical_key(where_clause, condition_index)
+        canonical = kept.get(key) if key is not None else None
+        if canonical is None:
+            if key is not None:
+                kept[key] = where_clause
+            kept_clauses.append(where_clause)
+        else:
+            aliases[where_clause["OID"]] = canonical["OID"]
+            duplicates.setdefault(canonical["OID"], []).append(where_clause)
+    report = {"where_clauses": len(template.get("whereClauses", [])), "collapsed": len(aliases), "objects_saved": 0,
+              "bytes_saved": 0, "aliases": aliases}
+    if not aliases:
+        return template, report
+
+    used = {oid for where_clause in kept_clauses for oid in where_clause.get("conditions", [])}
+    unused = {oid for removed in duplicates.values() for where_clause in removed
+              for oid in where_clause["conditions"]} - used
+    collapsed = dict(template)
+    collapsed["whereClauses"] = kept_clauses
+    collapsed["conditions"] = [condition for condition in template.get("conditions", [])
+                               if condition["OID"] not in unused]
+    collapsed["itemGroups"] = [_rewrite_dataset(dataset, aliases) for dataset in template.get("itemGroups", [])]
+    _measure(report, duplicates, condition_index)
+    return collapsed, report
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """return a one-line summary of a collapse_where_clauses() report"""
+    return (f"where clauses: {report['collapsed']} of {report['where_clauses']} collapsed, "
+            f"{report['objects_saved']} WhereClauseDef, RangeCheck and CheckValue objects and "
+            f"{report['bytes_saved']} bytes saved")
+
+
+def _rewrite_dataset(dataset: dict[str, Any], aliases: dict[str, str]) -> dict[str, Any]:
+    """return the dataset with the applicableWhen references of its value lists rewritten, copying only what changes"""
+    if not any(oid in aliases for vl in dataset.get("slices", []) for item in vl.get("items", [])
+               for oid in item.get("applicableWhen", [])):
+        return dataset
+    dataset = copy.copy(dataset)
+    dataset["slices"] = [copy.copy(vl) for vl in dataset["slices"]]
+    for vl in dataset["slices"]:
+        vl["items"] = [_rewrite_item(item, aliases) for item in vl.get("items", [])]
+    return dataset
+
+
+def _rewrite_item(item: dict[str, Any], aliases: dict[str, str]) -> dict[str, Any]:
+    if not any(oid in aliases for oid in item.get("applicableWhen", [])):
+        return item
+    item = copy.copy(item)
+    item["applicableWhen"] = [aliases.get(oid, oid) for oid in item["applicableWhen"]]
+    return item
+
+
+def _measure(report: dict[str, Any], duplicates: dict[str, list[dict[str, Any]]],
+             condition_index: dict[str, dict[str, Any]]) -> None:
+    """
+    Add the objects and bytes saved to the report. One WhereClauseDef is serialized for each kept where clause that
+    others were collapsed into. A removed where clause would have serialized to the same XML with its own OID, as it has
+    the same range checks and check values, possibly in a different order.
+    """
+    registry = DefineRegistry()
+    registry.backend = "fast"
+    loader = whereClauses.WhereClauses()
+    loader.set_model(registry)
+    for canonical_oid, removed in duplicates.items():
+        where_clause = {"OID": canonical_oid, "conditions": removed[0]["conditions"]}
+        registry["_conditions"] = [conditions.Conditions._create_condition(condition_index[oid])
+                                   for oid in where_clause["conditions"]]
+        xml, _ = stream_writer.serialize_element(loader._create_whereclausedef_object(where_clause, registry))
+        size = len(xml.encode("utf-8")) - len(canonical_oid.encode("utf-8"))
+        objects = 1 + sum(1 + len(rc["CheckValue"]) for condition in registry["_conditions"]
+                          for rc in condition["RangeCheck"])
+        for where_clause in removed:
+            report["bytes_saved"] += size + len(where_clause["OID"].encode("utf-8"))
+            report["objects_saved"] += objects